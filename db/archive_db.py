@@ -0,0 +1,129 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+from db import db_init
+from db.db_init import PROJECT_ROOT, db_connect
+
+ARCHIVE_SCHEMA_PATH = PROJECT_ROOT / "db" / "archive_schema.sql"
+
+_PASS_COLUMNS = "pass_id, gs_id, s_id, start_time, end_time, max_elevation, duration, source, created_at"
+_RESERVATION_COLUMNS = "r_id, mission_id, pass_id, gs_id, s_id, cancelled_at, created_at, updated_at"
+_COMMAND_COLUMNS = "rc_id, r_id, command_type, created_at"
+
+
+def archive_db_path() -> Path:
+    """The archive lives next to the live database: ground_system.db -> ground_system_archive.db."""
+    path = Path(db_init.DB_PATH)
+    return path.with_name(f"{path.stem}_archive{path.suffix}")
+
+
+_schema_ready: set[str] = set()
+_schema_lock = threading.Lock()
+
+
+def archive_connect() -> sqlite3.Connection:
+    """Live-database connection with the archive attached as `archive`.
+
+    The archive schema is applied the first time each archive file is attached in
+    this process; later connections only ATTACH.
+    """
+    path = str(archive_db_path())
+    conn = db_connect()
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive", (path,))
+        if path not in _schema_ready:
+            with _schema_lock:
+                if path not in _schema_ready:
+                    conn.executescript(ARCHIVE_SCHEMA_PATH.read_text(encoding="utf-8"))
+                    _schema_ready.add(path)
+    except sqlite3.Error:
+        conn.close()
+        raise
+    return conn
+
+
+def archive_reservations_batch(retention_days: int, batch_size: int) -> tuple[int, int]:
+    """Move up to `batch_size` finished reservations into the archive; return (reservations, passes).
+
+    Finished means cancelled or complete, with the pass ended more than
+    `retention_days` ago. SQLite only commits atomically across attached WAL
+    databases per file, so the move is two transactions: the first copies the
+    reservations, their commands and their passes into the archive and commits;
+    the second deletes from the live tables only the rows now present in the
+    archive. A run that stops between the two leaves the rows in both files;
+    the next run selects them again, the copy overwrites the archived rows with
+    identical ones, and the delete finishes the move.
+    """
+    conn = archive_connect()
+    try:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (r_id INTEGER PRIMARY KEY, pass_id INTEGER)")
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM archive_batch")
+        conn.execute(
+            """
+            INSERT INTO archive_batch (r_id, pass_id)
+            SELECT r.r_id, r.pass_id
+            FROM main.reservations r
+                JOIN main.predicted_passes p ON p.pass_id = r.pass_id
+            WHERE p.end_time < datetime('now', ?)
+            ORDER BY r.r_id
+            LIMIT ?
+            """,
+            (f"-{retention_days} days", batch_size),
+        )
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO archive.predicted_passes ({_PASS_COLUMNS})
+            SELECT {_PASS_COLUMNS}
+            FROM main.predicted_passes
+            WHERE pass_id IN (SELECT pass_id FROM archive_batch)
+            """
+        )
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO archive.reservations ({_RESERVATION_COLUMNS})
+            SELECT {_RESERVATION_COLUMNS}
+            FROM main.reservations
+            WHERE r_id IN (SELECT r_id FROM archive_batch)
+            """
+        )
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO archive.reservation_commands ({_COMMAND_COLUMNS})
+            SELECT {_COMMAND_COLUMNS}
+            FROM main.reservation_commands
+            WHERE r_id IN (SELECT r_id FROM archive_batch)
+            """
+        )
+        conn.commit()
+
+        conn.execute("BEGIN IMMEDIATE")
+        # reservation_commands follow through ON DELETE CASCADE.
+        reservations_cur = conn.execute(
+            """
+            DELETE FROM main.reservations
+            WHERE r_id IN (SELECT r_id FROM archive_batch)
+              AND r_id IN (SELECT r_id FROM archive.reservations)
+            """
+        )
+        passes_cur = conn.execute(
+            """
+            DELETE FROM main.predicted_passes
+            WHERE pass_id IN (SELECT pass_id FROM archive_batch)
+              AND pass_id IN (SELECT pass_id FROM archive.predicted_passes)
+              AND NOT EXISTS (
+                SELECT 1
+                FROM main.reservations r
+                WHERE r.pass_id = predicted_passes.pass_id
+              )
+            """
+        )
+        conn.commit()
+        return reservations_cur.rowcount, passes_cur.rowcount
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
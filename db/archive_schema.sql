@@ -0,0 +1,35 @@
+-- Archive tier, attached as "archive" next to the live database.
+-- Same columns as the live tables; no foreign keys, since rows move here once
+-- their history is final and the parents may later be deleted.
+PRAGMA archive.auto_vacuum = INCREMENTAL;
+CREATE TABLE IF NOT EXISTS archive.predicted_passes (
+    pass_id INTEGER PRIMARY KEY,
+    gs_id INTEGER NOT NULL,
+    s_id INTEGER NOT NULL,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP NOT NULL,
+    max_elevation REAL NOT NULL,
+    duration INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+CREATE TABLE IF NOT EXISTS archive.reservations (
+    r_id INTEGER PRIMARY KEY,
+    mission_id INTEGER,
+    pass_id INTEGER NOT NULL,
+    gs_id INTEGER NOT NULL,
+    s_id INTEGER NOT NULL,
+    cancelled_at TIMESTAMP DEFAULT NULL,
+    created_at TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS archive.reservation_commands (
+    rc_id INTEGER PRIMARY KEY,
+    r_id INTEGER NOT NULL,
+    command_type TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+CREATE INDEX IF NOT EXISTS archive.idx_archive_reservations_by_mission ON reservations (mission_id, created_at);
+CREATE INDEX IF NOT EXISTS archive.idx_archive_reservations_by_gs ON reservations (gs_id, created_at);
+CREATE INDEX IF NOT EXISTS archive.idx_archive_reservations_by_sat ON reservations (s_id, created_at);
+CREATE INDEX IF NOT EXISTS archive.idx_archive_commands_by_reservation ON reservation_commands (r_id, command_type);
@@ -0,0 +1,103 @@
+from db.db_init import db_connect
+from db.db_query import fetch_all, fetch_one
+
+# Tables tracked by change_log triggers, with their primary key column.
+SYNC_TABLES = {
+    "ground_stations": "gs_id",
+    "satellites": "s_id",
+    "missions": "mission_id",
+    "predicted_passes": "pass_id",
+    "reservations": "r_id",
+}
+
+# Rows are read from here instead, for tables stored across several (pass partitions).
+_SYNC_SOURCES = {"predicted_passes": "all_predicted_passes"}
+
+# Stay well under SQLite's bound-parameter limit when fetching rows by id.
+_ID_CHUNK = 500
+
+
+def get_current_version() -> int:
+    row = fetch_one("SELECT COALESCE(MAX(version), 0) AS version FROM change_log")
+    return row["version"]
+
+
+def get_changes_since(since: int, limit: int) -> dict:
+    """Rows changed after `since`, in version order, read from one consistent snapshot.
+
+    Returns {"version", "has_more", "changes": {table: {"upserts": [...], "deletes": [...]}}}.
+    `version` is the resume point for the next call.
+    """
+    conn = db_connect()
+    try:
+        # One read transaction, so the log and the rows it points at agree.
+        conn.execute("BEGIN")
+        entries = conn.execute(
+            f"""
+            SELECT version, table_name, row_id, op
+            FROM change_log
+            WHERE version > ?
+              AND table_name IN ({",".join("?" for _ in SYNC_TABLES)})
+            ORDER BY version
+            LIMIT ?
+            """,
+            (since, *SYNC_TABLES, limit + 1),
+        ).fetchall()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        upsert_ids: dict[str, list[int]] = {}
+        changes = {table: {"upserts": [], "deletes": []} for table in SYNC_TABLES}
+        for entry in entries:
+            if entry["op"] == "DELETE":
+                changes[entry["table_name"]]["deletes"].append(entry["row_id"])
+            else:
+                upsert_ids.setdefault(entry["table_name"], []).append(entry["row_id"])
+
+        for table, ids in upsert_ids.items():
+            pk = SYNC_TABLES[table]
+            for start in range(0, len(ids), _ID_CHUNK):
+                chunk = ids[start:start + _ID_CHUNK]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT * FROM {_SYNC_SOURCES.get(table, table)} WHERE {pk} IN ({placeholders}) ORDER BY {pk}",
+                    tuple(chunk),
+                ).fetchall()
+                changes[table]["upserts"].extend(dict(row) for row in rows)
+
+        if entries:
+            version = entries[-1]["version"]
+        else:
+            placeholders = ",".join("?" for _ in SYNC_TABLES)
+            version = conn.execute(
+                f"""
+                SELECT COALESCE(MAX(version), 0) AS version
+                FROM change_log
+                WHERE table_name IN ({placeholders})
+                """,
+                tuple(SYNC_TABLES),
+            ).fetchone()["version"]
+            version = max(version, since)
+        conn.commit()
+        return {"version": version, "has_more": has_more, "changes": changes}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_table_versions(tables: list[str]) -> dict[str, int]:
+    """Latest change version per table (0 if never changed), one index lookup each."""
+    placeholders = ",".join("?" for _ in tables)
+    rows = fetch_all(
+        f"""
+        SELECT table_name, MAX(version) AS version
+        FROM change_log
+        WHERE table_name IN ({placeholders})
+        GROUP BY table_name
+        """,
+        tuple(tables),
+    )
+    versions = {row["table_name"]: row["version"] for row in rows}
+    return {table: versions.get(table, 0) for table in tables}
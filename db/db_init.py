@@ -8,19 +8,44 @@ DB_PATH = PROJECT_ROOT / "data" / "ground_system.db"
 SCHEMA_PATH = PROJECT_ROOT / "db" / "schema.sql"
 
 
-def db_connect(db_path: str | None = None) -> sqlite3.Connection:
+def db_connect(db_path: str | None = None, check_same_thread: bool = True) -> sqlite3.Connection:
     """
     Create and return a SQLite database connection.
+
+    Pass check_same_thread=False only for a connection handed between threads
+    by a single consumer (e.g. a generator driven from a threadpool).
     """
     path = Path(db_path) if db_path else DB_PATH
-    conn = sqlite3.connect(path, timeout=5.0)
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     conn.execute("PRAGMA busy_timeout = 5000;")
+    # Only takes effect on a new database file, and must precede journal_mode.
+    # Existing databases are migrated with scripts/optimize_db.py --migrate.
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
     conn.execute("PRAGMA journal_mode = WAL;")
     return conn
 
 
+# Columns added to existing tables after their first release: CREATE TABLE IF NOT
+# EXISTS leaves an older database's table as it was, so these are added in place.
+_ADDED_COLUMNS = {
+    "satellites": [
+        ("tle_epoch", "TIMESTAMP"),
+        ("tle_etag", "TEXT"),
+        ("tle_last_modified", "TEXT"),
+    ],
+}
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    for table, columns in _ADDED_COLUMNS.items():
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, column_type in columns:
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+
 def init_db(
     db_path: str | None = None,
     schema_path: str | None = None
@@ -36,6 +61,7 @@ def init_db(
     conn = db_connect(str(db_file))
     try:
         conn.executescript(schema_sql)
+        _add_missing_columns(conn)
         conn.commit()
     except sqlite3.Error:
         conn.rollback()
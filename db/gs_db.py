@@ -2,6 +2,7 @@
 import sqlite3
 from db.db_init import db_connect
 from db.db_query import execute_row_id, execute_rowcount, fetch_all, fetch_one
+import db.passes_db as p_db
 
 
 def insert_gs_manual(gs_code: str, lon: float, lat: float, alt: float, status: str) -> int:
@@ -47,25 +48,6 @@ def gs_has_active_reservations(gs_id: int) -> bool:
     return True if fetch_one(query, (gs_id,)) else False
     
 
-def delete_gs_and_reservations(gs_id: int) -> tuple[int, int]:
-    conn = db_connect()
-    try:
-        reservations_cur = conn.execute(
-            "DELETE FROM reservations WHERE gs_id = ?",
-            (gs_id,),
-        )
-        gs_cur = conn.execute(
-            "DELETE FROM ground_stations WHERE gs_id = ?",
-            (gs_id,),
-        )
-        conn.commit()
-        return reservations_cur.rowcount, gs_cur.rowcount
-    except sqlite3.Error:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
-
 def update_gs(gs_id: int, updates: dict):
     if not updates:
         return 0 
@@ -87,54 +69,148 @@ def update_gs(gs_id: int, updates: dict):
     return execute_rowcount(query, tuple(params))
 
 
-def update_gs_with_deactivation(gs_id: int, updates: dict) -> tuple[int, int, int]:
-    if not updates:
-        return 0, 0, 0
-
-    set_clause = []
-    params = []
+def insert_gs_batch(
+    rows: list[tuple], atomic: bool = True, check_only: bool = False
+) -> tuple[dict[int, int], list[tuple[int, str, int]]]:
+    """Insert many stations in one transaction, checking uniqueness set-based first.
 
-    for col, value in updates.items():
-        clause = f"{col} = ?"
-        set_clause.append(clause)
-        params.append(value)
+    `rows` are (index, gs_code, lat, lon, alt, status, source). Returns
+    ({index: gs_id} for inserted rows, [(index, field, existing gs_id)] for rows
+    clashing with a registered station on gs_code or (lat, lon)). With `atomic`,
+    any conflict rolls back and nothing is inserted; `check_only` never inserts.
+    """
+    conn = db_connect()
+    try:
+        # IMMEDIATE: the conflict check and the insert see the same table.
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            """
+            CREATE TEMP TABLE gs_import (
+                idx INTEGER PRIMARY KEY,
+                gs_code TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                alt REAL NOT NULL,
+                status TEXT NOT NULL,
+                source TEXT NOT NULL
+            )
+            """
+        )
+        conn.executemany("INSERT INTO gs_import VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        # Each side is probed through the table's own UNIQUE index.
+        conflicts = [
+            (row["idx"], row["field"], row["gs_id"])
+            for row in conn.execute(
+                """
+                SELECT i.idx, 'gs_code' AS field, g.gs_id
+                FROM gs_import i
+                    JOIN ground_stations g ON g.gs_code = i.gs_code
+                UNION ALL
+                SELECT i.idx, 'coordinates' AS field, g.gs_id
+                FROM gs_import i
+                    JOIN ground_stations g ON g.lat = i.lat AND g.lon = i.lon
+                ORDER BY 1
+                """
+            )
+        ]
+        if check_only or (conflicts and atomic):
+            conn.rollback()
+            return {}, conflicts
 
-    params.append(gs_id)
-    update_query = f"""
-                UPDATE ground_stations
-                SET {",".join(set_clause)}
-                WHERE gs_id = ?
+        conn.executemany("DELETE FROM gs_import WHERE idx = ?", [(index,) for index, _, _ in conflicts])
+        conn.execute(
+            """
+            INSERT INTO ground_stations (gs_code, lat, lon, alt, source, status)
+            SELECT gs_code, lat, lon, alt, source, status
+            FROM gs_import
+            ORDER BY idx
+            """
+        )
+        inserted = {
+            row["idx"]: row["gs_id"]
+            for row in conn.execute(
                 """
-    cancel_query = """
-            UPDATE reservations
-            SET cancelled_at = CURRENT_TIMESTAMP
-            WHERE gs_id = ?
-              AND cancelled_at IS NULL
-              AND pass_id IN (
-                SELECT pass_id
-                FROM predicted_passes
-                WHERE gs_id = ?
-                  AND end_time >= CURRENT_TIMESTAMP
-              )
+                SELECT i.idx, g.gs_id
+                FROM gs_import i
+                    JOIN ground_stations g ON g.gs_code = i.gs_code
+                """
+            )
+        }
+        conn.commit()
+        return inserted, conflicts
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_gs_in_boxes(boxes: list[tuple[float, float, float, float]], active_only: bool = False):
+    """Stations whose coordinates fall in any (min_lat, max_lat, min_lon, max_lon) box, via gs_rtree."""
+    if not boxes:
+        return []
+    box_query = """
+            SELECT g.*
+            FROM gs_rtree t
+                JOIN ground_stations g ON g.gs_id = t.gs_id
+            WHERE t.max_lat >= ? AND t.min_lat <= ?
+              AND t.max_lon >= ? AND t.min_lon <= ?
         """
-    delete_query = """
-            DELETE FROM predicted_passes
+    if active_only:
+        box_query += " AND g.status = 'ACTIVE'"
+    # Boxes only overlap at a shared edge, so UNION removes any double hits.
+    query = " UNION ".join(box_query for _ in boxes)
+    params = [value for box in boxes for value in box]
+    return fetch_all(query, tuple(params))
+
+
+def get_horizon_mask(gs_id: int) -> bytes | None:
+    query = """
+            SELECT mask
+            FROM gs_horizon_masks
             WHERE gs_id = ?
-              AND start_time >= CURRENT_TIMESTAMP
-              AND NOT EXISTS (
-                SELECT 1
-                FROM reservations r
-                WHERE r.pass_id = predicted_passes.pass_id
-              )
         """
+    row = fetch_one(query, (gs_id,))
+    return row["mask"] if row else None
 
+
+def set_horizon_mask(gs_id: int, mask: bytes | None) -> int:
+    """Store (or with None, remove) a station's horizon mask; returns passes invalidated.
+
+    Unreserved passes that have not started were predicted against the old mask,
+    so they are deleted in the same transaction and re-predicted on the next
+    request. Reserved passes are left alone.
+    """
     conn = db_connect()
     try:
-        update_cur = conn.execute(update_query, tuple(params))
-        cancel_cur = conn.execute(cancel_query, (gs_id, gs_id))
-        delete_cur = conn.execute(delete_query, (gs_id,))
+        if mask is None:
+            conn.execute("DELETE FROM gs_horizon_masks WHERE gs_id = ?", (gs_id,))
+        else:
+            conn.execute(
+                """
+                INSERT INTO gs_horizon_masks (gs_id, mask)
+                VALUES (?, ?)
+                ON CONFLICT (gs_id) DO UPDATE SET
+                    mask = excluded.mask,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (gs_id, mask),
+            )
+        invalidated = p_db.delete_passes(
+            conn,
+            """
+            p.gs_id = ?
+              AND p.start_time >= CURRENT_TIMESTAMP
+              AND NOT EXISTS (
+                SELECT 1
+                FROM reservations r
+                WHERE r.pass_id = p.pass_id
+              )
+            """,
+            (gs_id,),
+        )
         conn.commit()
-        return update_cur.rowcount, cancel_cur.rowcount, delete_cur.rowcount
+        return invalidated
     except sqlite3.Error:
         conn.rollback()
         raise
@@ -0,0 +1,85 @@
+import sqlite3
+from db.db_query import execute_rowcount
+from db.db_init import db_connect
+
+
+def claim_idempotency_key(
+    idem_key: str,
+    method: str,
+    path: str,
+    request_hash: str,
+    pending_seconds: int,
+) -> sqlite3.Row | None:
+    """Reserve a key for a new request, or return the existing row for it.
+
+    Returns None when the caller now owns the key and should run the request. An
+    expired row (finished or abandoned) is replaced. Runs under BEGIN IMMEDIATE
+    so two concurrent first attempts can't both claim the key.
+    """
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            """
+            DELETE FROM idempotency_keys
+            WHERE idem_key = ?
+              AND expires_at <= CURRENT_TIMESTAMP
+            """,
+            (idem_key,),
+        )
+        cur = conn.execute(
+            """
+            INSERT OR IGNORE INTO idempotency_keys (idem_key, method, path, request_hash, expires_at)
+            VALUES (?, ?, ?, ?, datetime('now', ?))
+            """,
+            (idem_key, method, path, request_hash, f"+{pending_seconds} seconds"),
+        )
+        existing = None
+        if cur.rowcount == 0:
+            existing = conn.execute(
+                "SELECT * FROM idempotency_keys WHERE idem_key = ?",
+                (idem_key,),
+            ).fetchone()
+        conn.commit()
+        return existing
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def store_idempotent_response(
+    idem_key: str,
+    status_code: int,
+    headers: str,
+    body: bytes,
+    ttl_hours: int,
+) -> int:
+    query = """
+            UPDATE idempotency_keys
+            SET status_code = ?,
+                headers = ?,
+                body = ?,
+                expires_at = datetime('now', ?)
+            WHERE idem_key = ?
+        """
+    return execute_rowcount(query, (status_code, headers, body, f"+{ttl_hours} hours", idem_key))
+
+
+def release_idempotency_key(idem_key: str) -> int:
+    # Only pending rows: a finished response must keep being replayed.
+    query = """
+            DELETE FROM idempotency_keys
+            WHERE idem_key = ?
+              AND status_code IS NULL
+        """
+    return execute_rowcount(query, (idem_key,))
+
+
+def delete_expired_idempotency_keys() -> int:
+    query = """
+            DELETE FROM idempotency_keys
+            WHERE expires_at <= CURRENT_TIMESTAMP
+        """
+    return execute_rowcount(query)
@@ -0,0 +1,281 @@
+import sqlite3
+from collections.abc import Callable
+
+from db.db_init import db_connect
+from db.db_query import fetch_all, fetch_one
+import db.passes_db as p_db
+
+# Entity removed by each delete job: (table, key column on reservations and passes).
+_DELETE_TARGETS = {
+    "gs_delete": ("ground_stations", "gs_id"),
+    "satellite_delete": ("satellites", "s_id"),
+}
+_COUNTERS = ("reservations_cancelled", "reservations_deleted", "passes_deleted")
+
+
+def _insert_job(conn: sqlite3.Connection, kind: str, target_id: int) -> int:
+    cur = conn.execute("INSERT INTO jobs (kind, target_id) VALUES (?, ?)", (kind, target_id))
+    return cur.lastrowid
+
+
+def _add_to_counter(conn: sqlite3.Connection, job_id: int, counter: str, count: int) -> None:
+    if counter not in _COUNTERS:
+        raise ValueError(f"Unknown job counter: {counter}")
+    conn.execute(
+        f"""
+        UPDATE jobs
+        SET {counter} = {counter} + ?,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE job_id = ?
+        """,
+        (count, job_id),
+    )
+
+
+def get_job(job_id: int):
+    query = """
+            SELECT *
+            FROM jobs
+            WHERE job_id = ?
+        """
+    return fetch_one(query, (job_id,))
+
+
+def create_gs_deactivation_job(gs_id: int, updates: dict) -> int:
+    """Apply the station update and queue its cleanup in one transaction.
+
+    The station is INACTIVE from this commit on, so no new passes or reservations
+    are added while the job cancels and deletes the existing ones.
+    """
+    set_clause = ", ".join(f"{col} = ?" for col in updates)
+    conn = db_connect()
+    try:
+        conn.execute(
+            f"UPDATE ground_stations SET {set_clause} WHERE gs_id = ?",
+            (*updates.values(), gs_id),
+        )
+        job_id = _insert_job(conn, "gs_deactivate", gs_id)
+        conn.commit()
+        return job_id
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def create_delete_job(kind: str, target_id: int) -> tuple[int, bool]:
+    """Queue a delete job, or return the one already running; returns (job_id, created).
+
+    A ground station is set INACTIVE in the same transaction so it stops taking
+    passes and reservations while its history is removed.
+    """
+    if kind not in _DELETE_TARGETS:
+        raise ValueError(f"Unknown delete job: {kind}")
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        existing = conn.execute(
+            """
+            SELECT job_id
+            FROM jobs
+            WHERE kind = ? AND target_id = ? AND status IN ('PENDING', 'RUNNING')
+            LIMIT 1
+            """,
+            (kind, target_id),
+        ).fetchone()
+        if existing:
+            conn.rollback()
+            return existing["job_id"], False
+        if kind == "gs_delete":
+            conn.execute("UPDATE ground_stations SET status = 'INACTIVE' WHERE gs_id = ?", (target_id,))
+        job_id = _insert_job(conn, kind, target_id)
+        conn.commit()
+        return job_id, True
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_resumable_job_ids(stale_seconds: int) -> list[int]:
+    """Pending jobs, plus running ones whose worker stopped reporting (e.g. a restart)."""
+    query = """
+            SELECT job_id
+            FROM jobs
+            WHERE status = 'PENDING'
+               OR (status = 'RUNNING' AND updated_at < datetime('now', ?))
+            ORDER BY job_id
+        """
+    return [row["job_id"] for row in fetch_all(query, (f"-{stale_seconds} seconds",))]
+
+
+def claim_job(job_id: int, stale_seconds: int) -> bool:
+    """Mark a job RUNNING unless another worker is actively running it."""
+    conn = db_connect()
+    try:
+        cur = conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'RUNNING',
+                updated_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+              AND (
+                status = 'PENDING'
+                OR (status = 'RUNNING' AND updated_at < datetime('now', ?))
+              )
+            """,
+            (job_id, f"-{stale_seconds} seconds"),
+        )
+        conn.commit()
+        return cur.rowcount == 1
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def finish_job(job_id: int, status: str, error: str | None = None) -> None:
+    conn = db_connect()
+    try:
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = ?,
+                error = ?,
+                updated_at = CURRENT_TIMESTAMP,
+                finished_at = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+            """,
+            (status, error, job_id),
+        )
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _run_chunk(job_id: int, counter: str, query: str, params: tuple) -> int:
+    return _run_work_chunk(job_id, counter, lambda conn: conn.execute(query, params).rowcount)
+
+
+def _run_work_chunk(job_id: int, counter: str, work: Callable[[sqlite3.Connection], int]) -> int:
+    # One short write transaction per chunk; the job's counter moves with it.
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        count = work(conn)
+        _add_to_counter(conn, job_id, counter, count)
+        conn.commit()
+        return count
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def cancel_gs_reservations_chunk(job_id: int, gs_id: int, limit: int) -> int:
+    """Cancel up to `limit` live reservations on passes that have not ended.
+
+    Does nothing once the station is ACTIVE again, so a reactivation stops the job.
+    """
+    query = """
+            UPDATE reservations
+            SET cancelled_at = CURRENT_TIMESTAMP
+            WHERE r_id IN (
+                SELECT r.r_id
+                FROM reservations r
+                    JOIN predicted_passes p ON p.pass_id = r.pass_id
+                WHERE r.gs_id = ?
+                  AND r.cancelled_at IS NULL
+                  AND p.end_time >= CURRENT_TIMESTAMP
+                LIMIT ?
+              )
+              AND EXISTS (
+                SELECT 1
+                FROM ground_stations
+                WHERE gs_id = ? AND status = 'INACTIVE'
+              )
+        """
+    return _run_chunk(job_id, "reservations_cancelled", query, (gs_id, limit, gs_id))
+
+
+def delete_future_gs_passes_chunk(job_id: int, gs_id: int, limit: int) -> int:
+    """Delete up to `limit` unreserved passes that have not started, while the station is INACTIVE."""
+    condition = """
+            p.gs_id = ?
+              AND p.start_time >= CURRENT_TIMESTAMP
+              AND NOT EXISTS (
+                SELECT 1
+                FROM reservations r
+                WHERE r.pass_id = p.pass_id
+              )
+              AND EXISTS (
+                SELECT 1
+                FROM ground_stations
+                WHERE gs_id = ? AND status = 'INACTIVE'
+              )
+        """
+    return _run_work_chunk(
+        job_id, "passes_deleted", lambda conn: p_db.delete_passes(conn, condition, (gs_id, gs_id), limit)
+    )
+
+
+def delete_reservations_chunk(job_id: int, kind: str, target_id: int, limit: int) -> int:
+    """Delete up to `limit` of the target's reservations (commands follow by cascade)."""
+    _, column = _DELETE_TARGETS[kind]
+    query = f"""
+            DELETE FROM reservations
+            WHERE r_id IN (
+                SELECT r_id
+                FROM reservations
+                WHERE {column} = ?
+                LIMIT ?
+              )
+        """
+    return _run_chunk(job_id, "reservations_deleted", query, (target_id, limit))
+
+
+def delete_passes_chunk(job_id: int, kind: str, target_id: int, limit: int) -> int:
+    """Delete up to `limit` of the target's passes that no reservation references."""
+    _, column = _DELETE_TARGETS[kind]
+    condition = f"""
+            p.{column} = ?
+              AND NOT EXISTS (
+                SELECT 1
+                FROM reservations r
+                WHERE r.pass_id = p.pass_id
+              )
+        """
+    return _run_work_chunk(
+        job_id, "passes_deleted", lambda conn: p_db.delete_passes(conn, condition, (target_id,), limit)
+    )
+
+
+def delete_target(job_id: int, kind: str, target_id: int) -> int:
+    """Delete the job's target row with whatever still references it.
+
+    Anything added since the chunks ran (e.g. a reservation made for a satellite
+    mid-deletion) goes in the same transaction. Returns the rows deleted (0 or 1).
+    """
+    table, column = _DELETE_TARGETS[kind]
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        reservations = conn.execute(f"DELETE FROM reservations WHERE {column} = ?", (target_id,)).rowcount
+        _add_to_counter(conn, job_id, "reservations_deleted", reservations)
+        passes = p_db.delete_passes(conn, f"p.{column} = ?", (target_id,))
+        _add_to_counter(conn, job_id, "passes_deleted", passes)
+        deleted = conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (target_id,)).rowcount
+        conn.commit()
+        return deleted
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,114 @@
+import sqlite3
+from db.db_query import execute_rowcount, fetch_one
+from db.db_init import db_connect
+
+
+def get_checkpoint(job: str) -> int | None:
+    query = """
+            SELECT position
+            FROM maintenance_checkpoints
+            WHERE job = ?
+        """
+    row = fetch_one(query, (job,))
+    return row["position"] if row else None
+
+
+def clear_checkpoint(job: str) -> int:
+    query = """
+            DELETE FROM maintenance_checkpoints
+            WHERE job = ?
+        """
+    return execute_rowcount(query, (job,))
+
+
+def _save_checkpoint(conn: sqlite3.Connection, job: str, position: int) -> None:
+    conn.execute(
+        """
+        INSERT INTO maintenance_checkpoints (job, position)
+        VALUES (?, ?)
+        ON CONFLICT (job) DO UPDATE SET
+            position = excluded.position,
+            updated_at = CURRENT_TIMESTAMP
+        """,
+        (job, position),
+    )
+
+
+def get_max_reservation_id() -> int:
+    row = fetch_one("SELECT COALESCE(MAX(r_id), 0) AS max_r_id FROM reservations")
+    return row["max_r_id"]
+
+
+def delete_cancelled_expired_reservations_range(job: str, after_r_id: int, upto_r_id: int) -> int:
+    """Delete cancelled reservations whose pass has ended, for r_id in (after, upto].
+
+    The range is walked through the primary key, so each call touches at most
+    `upto - after` rows. The checkpoint moves in the same short transaction, so
+    an interrupted job resumes exactly after the last committed batch.
+    """
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.execute(
+            """
+            DELETE FROM reservations
+            WHERE r_id > ? AND r_id <= ?
+              AND cancelled_at IS NOT NULL
+              AND EXISTS (
+                SELECT 1
+                FROM predicted_passes p
+                WHERE p.pass_id = reservations.pass_id
+                  AND p.end_time < CURRENT_TIMESTAMP
+              )
+            """,
+            (after_r_id, upto_r_id),
+        )
+        _save_checkpoint(conn, job, upto_r_id)
+        conn.commit()
+        return cur.rowcount
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# Highest change_log version whose tombstone has been pruned; /sync refuses to resume from below it.
+TOMBSTONE_WATERMARK = "change_log_tombstones"
+
+# Each table's newest entry is kept, so its MAX(version) (ETags, /sync's current version) never moves back.
+_PRUNABLE_TOMBSTONES = """
+    FROM change_log
+    WHERE op = 'DELETE'
+      AND changed_at < datetime('now', ?)
+      AND version < (
+        SELECT MAX(newest.version)
+        FROM change_log newest
+        WHERE newest.table_name = change_log.table_name
+      )
+"""
+
+
+def prune_change_log_tombstones(retention_days: int) -> int:
+    """Delete tombstones older than `retention_days`; returns how many were removed.
+
+    The highest pruned version is saved as the sync watermark in the same
+    transaction, so no client can resume past a deletion it never saw.
+    """
+    cutoff = f"-{retention_days} days"
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        pruned = conn.execute(f"SELECT MAX(version) AS version {_PRUNABLE_TOMBSTONES}", (cutoff,)).fetchone()["version"]
+        if pruned is None:
+            conn.rollback()
+            return 0
+        cur = conn.execute(f"DELETE {_PRUNABLE_TOMBSTONES}", (cutoff,))
+        _save_checkpoint(conn, TOMBSTONE_WATERMARK, pruned)
+        conn.commit()
+        return cur.rowcount
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
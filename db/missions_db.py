@@ -109,3 +109,19 @@ def check_sat_exist_in_mission(s_id: int, mission_id:int):
             WHERE s_id = ? and mission_id = ?
         """
     return True if fetch_one(query,(s_id, mission_id)) else False
+
+def get_mission_satellite_ids(mission_ids: list[int]) -> dict[int, set[int]]:
+    """Map each existing mission in `mission_ids` to the s_ids attached to it."""
+    placeholders = ",".join("?" for _ in mission_ids)
+    query = f"""
+            SELECT m.mission_id, ms.s_id
+            FROM missions m
+                LEFT JOIN mission_satellites ms ON ms.mission_id = m.mission_id
+            WHERE m.mission_id IN ({placeholders})
+        """
+    satellites: dict[int, set[int]] = {}
+    for row in fetch_all(query, tuple(mission_ids)):
+        sat_ids = satellites.setdefault(row["mission_id"], set())
+        if row["s_id"] is not None:
+            sat_ids.add(row["s_id"])
+    return satellites
@@ -1,5 +1,149 @@
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
+
+from db.db_init import db_connect
 from db.db_query import execute_row_id, execute_rowcount, fetch_one, fetch_all
 
+# Pass storage is partitioned by the UTC day of end_time:
+# - passes_YYYYMMDD tables hold the cached, unreserved predictions ending that day,
+#   so expiring a day is a DROP TABLE (drop_expired_pass_partitions).
+# - predicted_passes holds the passes reservations point at (moved there by
+#   move_pass_to_main when reserved) and rows cached before partitioning.
+# - all_predicted_passes is a view over all of them, rebuilt with every partition
+#   created or dropped; time-windowed reads name only the partitions they need.
+# pass_ids are unique across tables: partitions draw them from predicted_passes'
+# AUTOINCREMENT sequence.
+MAIN_PASS_TABLE = "predicted_passes"
+ALL_PASSES_VIEW = "all_predicted_passes"
+_PARTITION_PREFIX = "passes_"
+_PARTITION_GLOB = "passes_[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]"
+_PASS_COLUMNS = "pass_id, gs_id, s_id, start_time, end_time, max_elevation, duration, source, created_at"
+
+
+def partition_name(day: date) -> str:
+    return f"{_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _day_of(timestamp: str) -> date:
+    # Database timestamps start with the UTC date ("YYYY-MM-DD HH:MM:SS").
+    return date.fromisoformat(timestamp[:10])
+
+
+def _partition_tables(conn: sqlite3.Connection, first: date | None = None, last: date | None = None) -> list[str]:
+    """Partition tables in day order, optionally only those for days in [first, last]."""
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name",
+        (_PARTITION_GLOB,),
+    ).fetchall()
+    names = [row["name"] for row in rows]
+    if first is not None:
+        names = [name for name in names if name >= partition_name(first)]
+    if last is not None:
+        names = [name for name in names if name <= partition_name(last)]
+    return names
+
+
+def get_pass_partitions() -> list[str]:
+    conn = db_connect()
+    try:
+        return _partition_tables(conn)
+    finally:
+        conn.close()
+
+
+def _union_of(tables: list[str]) -> str:
+    return " UNION ALL ".join(f"SELECT {_PASS_COLUMNS} FROM {table}" for table in tables)
+
+
+def _rebuild_view(conn: sqlite3.Connection) -> None:
+    conn.execute(f"DROP VIEW IF EXISTS {ALL_PASSES_VIEW}")
+    conn.execute(f"CREATE VIEW {ALL_PASSES_VIEW} AS {_union_of([MAIN_PASS_TABLE, *_partition_tables(conn)])}")
+
+
+def _ensure_partition(conn: sqlite3.Connection, day: date) -> str:
+    """Create the day's partition (same columns, keys and change_log triggers as predicted_passes)."""
+    table = partition_name(day)
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    if exists:
+        return table
+    conn.execute(
+        f"""
+        CREATE TABLE {table} (
+            pass_id INTEGER PRIMARY KEY,
+            gs_id INTEGER NOT NULL,
+            s_id INTEGER NOT NULL,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP NOT NULL,
+            max_elevation REAL NOT NULL,
+            duration INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (gs_id) REFERENCES ground_stations(gs_id) ON DELETE CASCADE ON UPDATE CASCADE,
+            FOREIGN KEY (s_id) REFERENCES satellites(s_id) ON DELETE CASCADE ON UPDATE CASCADE,
+            CHECK (end_time > start_time),
+            UNIQUE (gs_id, s_id, start_time, end_time)
+        )
+        """
+    )
+    conn.execute(f"CREATE INDEX idx_{table}_by_start_time ON {table} (start_time)")
+    conn.execute(f"CREATE INDEX idx_{table}_by_s_id ON {table} (s_id)")
+    # Logged as predicted_passes: partitions are invisible to sync clients and ETags.
+    for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+        op = "DELETE" if event == "DELETE" else "UPSERT"
+        conn.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_{event.lower()}_log
+            AFTER {event} ON {table}
+            BEGIN
+                DELETE FROM change_log WHERE table_name = '{MAIN_PASS_TABLE}' AND row_id = {row}.pass_id;
+                INSERT INTO change_log (table_name, row_id, op) VALUES ('{MAIN_PASS_TABLE}', {row}.pass_id, '{op}');
+            END
+            """
+        )
+    _rebuild_view(conn)
+    return table
+
+
+def _allocate_pass_id(conn: sqlite3.Connection) -> int:
+    # Shares predicted_passes' sequence, so a pass keeps its id when moved there.
+    conn.execute(
+        f"""
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT '{MAIN_PASS_TABLE}', COALESCE((SELECT MAX(pass_id) FROM {MAIN_PASS_TABLE}), 0)
+        WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = '{MAIN_PASS_TABLE}')
+        """
+    )
+    return conn.execute(
+        f"UPDATE sqlite_sequence SET seq = seq + 1 WHERE name = '{MAIN_PASS_TABLE}' RETURNING seq"
+    ).fetchone()["seq"]
+
+
+def _fetch_routed(query: str, params: tuple, first: date | None = None, last: date | None = None, one: bool = False):
+    """Run `query` with {passes} replaced by predicted_passes plus the partitions for days in [first, last].
+
+    The partition list and the query are read in one transaction, so a partition
+    dropped in between can't be named.
+    """
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN")
+        source = _union_of([MAIN_PASS_TABLE, *_partition_tables(conn, first, last)])
+        cur = conn.execute(query.replace("{passes}", f"({source})"), params)
+        result = cur.fetchone() if one else cur.fetchall()
+        conn.commit()
+        return result
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _today(conn: sqlite3.Connection | None = None) -> date:
+    if conn is None:
+        return datetime.now(timezone.utc).date()
+    return date.fromisoformat(conn.execute("SELECT date('now') AS today").fetchone()["today"])
+
 
 def insert_predicted_pass_return_id(
     s_id: int,
@@ -10,9 +154,28 @@ def insert_predicted_pass_return_id(
     end_time: str,
     source: str,
 ) -> int | None:
-    # IGNORE keyword in query handles duplicate entries by ignoring them.
-    query = """
-            INSERT OR IGNORE INTO predicted_passes (
+    """Cache a pass in its end day's partition; returns the new pass_id, or None if it is already cached."""
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        table = _ensure_partition(conn, _day_of(end_time))
+        key = (gs_id, s_id, start_time, end_time)
+        duplicate = conn.execute(
+            f"""
+            SELECT 1 FROM {MAIN_PASS_TABLE} WHERE gs_id = ? AND s_id = ? AND start_time = ? AND end_time = ?
+            UNION ALL
+            SELECT 1 FROM {table} WHERE gs_id = ? AND s_id = ? AND start_time = ? AND end_time = ?
+            """,
+            (*key, *key),
+        ).fetchone()
+        if duplicate:
+            conn.rollback()
+            return None
+        pass_id = _allocate_pass_id(conn)
+        conn.execute(
+            f"""
+            INSERT INTO {table} (
+                pass_id,
                 s_id,
                 gs_id,
                 max_elevation,
@@ -21,16 +184,104 @@ def insert_predicted_pass_return_id(
                 end_time,
                 source
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-    rowcount = execute_rowcount(
-        query,
-        (s_id, gs_id, max_elevation, duration, start_time, end_time, source),
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (pass_id, s_id, gs_id, max_elevation, duration, start_time, end_time, source),
+        )
+        conn.commit()
+        return pass_id
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def move_pass_to_main(conn: sqlite3.Connection, pass_id: int) -> None:
+    """Move a pass from its day partition into predicted_passes, in the caller's write transaction.
+
+    Reservations reference predicted_passes, so this runs just before one is
+    inserted. A pass already there, or unknown (the insert's foreign key then
+    fails), is left alone. Deleting before inserting leaves the pass's change_log
+    entry an UPSERT.
+    """
+    if conn.execute(f"SELECT 1 FROM {MAIN_PASS_TABLE} WHERE pass_id = ?", (pass_id,)).fetchone():
+        return
+    row = conn.execute(f"SELECT end_time FROM {ALL_PASSES_VIEW} WHERE pass_id = ?", (pass_id,)).fetchone()
+    if row is None:
+        return
+    moved = conn.execute(
+        f"DELETE FROM {partition_name(_day_of(row['end_time']))} WHERE pass_id = ? RETURNING {_PASS_COLUMNS}",
+        (pass_id,),
+    ).fetchall()
+    conn.executemany(
+        f"INSERT INTO {MAIN_PASS_TABLE} ({_PASS_COLUMNS}) VALUES ({', '.join('?' for _ in range(9))})",
+        [tuple(passed) for passed in moved],
     )
-    if not rowcount:
-        return None
-    row = get_pass_id(gs_id, s_id, start_time, end_time)
-    return row["pass_id"] if row else None
+
+
+def delete_passes(conn: sqlite3.Connection, condition: str, params: tuple = (), limit: int = -1) -> int:
+    """Delete passes matching `condition` (on alias p) from predicted_passes and every partition.
+
+    Runs in the caller's transaction (starting a write transaction if none is
+    open); `limit` caps the total deleted, -1 = no limit. Returns rows deleted.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    deleted = 0
+    for table in [MAIN_PASS_TABLE, *_partition_tables(conn)]:
+        remaining = limit - deleted if limit >= 0 else -1
+        if remaining == 0:
+            break
+        deleted += conn.execute(
+            f"""
+            DELETE FROM {table}
+            WHERE pass_id IN (
+                SELECT p.pass_id
+                FROM {table} p
+                WHERE {condition}
+                LIMIT ?
+            )
+            """,
+            (*params, remaining),
+        ).rowcount
+    return deleted
+
+
+def drop_expired_pass_partitions() -> int:
+    """Drop the partitions of days before today (UTC), whose passes have all ended; returns passes dropped.
+
+    Partitions only hold unreserved passes, so each day goes with one DROP TABLE.
+    Its passes' change_log entries become tombstones first, so sync clients drop
+    them too.
+    """
+    conn = db_connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        expired = [table for table in _partition_tables(conn) if table < partition_name(_today(conn))]
+        dropped = 0
+        for table in expired:
+            conn.execute(
+                f"DELETE FROM change_log WHERE table_name = '{MAIN_PASS_TABLE}' AND row_id IN (SELECT pass_id FROM {table})"
+            )
+            dropped += conn.execute(
+                f"""
+                INSERT INTO change_log (table_name, row_id, op)
+                SELECT '{MAIN_PASS_TABLE}', pass_id, 'DELETE'
+                FROM {table}
+                ORDER BY pass_id
+                """
+            ).rowcount
+            conn.execute(f"DROP TABLE {table}")
+        if expired:
+            _rebuild_view(conn)
+        conn.commit()
+        return dropped
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 
 def insert_n2yo_pass_return_id(
@@ -53,21 +304,42 @@ def insert_n2yo_pass_return_id(
 
 
 def get_latest_pass_end_time(gs_id: int, s_id: int):
+    # Callers compare against a future horizon, so past days' partitions can't matter.
     query = """
             SELECT end_time
-            FROM predicted_passes
+            FROM {passes}
             WHERE gs_id = ? AND s_id = ?
             ORDER BY end_time DESC
             LIMIT 1
         """
-    return fetch_one(query, (gs_id, s_id))
+    return _fetch_routed(query, (gs_id, s_id), first=_today(), one=True)
+
+
+def get_reserved_pass_windows(gs_id: int, s_id: int):
+    """Windows of the pair's passes that a reservation still references and have not ended.
+
+    Referenced passes are always in predicted_passes, never in a partition.
+    """
+    query = """
+            SELECT p.start_time, p.end_time
+            FROM predicted_passes p
+            WHERE p.gs_id = ?
+              AND p.s_id = ?
+              AND p.end_time > CURRENT_TIMESTAMP
+              AND EXISTS (
+                SELECT 1
+                FROM reservations r
+                WHERE r.pass_id = p.pass_id
+              )
+        """
+    return fetch_all(query, (gs_id, s_id))
 
 
 def get_claimable_passes(s_id:int, gs_id:int):
     #claimable passes are unreserved/non-cancelled, non‑expired passes
     query = """
             SELECT p.pass_id, p.gs_id, s.norad_id, p.start_time, p.end_time, p.source
-            FROM predicted_passes as p
+            FROM {passes} as p
                 INNER JOIN satellites as s ON p.s_id = s.s_id
             WHERE p.s_id = ? and p.gs_id = ?
               AND start_time >= CURRENT_TIMESTAMP
@@ -79,35 +351,45 @@ def get_claimable_passes(s_id:int, gs_id:int):
               )
             ORDER BY start_time ASC
         """
-    return fetch_all(query, (s_id, gs_id))
+    return _fetch_routed(query, (s_id, gs_id), first=_today())
 
-def delete_unreserved_expired_passes():
+def delete_unreserved_expired_passes(limit: int = -1):
+    # Ended passes left in predicted_passes once their reservations are gone (and rows
+    # from before partitioning); partitions go with drop_expired_pass_partitions.
+    # The end_time range comes off idx_passes_by_end_time; `limit` bounds how many
+    # rows one call deletes (and so how long it holds the write lock). -1 = no limit.
     query = """
             DELETE FROM predicted_passes
-            WHERE end_time < CURRENT_TIMESTAMP
-            AND NOT EXISTS (
-                SELECT 1
-                FROM reservations r
-                WHERE r.pass_id = predicted_passes.pass_id
+            WHERE pass_id IN (
+                SELECT p.pass_id
+                FROM predicted_passes p
+                WHERE p.end_time < CURRENT_TIMESTAMP
+                  AND NOT EXISTS (
+                    SELECT 1
+                    FROM reservations r
+                    WHERE r.pass_id = p.pass_id
+                  )
+                LIMIT ?
             );
         """
-    return execute_rowcount(query)
+    return execute_rowcount(query, (limit,))
 
 
 
 def get_pass_id (gs_id: int, s_id: int, start_time: str, end_time: str):
     query = """
             SELECT pass_id
-            FROM predicted_passes
+            FROM {passes}
             WHERE gs_id = ? and s_id = ? and start_time = ? and end_time = ?
         """
-    return fetch_one(query, (gs_id, s_id, start_time, end_time))
+    day = _day_of(end_time)
+    return _fetch_routed(query, (gs_id, s_id, start_time, end_time), first=day, last=day, one=True)
 
 
 def get_pass_from_pass_id (pass_id: int):
     query = """
             SELECT *
-            FROM predicted_passes
+            FROM all_predicted_passes
             WHERE pass_id = ?
         """
     return fetch_one(query,(pass_id,))
@@ -115,7 +397,7 @@ def get_pass_from_pass_id (pass_id: int):
 def pass_exists(pass_id: int) -> bool:
     query = """
             SELECT 1
-            FROM predicted_passes
+            FROM all_predicted_passes
             WHERE pass_id = ?
         """
     return True if fetch_one(query, (pass_id,)) else False
@@ -123,7 +405,7 @@ def pass_exists(pass_id: int) -> bool:
 def pass_is_future(pass_id: int) -> bool:
     query = """
             SELECT 1
-            FROM predicted_passes
+            FROM all_predicted_passes
             WHERE pass_id = ?
               AND start_time > datetime('now', '+2 seconds')
         """
@@ -137,3 +419,80 @@ def pass_has_active_reservation(pass_id: int) -> bool:
               AND r.cancelled_at IS NULL
         """
     return True if fetch_one(query, (pass_id,)) else False
+
+
+def get_passes_for_reservation(pass_ids: list[int]):
+    """Everything needed to validate reservations for many passes in one query."""
+    placeholders = ",".join("?" for _ in pass_ids)
+    query = f"""
+            SELECT
+                p.pass_id,
+                p.gs_id,
+                p.s_id,
+                s.norad_id,
+                gs.status AS gs_status,
+                p.start_time > datetime('now', '+2 seconds') AS is_future,
+                EXISTS (
+                    SELECT 1
+                    FROM reservations r
+                    WHERE r.pass_id = p.pass_id
+                      AND r.cancelled_at IS NULL
+                ) AS is_reserved
+            FROM all_predicted_passes p
+                INNER JOIN satellites s ON s.s_id = p.s_id
+                INNER JOIN ground_stations gs ON gs.gs_id = p.gs_id
+            WHERE p.pass_id IN ({placeholders})
+        """
+    return fetch_all(query, tuple(pass_ids))
+
+
+def get_schedulable_passes(mission_ids: list[int], horizon_hours: int):
+    """Unreserved future passes at active stations for the missions' satellites.
+
+    A pass is returned once per mission whose satellites it belongs to.
+    """
+    placeholders = ",".join("?" for _ in mission_ids)
+    query = f"""
+            SELECT
+                p.pass_id,
+                p.gs_id,
+                p.s_id,
+                s.norad_id,
+                p.start_time,
+                p.end_time,
+                p.duration,
+                p.max_elevation,
+                m.mission_id,
+                m.priority
+            FROM {{passes}} p
+                INNER JOIN mission_satellites ms ON ms.s_id = p.s_id
+                INNER JOIN missions m ON m.mission_id = ms.mission_id
+                INNER JOIN satellites s ON s.s_id = p.s_id
+                INNER JOIN ground_stations gs ON gs.gs_id = p.gs_id
+            WHERE m.mission_id IN ({placeholders})
+              AND gs.status = 'ACTIVE'
+              AND p.start_time > datetime('now', '+2 seconds')
+              AND p.start_time < datetime('now', ?)
+              AND NOT EXISTS (
+                SELECT 1
+                FROM reservations r
+                WHERE r.pass_id = p.pass_id
+                  AND r.cancelled_at IS NULL
+              )
+        """
+    # A pass starting before the horizon ends can end on the following day.
+    last = (datetime.now(timezone.utc) + timedelta(hours=horizon_hours, days=1)).date()
+    return _fetch_routed(query, (*mission_ids, f"+{horizon_hours} hours"), first=_today(), last=last)
+
+
+def get_reserved_intervals(horizon_hours: int):
+    """Time windows of active reservations that can clash with passes in the horizon (all in predicted_passes)."""
+    query = """
+            SELECT r.gs_id, p.start_time, p.end_time
+            FROM reservations r
+                INNER JOIN predicted_passes p ON p.pass_id = r.pass_id
+            WHERE r.cancelled_at IS NULL
+              AND p.end_time > CURRENT_TIMESTAMP
+              AND p.start_time < datetime('now', ?)
+        """
+    return fetch_all(query, (f"+{horizon_hours} hours",))
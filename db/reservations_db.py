@@ -1,34 +1,28 @@
+import sqlite3
 from db.db_query import fetch_one, fetch_all, execute_rowcount
 from db.db_init import db_connect
+from db.archive_db import archive_connect
+import db.passes_db as p_db
 
-def get_all_reservations_with_details(include_cancelled: bool = False):
-    if include_cancelled:
-        query = """
-            SELECT
-                r.r_id,
-                r.mission_id,
-                r.pass_id,
-                r.gs_id,
-                s.norad_id,
-                p.start_time,
-                p.end_time,
-                r.created_at,
-                r.cancelled_at,
-                CASE
-                    WHEN r.cancelled_at IS NOT NULL THEN 'CANCELLED'
-                    WHEN p.start_time > CURRENT_TIMESTAMP THEN 'RESERVED'
-                    WHEN p.start_time <= CURRENT_TIMESTAMP AND p.end_time >= CURRENT_TIMESTAMP THEN 'ACTIVE'
-                    WHEN p.end_time < CURRENT_TIMESTAMP THEN 'COMPLETE'
-                    ELSE 'UNKNOWN'
-                END AS status
-            FROM reservations r
-            JOIN predicted_passes p ON p.pass_id = r.pass_id
-            JOIN satellites s ON s.s_id = r.s_id
-            ORDER BY r.created_at DESC
-        """
-        return fetch_all(query)
+RESERVATION_STATUSES = ("RESERVED", "ACTIVE", "COMPLETE", "CANCELLED")
 
-    query = """
+# Status is derived, so each value compiles to predicates on the underlying columns.
+_STATUS_PREDICATES = {
+    "CANCELLED": "r.cancelled_at IS NOT NULL",
+    "RESERVED": "r.cancelled_at IS NULL AND p.start_time > CURRENT_TIMESTAMP",
+    "ACTIVE": (
+        "r.cancelled_at IS NULL AND p.start_time <= CURRENT_TIMESTAMP "
+        "AND p.end_time >= CURRENT_TIMESTAMP"
+    ),
+    "COMPLETE": "r.cancelled_at IS NULL AND p.end_time < CURRENT_TIMESTAMP",
+}
+
+
+def _details_select(tier: str, where: str) -> str:
+    """Reservation detail SELECT over the live tables (tier "main") or the archive."""
+    # Archived rows may outlive their satellite, so the archive side keeps them via LEFT JOIN.
+    satellite_join = "JOIN" if tier == "main" else "LEFT JOIN"
+    return f"""
         SELECT
             r.r_id,
             r.mission_id,
@@ -45,14 +39,96 @@ def get_all_reservations_with_details(include_cancelled: bool = False):
                 WHEN p.start_time <= CURRENT_TIMESTAMP AND p.end_time >= CURRENT_TIMESTAMP THEN 'ACTIVE'
                 WHEN p.end_time < CURRENT_TIMESTAMP THEN 'COMPLETE'
                 ELSE 'UNKNOWN'
-            END AS status
-        FROM reservations r
-        JOIN predicted_passes p ON p.pass_id = r.pass_id
-        JOIN satellites s ON s.s_id = r.s_id
-        WHERE r.cancelled_at IS NULL
-        ORDER BY r.created_at DESC
+            END AS status,
+            (
+                SELECT GROUP_CONCAT(rc.command_type)
+                FROM {tier}.reservation_commands rc
+                WHERE rc.r_id = r.r_id
+            ) AS commands
+        FROM {tier}.reservations r
+        JOIN {tier}.predicted_passes p ON p.pass_id = r.pass_id
+        {satellite_join} main.satellites s ON s.s_id = r.s_id
+        {where}
     """
-    return fetch_all(query)
+
+
+def get_reservations_with_details(
+    include_cancelled: bool = False,
+    mission_id: int | None = None,
+    gs_id: int | None = None,
+    norad_id: int | None = None,
+    statuses: list[str] | None = None,
+    window_start: str | None = None,
+    window_end: str | None = None,
+    created_after: str | None = None,
+    limit: int | None = None,
+    include_archived: bool = False,
+):
+    """List reservations matching every given filter, newest first.
+
+    gs_id and norad_id filter on the reservation's own gs_id / s_id columns so the
+    (gs_id, created_at) and (s_id, created_at) indexes drive the scan. The window
+    keeps reservations whose pass overlaps [window_start, window_end]. An explicit
+    status filter takes precedence over include_cancelled. Commands are aggregated
+    per returned row through the (r_id, command_type) index, so the cost tracks
+    the result set rather than the whole reservation_commands table.
+
+    include_archived attaches the archive database and applies the same filters to
+    it, merging both tiers before ordering and limiting.
+    """
+    clauses = []
+    params: list = []
+    if mission_id is not None:
+        clauses.append("r.mission_id = ?")
+        params.append(mission_id)
+    if gs_id is not None:
+        clauses.append("r.gs_id = ?")
+        params.append(gs_id)
+    if norad_id is not None:
+        clauses.append("r.s_id = (SELECT s_id FROM main.satellites WHERE norad_id = ?)")
+        params.append(norad_id)
+    if statuses:
+        clauses.append("(" + " OR ".join(f"({_STATUS_PREDICATES[st]})" for st in statuses) + ")")
+    elif not include_cancelled:
+        clauses.append("r.cancelled_at IS NULL")
+    if window_start is not None:
+        clauses.append("p.end_time >= ?")
+        params.append(window_start)
+    if window_end is not None:
+        clauses.append("p.start_time <= ?")
+        params.append(window_end)
+    if created_after is not None:
+        clauses.append("r.created_at >= ?")
+        params.append(created_after)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = _details_select("main", where)
+    if include_archived:
+        # A batch caught between its archive copy and live delete is in both files;
+        # the live row wins.
+        archived_where = (
+            f"{where + ' AND' if where else 'WHERE'} r.r_id NOT IN (SELECT r_id FROM main.reservations)"
+        )
+        query = f"""
+            SELECT *
+            FROM ({query} UNION ALL {_details_select('archive', archived_where)})
+            ORDER BY created_at DESC
+        """
+        params = params * 2
+    else:
+        query += " ORDER BY r.created_at DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    if not include_archived:
+        return fetch_all(query, tuple(params))
+
+    conn = archive_connect()
+    try:
+        return conn.execute(query, tuple(params)).fetchall()
+    finally:
+        conn.close()
 
 
 def get_reservation_with_details_by_r_id(r_id: int):
@@ -85,15 +161,6 @@ def get_reservation_with_details_by_r_id(r_id: int):
     return fetch_one(query, (r_id,))
 
 
-def get_reservation_commands_grouped():
-    query = """
-        SELECT r_id, GROUP_CONCAT(command_type) AS commands
-        FROM reservation_commands
-        GROUP BY r_id
-    """
-    return fetch_all(query)
-
-
 def create_reservation_with_commands(
     pass_id: int,
     gs_id: int,
@@ -103,6 +170,8 @@ def create_reservation_with_commands(
 ) -> int:
     conn = db_connect()
     try:
+        conn.execute("BEGIN IMMEDIATE")
+        p_db.move_pass_to_main(conn, pass_id)
         cur = conn.execute(
             """
             INSERT INTO reservations (mission_id, pass_id, gs_id, s_id)
@@ -130,37 +199,65 @@ def create_reservation_with_commands(
         conn.close()
     
 
-def get_reservations_with_details_by_mission_id(
-    mission_id: int, include_cancelled: bool = False
-):
-    if include_cancelled:
-        query = """
-            SELECT
-                r.r_id,
-                r.mission_id,
-                r.pass_id,
-                r.gs_id,
-                s.norad_id,
-                p.start_time,
-                p.end_time,
-                r.created_at,
-                r.cancelled_at,
-                CASE
-                    WHEN r.cancelled_at IS NOT NULL THEN 'CANCELLED'
-                    WHEN p.start_time > CURRENT_TIMESTAMP THEN 'RESERVED'
-                    WHEN p.start_time <= CURRENT_TIMESTAMP AND p.end_time >= CURRENT_TIMESTAMP THEN 'ACTIVE'
-                    WHEN p.end_time < CURRENT_TIMESTAMP THEN 'COMPLETE'
-                    ELSE 'UNKNOWN'
-                END AS status
-            FROM reservations r
-            JOIN predicted_passes p ON p.pass_id = r.pass_id
-            JOIN satellites s ON s.s_id = r.s_id
-            WHERE r.mission_id = ?
-            ORDER BY r.created_at DESC
-        """
-        return fetch_all(query, (mission_id,))
+def create_reservations_batch(
+    items: list[tuple[int, int, int, int | None, list[str]]],
+    atomic: bool = True,
+) -> list[int | None]:
+    """Insert (pass_id, gs_id, s_id, mission_id, commands) items in one transaction.
 
-    query = """
+    With `atomic`, any integrity error rolls back the whole batch and is re-raised.
+    Otherwise each item runs in its own savepoint: a conflicting item is skipped
+    (its r_id is None) and the rest are still committed.
+    """
+    conn = db_connect()
+    r_ids: list[int | None] = []
+    try:
+        # Explicit BEGIN so releasing a savepoint never commits on its own; IMMEDIATE
+        # so moving passes out of their partitions reads what it then writes.
+        conn.execute("BEGIN IMMEDIATE")
+        for pass_id, gs_id, s_id, mission_id, commands in items:
+            if not atomic:
+                conn.execute("SAVEPOINT reservation_item")
+            try:
+                p_db.move_pass_to_main(conn, pass_id)
+                cur = conn.execute(
+                    """
+                    INSERT INTO reservations (mission_id, pass_id, gs_id, s_id)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (mission_id, pass_id, gs_id, s_id),
+                )
+                r_id = cur.lastrowid
+                conn.executemany(
+                    """
+                    INSERT INTO reservation_commands (r_id, command_type)
+                    VALUES (?, ?)
+                    """,
+                    ((r_id, command) for command in commands),
+                )
+            except sqlite3.IntegrityError:
+                if atomic:
+                    raise
+                conn.execute("ROLLBACK TO reservation_item")
+                conn.execute("RELEASE reservation_item")
+                r_ids.append(None)
+                continue
+            if not atomic:
+                conn.execute("RELEASE reservation_item")
+            r_ids.append(r_id)
+
+        conn.commit()
+        return r_ids
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_reservations_with_details_by_r_ids(r_ids: list[int]):
+    placeholders = ",".join("?" for _ in r_ids)
+    query = f"""
         SELECT
             r.r_id,
             r.mission_id,
@@ -177,15 +274,18 @@ def get_reservations_with_details_by_mission_id(
                 WHEN p.start_time <= CURRENT_TIMESTAMP AND p.end_time >= CURRENT_TIMESTAMP THEN 'ACTIVE'
                 WHEN p.end_time < CURRENT_TIMESTAMP THEN 'COMPLETE'
                 ELSE 'UNKNOWN'
-            END AS status
+            END AS status,
+            GROUP_CONCAT(rc.command_type) AS commands
         FROM reservations r
         JOIN predicted_passes p ON p.pass_id = r.pass_id
         JOIN satellites s ON s.s_id = r.s_id
-        WHERE r.mission_id = ?
-          AND r.cancelled_at IS NULL
-        ORDER BY r.created_at DESC
+        LEFT JOIN reservation_commands rc ON rc.r_id = r.r_id
+        WHERE r.r_id IN ({placeholders})
+        GROUP BY r.r_id
+        ORDER BY r.r_id
     """
-    return fetch_all(query, (mission_id,))
+    return fetch_all(query, tuple(r_ids))
+
 
 def cancel_reservation_by_r_id(r_id: int):
     query = """
@@ -194,3 +294,103 @@ def cancel_reservation_by_r_id(r_id: int):
             WHERE r_id = ?
         """
     return execute_rowcount(query, (r_id,))
+
+
+def get_next_status_change() -> str | None:
+    """Earliest future moment at which some active reservation's derived status flips.
+
+    RESERVED -> ACTIVE happens at start_time and ACTIVE -> COMPLETE just after end_time.
+    """
+    query = """
+        SELECT MIN(boundary) AS next_change
+        FROM (
+            SELECT MIN(p.start_time) AS boundary
+            FROM reservations r
+            JOIN predicted_passes p ON p.pass_id = r.pass_id
+            WHERE r.cancelled_at IS NULL
+              AND p.start_time > CURRENT_TIMESTAMP
+            UNION ALL
+            SELECT MIN(p.end_time) AS boundary
+            FROM reservations r
+            JOIN predicted_passes p ON p.pass_id = r.pass_id
+            WHERE r.cancelled_at IS NULL
+              AND p.end_time >= CURRENT_TIMESTAMP
+        )
+    """
+    row = fetch_one(query)
+    return row["next_change"] if row else None
+
+
+RESERVATION_EXPORT_COLUMNS = (
+    "r_id",
+    "mission_id",
+    "pass_id",
+    "gs_id",
+    "gs_code",
+    "norad_id",
+    "s_name",
+    "start_time",
+    "end_time",
+    "duration",
+    "max_elevation",
+    "created_at",
+    "cancelled_at",
+    "status",
+    "commands",
+)
+
+
+def iter_reservation_export_batches(chunk_size: int = 10000, include_cancelled: bool = True):
+    """Yield reservation history as lists of plain tuples, `chunk_size` rows at a time.
+
+    Rows come straight off one cursor via fetchmany (no sqlite3.Row / dict per
+    row), in RESERVATION_EXPORT_COLUMNS order, so memory stays bounded by the chunk.
+    """
+    where = "" if include_cancelled else "WHERE r.cancelled_at IS NULL"
+    query = f"""
+        SELECT
+            r.r_id,
+            r.mission_id,
+            r.pass_id,
+            r.gs_id,
+            gs.gs_code,
+            s.norad_id,
+            s.s_name,
+            p.start_time,
+            p.end_time,
+            p.duration,
+            p.max_elevation,
+            r.created_at,
+            r.cancelled_at,
+            CASE
+                WHEN r.cancelled_at IS NOT NULL THEN 'CANCELLED'
+                WHEN p.start_time > CURRENT_TIMESTAMP THEN 'RESERVED'
+                WHEN p.start_time <= CURRENT_TIMESTAMP AND p.end_time >= CURRENT_TIMESTAMP THEN 'ACTIVE'
+                WHEN p.end_time < CURRENT_TIMESTAMP THEN 'COMPLETE'
+                ELSE 'UNKNOWN'
+            END AS status,
+            (
+                SELECT GROUP_CONCAT(rc.command_type)
+                FROM reservation_commands rc
+                WHERE rc.r_id = r.r_id
+            ) AS commands
+        FROM reservations r
+        JOIN predicted_passes p ON p.pass_id = r.pass_id
+        JOIN satellites s ON s.s_id = r.s_id
+        JOIN ground_stations gs ON gs.gs_id = r.gs_id
+        {where}
+        ORDER BY r.r_id
+    """
+    # StreamingResponse advances this generator from threadpool workers, so each
+    # chunk (and the final close) may run on a different thread.
+    conn = db_connect(check_same_thread=False)
+    conn.row_factory = None
+    try:
+        cur = conn.execute(query)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
@@ -1,6 +1,8 @@
 import sqlite3
+from collections.abc import Iterable
 from db.db_init import db_connect
 from db.db_query import execute_row_id, fetch_all, fetch_one, execute_rowcount
+import db.passes_db as p_db
 
 
 def insert_new_satellite(norad_id: int, s_name: str) -> int:
@@ -66,25 +68,6 @@ def sat_has_active_reservations(s_id: int):
         """
     return True if fetch_one(query, (s_id,)) else False
 
-def delete_satellite_and_reservations(s_id: int) -> tuple[int, int]:
-    conn = db_connect()
-    try:
-        reservations_cur = conn.execute(
-            "DELETE FROM reservations WHERE s_id = ?",
-            (s_id,),
-        )
-        satellite_cur = conn.execute(
-            "DELETE FROM satellites WHERE s_id = ?",
-            (s_id,),
-        )
-        conn.commit()
-        return reservations_cur.rowcount, satellite_cur.rowcount
-    except sqlite3.Error:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
-
 def update_satellite(s_id: int, updates: dict):
     if not updates:
         return 0
@@ -105,10 +88,224 @@ def update_satellite(s_id: int, updates: dict):
     return execute_rowcount(query, tuple(params))
 
 
-def update_satellite_tle(s_id: int, tle_line1: str, tle_line2: str, tle_updated_at: str) -> int:
+def update_satellite_tle(
+    s_id: int,
+    tle_line1: str,
+    tle_line2: str,
+    tle_updated_at: str,
+    tle_epoch: str | None = None,
+    tle_etag: str | None = None,
+    tle_last_modified: str | None = None,
+) -> int:
+    """Store a new element set and drop unreserved future passes predicted from the old one."""
+    conn = db_connect()
+    try:
+        cur = conn.execute(
+            """
+            UPDATE satellites
+            SET tle_line1 = ?, tle_line2 = ?, tle_updated_at = ?,
+                tle_epoch = ?, tle_etag = ?, tle_last_modified = ?
+            WHERE s_id = ?
+            """,
+            (tle_line1, tle_line2, tle_updated_at, tle_epoch, tle_etag, tle_last_modified, s_id),
+        )
+        _delete_unreserved_future_passes(conn, (s_id,))
+        conn.commit()
+        return cur.rowcount
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def mark_satellite_tle_checked(
+    s_id: int,
+    tle_updated_at: str,
+    tle_etag: str | None = None,
+    tle_last_modified: str | None = None,
+) -> int:
+    """Record an upstream check that found no newer element set."""
     query = """
             UPDATE satellites
-            SET tle_line1 = ?, tle_line2 = ?, tle_updated_at = ?
+            SET tle_updated_at = ?,
+                tle_etag = COALESCE(?, tle_etag),
+                tle_last_modified = COALESCE(?, tle_last_modified)
             WHERE s_id = ?
         """
-    return execute_rowcount(query, (tle_line1, tle_line2, tle_updated_at, s_id))
+    return execute_rowcount(query, (tle_updated_at, tle_etag, tle_last_modified, s_id))
+
+
+def _delete_unreserved_future_passes(conn: sqlite3.Connection, s_ids) -> None:
+    s_ids = list(s_ids)
+    # Chunked to stay well under SQLite's bound-parameter limit on large ingests.
+    for start in range(0, len(s_ids), 500):
+        chunk = s_ids[start:start + 500]
+        p_db.delete_passes(
+            conn,
+            f"""
+            p.s_id IN ({",".join("?" for _ in chunk)})
+              AND p.start_time >= CURRENT_TIMESTAMP
+              AND NOT EXISTS (
+                SELECT 1
+                FROM reservations r
+                WHERE r.pass_id = p.pass_id
+              )
+            """,
+            tuple(chunk),
+        )
+
+
+def get_tracked_norad_ids() -> set[int]:
+    rows = fetch_all("SELECT norad_id FROM satellites")
+    return {row["norad_id"] for row in rows} if rows else set()
+
+
+def update_satellite_tles_bulk(
+    tles: list[tuple[int, str, str, str | None]],
+    tle_updated_at: str,
+) -> tuple[int, int]:
+    """Apply (norad_id, line1, line2, epoch) records in a single transaction.
+
+    Only element sets that differ from the stored lines are rewritten, and only
+    those satellites lose their cached future passes; the rest just record the
+    check time. Returns (changed, unchanged).
+    """
+    conn = db_connect()
+    try:
+        stored = {
+            row["norad_id"]: row
+            for row in conn.execute(
+                "SELECT s_id, norad_id, tle_line1, tle_line2 FROM satellites"
+            )
+        }
+        changed = []
+        unchanged = []
+        for norad_id, line1, line2, epoch in tles:
+            row = stored.get(norad_id)
+            if row is None:
+                continue
+            if (row["tle_line1"], row["tle_line2"]) == (line1, line2):
+                unchanged.append((tle_updated_at, row["s_id"]))
+            else:
+                changed.append((line1, line2, tle_updated_at, epoch, row["s_id"]))
+
+        conn.executemany(
+            """
+            UPDATE satellites
+            SET tle_line1 = ?, tle_line2 = ?, tle_updated_at = ?, tle_epoch = ?
+            WHERE s_id = ?
+            """,
+            changed,
+        )
+        conn.executemany(
+            "UPDATE satellites SET tle_updated_at = ? WHERE s_id = ?",
+            unchanged,
+        )
+        _delete_unreserved_future_passes(conn, (record[-1] for record in changed))
+        conn.commit()
+        return len(changed), len(unchanged)
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def upsert_satellite_tles(
+    records: Iterable[tuple[int, str, str, str, str | None]],
+    tle_updated_at: str,
+    register_new: bool = True,
+) -> int:
+    """Upsert (norad_id, s_name, line1, line2, epoch) records in a single transaction.
+
+    Records are consumed as they are produced, so callers can stream them from disk.
+    An existing satellite is only updated when the incoming epoch is newer than the
+    stored one; changed satellites lose their unreserved future passes.
+    """
+    if register_new:
+        query = """
+            INSERT INTO satellites (norad_id, s_name, tle_line1, tle_line2, tle_epoch, tle_updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (norad_id) DO UPDATE SET
+                tle_line1 = excluded.tle_line1,
+                tle_line2 = excluded.tle_line2,
+                tle_epoch = excluded.tle_epoch,
+                tle_updated_at = excluded.tle_updated_at
+            WHERE excluded.tle_epoch > COALESCE(satellites.tle_epoch, '')
+            RETURNING s_id
+        """
+        params = (
+            (norad_id, s_name, line1, line2, epoch, tle_updated_at)
+            for norad_id, s_name, line1, line2, epoch in records
+        )
+    else:
+        query = """
+            UPDATE satellites
+            SET tle_line1 = ?, tle_line2 = ?, tle_epoch = ?, tle_updated_at = ?
+            WHERE norad_id = ?
+              AND ? > COALESCE(tle_epoch, '')
+            RETURNING s_id
+        """
+        params = (
+            (line1, line2, epoch, tle_updated_at, norad_id, epoch)
+            for norad_id, _, line1, line2, epoch in records
+        )
+
+    conn = db_connect()
+    try:
+        # Only rows actually inserted or updated come back from RETURNING; a stale
+        # epoch skips the update and returns nothing.
+        changed = []
+        for record in params:
+            row = conn.execute(query, record).fetchone()
+            if row is not None:
+                changed.append(row["s_id"])
+        _delete_unreserved_future_passes(conn, changed)
+        conn.commit()
+        return len(changed)
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_existing_norad_ids(norad_ids: list[int]) -> set[int]:
+    placeholders = ",".join("?" for _ in norad_ids)
+    rows = fetch_all(
+        f"SELECT norad_id FROM satellites WHERE norad_id IN ({placeholders})",
+        tuple(norad_ids),
+    )
+    return {row["norad_id"] for row in rows} if rows else set()
+
+
+def insert_satellites_bulk(
+    records: list[tuple[int, str, str | None, str | None, str | None]],
+    tle_updated_at: str | None,
+) -> dict[int, int | None]:
+    """Insert (norad_id, s_name, line1, line2, epoch) records in one transaction.
+
+    Satellites registered meanwhile are left untouched. Returns {norad_id: s_id},
+    with None for those that already existed.
+    """
+    conn = db_connect()
+    try:
+        result = {}
+        for norad_id, s_name, line1, line2, epoch in records:
+            cur = conn.execute(
+                """
+                INSERT INTO satellites (norad_id, s_name, tle_line1, tle_line2, tle_epoch, tle_updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (norad_id) DO NOTHING
+                """,
+                (norad_id, s_name, line1, line2, epoch, tle_updated_at if line1 else None),
+            )
+            result[norad_id] = cur.lastrowid if cur.rowcount else None
+        conn.commit()
+        return result
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -16,6 +16,18 @@ CREATE TABLE IF NOT EXISTS ground_stations (
     UNIQUE (lat, lon)
 );
 -- =========================
+-- Ground station horizon masks
+-- Minimum trackable elevation per degree of azimuth (terrain, buildings).
+-- Stations without a row use a flat 0-degree horizon.
+-- =========================
+CREATE TABLE IF NOT EXISTS gs_horizon_masks (
+    gs_id INTEGER PRIMARY KEY,
+    mask BLOB NOT NULL CHECK (length(mask) = 720),
+    -- 360 little-endian int16 elevations in tenths of a degree, index = azimuth (0 = north, clockwise)
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (gs_id) REFERENCES ground_stations(gs_id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+-- =========================
 -- Satellites
 -- =========================
 CREATE TABLE IF NOT EXISTS satellites (
@@ -25,6 +37,12 @@ CREATE TABLE IF NOT EXISTS satellites (
     tle_line1 TEXT,
     tle_line2 TEXT,
     tle_updated_at TIMESTAMP,
+    -- last time upstream was checked, whether or not the TLE changed
+    tle_epoch TIMESTAMP,
+    -- epoch parsed from tle_line1
+    tle_etag TEXT,
+    tle_last_modified TEXT,
+    -- HTTP validators for conditional refreshes
     date_added TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 -- =========================
@@ -77,6 +95,13 @@ CREATE TABLE IF NOT EXISTS predicted_passes (
     CHECK (end_time > start_time),
     UNIQUE (gs_id, s_id, start_time, end_time)
 );
+-- Cached, unreserved passes live in per-day partition tables (passes_YYYYMMDD, by
+-- UTC day of end_time) created by db/passes_db.py; predicted_passes keeps the
+-- passes reservations reference. This view unions them and is rebuilt whenever a
+-- partition is created or dropped.
+CREATE VIEW IF NOT EXISTS all_predicted_passes AS
+SELECT pass_id, gs_id, s_id, start_time, end_time, max_elevation, duration, source, created_at
+FROM predicted_passes;
 -- =========================
 -- Reservations
 -- Status and time window are derived by join to predicted_passes.
@@ -109,10 +134,60 @@ CREATE TABLE IF NOT EXISTS reservation_commands (
     FOREIGN KEY (command_type) REFERENCES command_catalog(command_type)
 );
 -- =========================
+-- Idempotency keys
+-- Stored first responses for write requests sent with an Idempotency-Key header.
+-- =========================
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    idem_key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    status_code INTEGER,
+    -- NULL while the first request is still in flight
+    headers TEXT,
+    -- JSON list of [name, value]
+    body BLOB,
+    -- zlib-compressed response body
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL
+);
+-- =========================
+-- Maintenance job checkpoints
+-- Last position processed by an interrupted incremental job, so it can resume.
+-- =========================
+CREATE TABLE IF NOT EXISTS maintenance_checkpoints (
+    job TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+-- =========================
+-- Background jobs
+-- Ground station deactivation/deletion and satellite deletion, run in chunks.
+-- Counters and updated_at move with every committed chunk.
+-- =========================
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL CHECK (kind IN ('gs_deactivate', 'gs_delete', 'satellite_delete')),
+    target_id INTEGER NOT NULL,
+    -- gs_id or s_id; not a foreign key, the job outlives a deleted target
+    status TEXT NOT NULL DEFAULT 'PENDING' CHECK (
+        status IN ('PENDING', 'RUNNING', 'COMPLETED', 'CANCELLED', 'FAILED')
+    ),
+    reservations_cancelled INTEGER NOT NULL DEFAULT 0,
+    reservations_deleted INTEGER NOT NULL DEFAULT 0,
+    passes_deleted INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+-- =========================
 -- Indexes
 -- =========================
 -- Pass prediction queries
 CREATE INDEX IF NOT EXISTS idx_passes_by_gs_sat_start ON predicted_passes (gs_id, s_id, start_time);
+-- Expiry sweeps range-scan passes by end time
+CREATE INDEX IF NOT EXISTS idx_passes_by_end_time ON predicted_passes (end_time);
 -- Reservation queries
 CREATE INDEX IF NOT EXISTS idx_reservations_by_mission ON reservations (mission_id, created_at);
 -- Fast lookup / joins by pass_id
@@ -125,3 +200,177 @@ CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_command_per_reservation ON reservat
 -- Enforce one ACTIVE reservation per pass (cancelled reservations don't block)
 CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_active_reservation_per_pass ON reservations (pass_id)
 WHERE cancelled_at IS NULL;
+-- Purging expired idempotency keys
+CREATE INDEX IF NOT EXISTS idx_idempotency_by_expiry ON idempotency_keys (expires_at);
+-- Unfinished jobs, for resuming after a restart and for one job per target
+CREATE INDEX IF NOT EXISTS idx_jobs_unfinished ON jobs (kind, target_id)
+WHERE status IN ('PENDING', 'RUNNING');
+-- =========================
+-- Change log (incremental sync)
+-- One entry per row: the latest change. Versions come from AUTOINCREMENT, so they
+-- only ever increase; DELETE entries are tombstones for rows that are gone.
+-- =========================
+CREATE TABLE IF NOT EXISTS change_log (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('UPSERT', 'DELETE')),
+    changed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_change_log_by_row ON change_log (table_name, row_id);
+-- Per-table MAX(version), used as a cheap change counter for ETags
+CREATE INDEX IF NOT EXISTS idx_change_log_by_table_version ON change_log (table_name, version);
+-- Databases created before the change log existed: record every current row once.
+INSERT INTO change_log (table_name, row_id, op)
+SELECT table_name, row_id, 'UPSERT'
+FROM (
+        SELECT 'ground_stations' AS table_name, gs_id AS row_id FROM ground_stations
+        UNION ALL
+        SELECT 'satellites' AS table_name, s_id AS row_id FROM satellites
+        UNION ALL
+        SELECT 'missions' AS table_name, mission_id AS row_id FROM missions
+        UNION ALL
+        SELECT 'predicted_passes' AS table_name, pass_id AS row_id FROM predicted_passes
+        UNION ALL
+        SELECT 'reservations' AS table_name, r_id AS row_id FROM reservations
+    )
+WHERE NOT EXISTS (SELECT 1 FROM change_log);
+-- command_catalog is only versioned for ETags (keyed by its implicit rowid), not synced.
+CREATE TRIGGER IF NOT EXISTS trg_command_catalog_insert_log
+AFTER INSERT ON command_catalog
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'command_catalog' AND row_id = NEW.rowid;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('command_catalog', NEW.rowid, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_command_catalog_update_log
+AFTER UPDATE ON command_catalog
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'command_catalog' AND row_id = NEW.rowid;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('command_catalog', NEW.rowid, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_command_catalog_delete_log
+AFTER DELETE ON command_catalog
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'command_catalog' AND row_id = OLD.rowid;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('command_catalog', OLD.rowid, 'DELETE');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_ground_stations_insert_log
+AFTER INSERT ON ground_stations
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'ground_stations' AND row_id = NEW.gs_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('ground_stations', NEW.gs_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_ground_stations_update_log
+AFTER UPDATE ON ground_stations
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'ground_stations' AND row_id = NEW.gs_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('ground_stations', NEW.gs_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_ground_stations_delete_log
+AFTER DELETE ON ground_stations
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'ground_stations' AND row_id = OLD.gs_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('ground_stations', OLD.gs_id, 'DELETE');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_satellites_insert_log
+AFTER INSERT ON satellites
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'satellites' AND row_id = NEW.s_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('satellites', NEW.s_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_satellites_update_log
+AFTER UPDATE ON satellites
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'satellites' AND row_id = NEW.s_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('satellites', NEW.s_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_satellites_delete_log
+AFTER DELETE ON satellites
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'satellites' AND row_id = OLD.s_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('satellites', OLD.s_id, 'DELETE');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_missions_insert_log
+AFTER INSERT ON missions
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'missions' AND row_id = NEW.mission_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('missions', NEW.mission_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_missions_update_log
+AFTER UPDATE ON missions
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'missions' AND row_id = NEW.mission_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('missions', NEW.mission_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_missions_delete_log
+AFTER DELETE ON missions
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'missions' AND row_id = OLD.mission_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('missions', OLD.mission_id, 'DELETE');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_predicted_passes_insert_log
+AFTER INSERT ON predicted_passes
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'predicted_passes' AND row_id = NEW.pass_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('predicted_passes', NEW.pass_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_predicted_passes_update_log
+AFTER UPDATE ON predicted_passes
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'predicted_passes' AND row_id = NEW.pass_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('predicted_passes', NEW.pass_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_predicted_passes_delete_log
+AFTER DELETE ON predicted_passes
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'predicted_passes' AND row_id = OLD.pass_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('predicted_passes', OLD.pass_id, 'DELETE');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_reservations_insert_log
+AFTER INSERT ON reservations
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'reservations' AND row_id = NEW.r_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('reservations', NEW.r_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_reservations_update_log
+AFTER UPDATE ON reservations
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'reservations' AND row_id = NEW.r_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('reservations', NEW.r_id, 'UPSERT');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_reservations_delete_log
+AFTER DELETE ON reservations
+BEGIN
+    DELETE FROM change_log WHERE table_name = 'reservations' AND row_id = OLD.r_id;
+    INSERT INTO change_log (table_name, row_id, op) VALUES ('reservations', OLD.r_id, 'DELETE');
+END;
+-- =========================
+-- Ground station spatial index
+-- R*Tree over station coordinates (a point stored as a zero-size box), kept in
+-- step with ground_stations by triggers. Used for proximity and visibility
+-- searches; R*Tree coordinates are 32-bit floats, so callers re-check exact distance.
+-- =========================
+CREATE VIRTUAL TABLE IF NOT EXISTS gs_rtree USING rtree(gs_id, min_lat, max_lat, min_lon, max_lon);
+-- Databases created before the index existed.
+INSERT INTO gs_rtree (gs_id, min_lat, max_lat, min_lon, max_lon)
+SELECT gs_id, lat, lat, lon, lon
+FROM ground_stations
+WHERE gs_id NOT IN (SELECT gs_id FROM gs_rtree);
+CREATE TRIGGER IF NOT EXISTS trg_ground_stations_insert_rtree
+AFTER INSERT ON ground_stations
+BEGIN
+    INSERT INTO gs_rtree (gs_id, min_lat, max_lat, min_lon, max_lon)
+    VALUES (NEW.gs_id, NEW.lat, NEW.lat, NEW.lon, NEW.lon);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_ground_stations_update_rtree
+AFTER UPDATE OF gs_id, lat, lon ON ground_stations
+BEGIN
+    DELETE FROM gs_rtree WHERE gs_id = OLD.gs_id;
+    INSERT INTO gs_rtree (gs_id, min_lat, max_lat, min_lon, max_lon)
+    VALUES (NEW.gs_id, NEW.lat, NEW.lat, NEW.lon, NEW.lon);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_ground_stations_delete_rtree
+AFTER DELETE ON ground_stations
+BEGIN
+    DELETE FROM gs_rtree WHERE gs_id = OLD.gs_id;
+END;
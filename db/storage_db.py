@@ -0,0 +1,94 @@
+import sqlite3
+from pathlib import Path
+
+from db import db_init
+from db.db_init import db_connect
+
+_AUTO_VACUUM_MODES = {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}
+
+
+def _pragma_value(conn: sqlite3.Connection, name: str):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def get_storage_stats() -> dict:
+    """File sizes and page accounting for the live database."""
+    path = Path(db_init.DB_PATH)
+    wal_path = path.with_name(path.name + "-wal")
+    conn = db_connect()
+    try:
+        page_size = _pragma_value(conn, "page_size")
+        page_count = _pragma_value(conn, "page_count")
+        freelist_count = _pragma_value(conn, "freelist_count")
+        auto_vacuum = _pragma_value(conn, "auto_vacuum")
+    finally:
+        conn.close()
+    return {
+        "file_bytes": path.stat().st_size if path.exists() else 0,
+        "wal_bytes": wal_path.stat().st_size if wal_path.exists() else 0,
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "auto_vacuum": _AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum)),
+    }
+
+
+def migrate_to_incremental_auto_vacuum() -> bool:
+    """Switch an existing database to auto_vacuum=INCREMENTAL; True if it was changed.
+
+    The mode only changes through a full VACUUM, which rewrites the whole file
+    under an exclusive lock, so this is for a maintenance window, not the scheduler.
+    """
+    conn = db_connect()
+    try:
+        if _pragma_value(conn, "auto_vacuum") == 2:
+            return False
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return True
+    finally:
+        conn.close()
+
+
+def incremental_vacuum(pages: int) -> int:
+    """Return up to `pages` free pages to the filesystem; returns how many were freed."""
+    conn = db_connect()
+    try:
+        before = _pragma_value(conn, "freelist_count")
+        # The pragma frees one page per VM step; execute() stops after the first
+        # step, while executescript() runs it to completion.
+        conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        return before - _pragma_value(conn, "freelist_count")
+    finally:
+        conn.close()
+
+
+def optimize(analysis_limit: int) -> None:
+    """PRAGMA optimize: re-analyze only tables whose statistics look stale."""
+    conn = db_connect()
+    try:
+        conn.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+
+def analyze(analysis_limit: int) -> None:
+    """Refresh planner statistics for every index, sampling at most ~analysis_limit rows each."""
+    conn = db_connect()
+    try:
+        conn.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def checkpoint_wal() -> dict:
+    """Copy the WAL into the database and truncate the WAL file to zero bytes."""
+    conn = db_connect()
+    try:
+        busy, log_frames, checkpointed = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    finally:
+        conn.close()
+    return {"busy": bool(busy), "log_frames": log_frames, "checkpointed_frames": checkpointed}
@@ -0,0 +1,60 @@
+"""Script to move finished reservations older than the retention window into the archive database."""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repo root is on sys.path when running as a script.
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.logging import setup_logging
+from src.services.archive import (
+    ARCHIVE_RETENTION_DAYS,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_PAUSE_SECONDS,
+    archive_reservations,
+)
+
+setup_logging()
+logger = logging.getLogger("reservations")
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=ARCHIVE_RETENTION_DAYS,
+        help="Keep reservations whose pass ended within this many days.",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Reservations moved per transaction.")
+    parser.add_argument("--pause", type=float, default=DEFAULT_PAUSE_SECONDS, help="Seconds to sleep between batches.")
+    args = parser.parse_args(argv)
+
+    try:
+        result = archive_reservations(
+            retention_days=args.retention_days,
+            batch_size=args.batch_size,
+            pause=args.pause,
+        )
+        logger.info(
+            "Archived %s reservations and %s passes in %s batches (%.2fs).",
+            result["reservations"],
+            result["passes"],
+            result["batches"],
+            result["seconds"],
+        )
+        return 0
+    except KeyboardInterrupt:
+        logger.warning("Archiving interrupted; the next run picks up the remaining reservations.")
+        return 1
+    except Exception:
+        logger.exception("Archiving failed")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 """Script to remove expired, cancelled reservations. Plan to run script with job scheduler (Cron)"""
 from __future__ import annotations
 
+import argparse
 import logging
 import sys
 from pathlib import Path
@@ -11,16 +12,38 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from src.core.logging import setup_logging
-from db import reservations_db as r_db
+from src.services.cleanup import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_PAUSE_SECONDS,
+    cleanup_cancelled_reservations,
+)
 
 setup_logging()
 logger = logging.getLogger("reservations")
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="r_ids scanned per transaction.")
+    parser.add_argument("--pause", type=float, default=DEFAULT_PAUSE_SECONDS, help="Seconds to sleep between batches.")
+    parser.add_argument("--restart", action="store_true", help="Ignore a saved checkpoint and start from the beginning.")
+    args = parser.parse_args(argv)
+
     try:
-        deleted = r_db.delete_cancelled_expired_passes()
-        logger.info("Deleted %s cancelled reservations with expired passes.", deleted)
+        result = cleanup_cancelled_reservations(
+            batch_size=args.batch_size,
+            pause=args.pause,
+            restart=args.restart,
+        )
+        logger.info(
+            "Deleted %s cancelled reservations with expired passes in %s batches (%.2fs).",
+            result["deleted"],
+            result["batches"],
+            result["seconds"],
+        )
         return 0
+    except KeyboardInterrupt:
+        logger.warning("Cleanup interrupted; the next run resumes from the last checkpoint.")
+        return 1
     except Exception:
         logger.exception("Cleanup failed")
         return 1
@@ -0,0 +1,63 @@
+"""Script to export the reservation history to CSV, Parquet or Arrow IPC for reporting."""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Ensure repo root is on sys.path when running as a script.
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.logging import setup_logging
+from src.services import export
+
+setup_logging()
+logger = logging.getLogger("export")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", help="Output file path, or '-' for stdout.")
+    parser.add_argument("--format", choices=export.EXPORT_FORMATS, default="csv")
+    parser.add_argument("--chunk-size", type=int, default=export.EXPORT_CHUNK_SIZE)
+    parser.add_argument("--exclude-cancelled", action="store_true", help="Skip cancelled reservations.")
+    args = parser.parse_args(argv)
+
+    if args.format != "csv" and not export.arrow_available():
+        logger.error("%s export requires the pyarrow package.", args.format)
+        return 1
+
+    started = time.monotonic()
+    written = 0
+    try:
+        chunks = export.iter_reservation_export(
+            args.format,
+            include_cancelled=not args.exclude_cancelled,
+            chunk_size=args.chunk_size,
+        )
+        out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        logger.info(
+            "Exported reservations as %s: %s bytes in %.2fs.",
+            args.format,
+            written,
+            time.monotonic() - started,
+        )
+        return 0
+    except Exception:
+        logger.exception("Export failed")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+"""Script to bulk register ground stations from a CSV or GeoJSON file."""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repo root is on sys.path when running as a script.
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.logging import setup_logging
+from src.services.gs_import import GS_IMPORT_FORMATS, import_ground_stations
+
+setup_logging()
+logger = logging.getLogger("groundstations")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", type=Path, help="CSV (gs_code,lon,lat,alt[,status]) or GeoJSON FeatureCollection.")
+    parser.add_argument(
+        "--format",
+        choices=GS_IMPORT_FORMATS,
+        help="Defaults to csv, or geojson for .geojson/.json files.",
+    )
+    parser.add_argument(
+        "--partial",
+        action="store_true",
+        help="Import the valid rows even if others fail (default: all or nothing).",
+    )
+    args = parser.parse_args(argv)
+    fmt = args.format or ("geojson" if args.path.suffix.lower() in (".geojson", ".json") else "csv")
+
+    try:
+        with args.path.open(encoding="utf-8-sig", newline="") as fh:
+            result = import_ground_stations(fh, fmt, atomic=not args.partial)
+    except Exception:
+        logger.exception("Ground station import failed")
+        return 1
+
+    for error in result["errors"]:
+        logger.warning("Row %s (%s): %s", error["index"], error["gs_code"], error["detail"])
+    imported = len(result["ground_stations"])
+    logger.info("Imported %s of %s ground stations.", imported, result["total"])
+    return 1 if result["errors"] and not args.partial else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+"""Script to bulk load TLE or OMM (JSON/CSV/XML) catalogue files from disk, e.g. in air-gapped deployments."""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repo root is on sys.path when running as a script.
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.logging import setup_logging
+from src.services.tle_ingest import ingest_catalog_files
+
+setup_logging()
+logger = logging.getLogger("tle_ingest")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", type=Path, nargs="+", help="Catalogue files or directories.")
+    parser.add_argument(
+        "--tracked-only",
+        action="store_true",
+        help="Only update satellites that are already registered.",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        result = ingest_catalog_files(args.paths, register_new=not args.tracked_only)
+        logger.info(
+            "Upserted %s element sets from %s files (%s rejected).",
+            result["upserted"],
+            result["files"],
+            result["rejected"],
+        )
+        return 0
+    except Exception:
+        logger.exception("TLE ingest failed")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+"""Script to reclaim free space, refresh query planner statistics and truncate the WAL."""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repo root is on sys.path when running as a script.
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.logging import setup_logging
+from src.services.storage import DEFAULT_TIME_BUDGET_SECONDS, optimize_storage
+
+setup_logging()
+logger = logging.getLogger("maintenance")
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=DEFAULT_TIME_BUDGET_SECONDS,
+        help="Seconds after which vacuum and ANALYZE steps are skipped.",
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="Switch the database to auto_vacuum=INCREMENTAL with a full VACUUM first (locks the database).",
+    )
+    parser.add_argument("--json", action="store_true", help="Also print the full report as JSON on stdout.")
+    args = parser.parse_args(argv)
+
+    try:
+        report = optimize_storage(time_budget=args.time_budget, migrate_auto_vacuum=args.migrate)
+    except Exception:
+        logger.exception("Storage maintenance failed")
+        return 1
+
+    logger.info(
+        "Reclaimed %s bytes (%s vacuumed pages) in %.2fs; database is now %s bytes plus %s bytes of WAL.",
+        report["reclaimed_bytes"],
+        report["steps"]["vacuumed_pages"],
+        report["seconds"],
+        report["after"]["file_bytes"],
+        report["after"]["wal_bytes"],
+    )
+    if report["skipped"]:
+        logger.warning("Time budget used up; skipped %s.", ", ".join(report["skipped"]))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,38 @@
+"""Script to bulk refresh stored TLEs from CelesTrak. Plan to run script with job scheduler (Cron)"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Ensure repo root is on sys.path when running as a script.
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.core.logging import setup_logging
+from src.services.tle_refresh import refresh_tles
+
+setup_logging()
+logger = logging.getLogger("tle_refresh")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--group", help="CelesTrak GROUP name, e.g. 'stations' or 'weather'.")
+    source.add_argument("--norad-ids", type=int, nargs="+", help="Catalog numbers to refresh.")
+    args = parser.parse_args(argv)
+
+    try:
+        result = refresh_tles(group=args.group, norad_ids=args.norad_ids)
+        logger.info("Received %s TLEs, updated %s satellites.", result["received"], result["updated"])
+        return 0
+    except Exception:
+        logger.exception("TLE refresh failed")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,42 @@
+"""Version-based ETags for read endpoints, derived from change_log counters."""
+import hashlib
+
+from fastapi import Request, Response
+
+import db.changes_db as changes_db
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    # Weak: the same versions always render the same JSON, but not byte-for-byte guaranteed.
+    return f'W/"{digest}"'
+
+
+def table_etag(request: Request, tables: list[str], *extra, versions: dict[str, int] | None = None) -> str:
+    """ETag from the tables' latest change versions plus the query string (filters).
+
+    Callers that already read the versions pass them in to skip the lookup.
+    """
+    if versions is None:
+        versions = changes_db.get_table_versions(tables)
+    return make_etag(
+        request.url.path,
+        request.url.query,
+        *(f"{table}:{versions[table]}" for table in tables),
+        *extra,
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored.
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,163 @@
+"""Idempotency-Key support for write requests.
+
+The first response to a keyed request is stored (compressed, with an expiry)
+and replayed verbatim for retries carrying the same key and the same request.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import zlib
+
+import db.idempotency_db as idem_db
+from src.core import metrics
+
+logger = logging.getLogger("idempotency")
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# How long a finished response is replayed for.
+IDEMPOTENCY_TTL_HOURS = 24
+# How long an in-flight claim blocks retries before it is treated as abandoned.
+PENDING_TIMEOUT_SECONDS = 300
+MAX_KEY_LENGTH = 255
+
+
+def _json_response(status_code: int, detail: str) -> tuple[int, list, bytes]:
+    body = json.dumps({"detail": detail}).encode()
+    return status_code, [(b"content-type", b"application/json")], body
+
+
+async def _send_response(send, status_code: int, headers: list, body: bytes) -> None:
+    headers = [*headers, (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware, so response bodies are captured without re-buffering the app."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        raw_key = dict(scope["headers"]).get(b"idempotency-key")
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        idem_key = raw_key.decode("latin-1").strip()
+        if not idem_key or len(idem_key) > MAX_KEY_LENGTH:
+            await _send_response(
+                send, *_json_response(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters.")
+            )
+            return
+
+        # The body is needed for the request fingerprint, then replayed to the app.
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+
+        method = scope["method"]
+        path = scope["path"]
+        fingerprint = hashlib.sha256(
+            b"\n".join([method.encode(), path.encode(), scope.get("query_string", b""), body])
+        ).hexdigest()
+
+        try:
+            existing = await asyncio.to_thread(
+                idem_db.claim_idempotency_key,
+                idem_key,
+                method,
+                path,
+                fingerprint,
+                PENDING_TIMEOUT_SECONDS,
+            )
+        except sqlite3.Error:
+            logger.exception("Idempotency key could not be claimed.")
+            await _send_response(send, *_json_response(500, "Idempotency key could not be recorded."))
+            return
+
+        if existing is not None:
+            await self._replay(existing, fingerprint, send)
+            return
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code = None
+        headers: list = []
+        captured: list[bytes] = []
+
+        async def capture_send(message):
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.lower() != b"content-length"
+                ]
+            elif message["type"] == "http.response.body":
+                captured.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except Exception:
+            await asyncio.to_thread(idem_db.release_idempotency_key, idem_key)
+            raise
+
+        try:
+            if status_code is None or status_code >= 500:
+                # Server-side failures are not final: let the client retry for real.
+                await asyncio.to_thread(idem_db.release_idempotency_key, idem_key)
+            else:
+                await asyncio.to_thread(
+                    idem_db.store_idempotent_response,
+                    idem_key,
+                    status_code,
+                    json.dumps(headers, separators=(",", ":")),
+                    zlib.compress(b"".join(captured)),
+                    IDEMPOTENCY_TTL_HOURS,
+                )
+        except sqlite3.Error:
+            # The response has already been sent; a retry will just run again.
+            logger.exception("Idempotent response could not be stored.")
+
+    async def _replay(self, row, fingerprint: str, send) -> None:
+        if row["request_hash"] != fingerprint:
+            await _send_response(
+                send,
+                *_json_response(422, "Idempotency-Key was already used for a different request."),
+            )
+            return
+        if row["status_code"] is None:
+            await _send_response(
+                send,
+                *_json_response(409, "A request with this Idempotency-Key is still in progress."),
+            )
+            return
+
+        metrics.incr("idempotency.replayed")
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in json.loads(row["headers"] or "[]")
+        ]
+        headers.append((b"idempotent-replayed", b"true"))
+        await _send_response(send, row["status_code"], headers, zlib.decompress(row["body"]))
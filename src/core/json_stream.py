@@ -0,0 +1,102 @@
+import json
+from collections.abc import Iterator
+from typing import TextIO
+
+
+class _Reader:
+    """Chunked buffer over a text file, decoding one JSON value at a time."""
+
+    def __init__(self, fh: TextIO, chunk_size: int):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.eof = False
+
+    def fill(self) -> None:
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buffer += chunk
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at the end of the document."""
+        while True:
+            self.buffer = self.buffer.lstrip()
+            if self.buffer or self.eof:
+                return self.buffer[:1]
+            self.fill()
+
+    def consume(self) -> None:
+        self.buffer = self.buffer[1:]
+
+    def decode(self, terminators: str):
+        """Decode the next value, which must be followed by one of `terminators`."""
+        while True:
+            if not self.peek():
+                raise ValueError("Unexpected end of JSON document.")
+            try:
+                item, end = self.decoder.raw_decode(self.buffer)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            rest = self.buffer[end:].lstrip()
+            if not rest or rest[0] not in terminators:
+                # The value may have been cut off mid-token (e.g. "3." of "3.5").
+                if self.eof:
+                    raise ValueError("Malformed JSON document.")
+                self.fill()
+                continue
+            self.buffer = self.buffer[end:]
+            return item
+
+
+def _seek_key(reader: _Reader, key: str) -> None:
+    # Skip over the top-level object's members until `key`, leaving its value next.
+    if reader.peek() != "{":
+        raise ValueError("Expected a JSON object.")
+    reader.consume()
+    while True:
+        char = reader.peek()
+        if char == ",":
+            reader.consume()
+            continue
+        if char in ("}", ""):
+            raise ValueError(f"Key {key!r} not found.")
+        name = reader.decode(":")
+        reader.peek()
+        reader.consume()
+        if name == key:
+            return
+        reader.decode(",}")
+
+
+def iter_json_array(fh: TextIO, chunk_size: int = 65536, key: str | None = None) -> Iterator:
+    """Yield the elements of a top-level JSON array without loading the whole document.
+
+    The file is read in chunks and each element is decoded as soon as it is complete,
+    so memory stays proportional to the largest element rather than the file. With
+    `key`, the document is an object and the array under that key is streamed
+    instead (e.g. key="features" for a GeoJSON FeatureCollection).
+    """
+    reader = _Reader(fh, chunk_size)
+    if not reader.peek():
+        raise ValueError("Empty JSON document.")
+    if key is not None:
+        _seek_key(reader, key)
+    if reader.peek() != "[":
+        raise ValueError("Expected a JSON array.")
+    reader.consume()
+
+    while True:
+        char = reader.peek()
+        if not char:
+            raise ValueError("Unterminated JSON array.")
+        if char == "]":
+            return
+        if char == ",":
+            reader.consume()
+            continue
+        yield reader.decode(",]")
@@ -0,0 +1,35 @@
+"""In-process counters and timings, exposed through GET /metrics."""
+import threading
+
+_lock = threading.Lock()
+_counters: dict[str, int] = {}
+_timings: dict[str, dict[str, float]] = {}
+
+
+def incr(name: str, value: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, seconds: float) -> None:
+    with _lock:
+        timing = _timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+        timing["count"] += 1
+        timing["total"] += seconds
+        timing["max"] = max(timing["max"], seconds)
+        timing["last"] = seconds
+
+
+def snapshot() -> dict:
+    with _lock:
+        timings = {
+            name: {**timing, "avg": timing["total"] / timing["count"]}
+            for name, timing in _timings.items()
+        }
+        return {"counters": dict(_counters), "timings": timings}
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _timings.clear()
@@ -1,15 +1,44 @@
+import logging
+import sqlite3
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from src.core.idempotency import IdempotencyMiddleware
 from src.core.logging import setup_logging
-from src.routers import groundstations, missions, passes, satellites, commands, reservations
+from src.routers import groundstations, missions, passes, satellites, commands, reservations, metrics, schedule, events, sync, jobs
+from src.services import celestrak_client, command_catalog, maintenance
 
+logger = logging.getLogger("main")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await celestrak_client.start_tle_client()
+    try:
+        # Warm the catalog so the first reservation doesn't pay for loading it.
+        command_catalog.get_catalog()
+    except sqlite3.Error:
+        logger.warning("Command catalog could not be preloaded; it will load on first use.")
+    maintenance.start_maintenance()
+    try:
+        yield
+    finally:
+        await maintenance.stop_maintenance()
+        await celestrak_client.stop_tle_client()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(IdempotencyMiddleware)
 setup_logging()
 app.include_router(satellites)
 app.include_router(groundstations)
 app.include_router(missions)
 app.include_router(passes)
 app.include_router(commands)
-app.include_router(reservations)
\ No newline at end of file
+app.include_router(reservations)
+app.include_router(metrics)
+app.include_router(schedule)
+app.include_router(events)
+app.include_router(sync)
+app.include_router(jobs)
@@ -4,4 +4,9 @@ from src.routers.passes import router as passes
 from src.routers.satellites import router as satellites
 from src.routers.commands import router as commands 
 from src.routers.reservations import router as reservations
-__all__ = ["groundstations", "missions", "passes", "satellites", "commands", "reservations"]
+from src.routers.metrics import router as metrics
+from src.routers.schedule import router as schedule
+from src.routers.events import router as events
+from src.routers.sync import router as sync
+from src.routers.jobs import router as jobs
+__all__ = ["groundstations", "missions", "passes", "satellites", "commands", "reservations", "metrics", "schedule", "events", "sync", "jobs"]
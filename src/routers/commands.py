@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException
-import db.commands_db as c_db
+from fastapi import APIRouter, HTTPException, Request, Response
 import sqlite3
 
+from src.core import caching
+from src.services import command_catalog
+
 router = APIRouter(prefix="/commands")
 
 
 @router.get("/")
-def view_commands():
+def view_commands(request: Request, response: Response):
     try:
-        rows = c_db.get_all_commands()
+        catalog = command_catalog.get_catalog()
+        etag = caching.make_etag(request.url.path, request.url.query, f"command_catalog:{catalog.version}")
+        if caching.etag_matches(request, etag):
+            return caching.not_modified(etag)
+        response.headers["ETag"] = etag
 
-        return {"commands": [dict(command) for command in rows]}
+        return {"commands": [dict(command) for command in catalog.commands]}
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Failed to retrieve commands")
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from src.services.events import broker
+
+router = APIRouter()
+
+TOPICS = {"reservations", "passes", "groundstations"}
+# Comment line sent when idle so proxies keep the connection open.
+KEEPALIVE_SECONDS = 15
+
+
+def _format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+#stream change events (Server-Sent Events); reconnect with Last-Event-ID to resume
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    topics: str | None = None,
+    last_event_id: str | None = None,
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+):
+    wanted = None
+    if topics:
+        wanted = {topic.strip() for topic in topics.split(",") if topic.strip()}
+        unknown = wanted - TOPICS
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown topic(s): {', '.join(sorted(unknown))}",
+            )
+
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    # Subscribe before replaying so nothing published in between is missed.
+    sub = broker.subscribe(wanted)
+    # Taken with the subscription: events queued before the stream starts are newer, so they are sent.
+    start_seq = sub.start_seq
+
+    async def stream():
+        sent = start_seq
+        try:
+            if resume_from is not None:
+                backlog = broker.replay(resume_from, wanted)
+                if backlog is None:
+                    # Resume token too old or from another process: the client must
+                    # refetch state, then follow from here.
+                    yield f"id: {broker.event_id(start_seq)}\nevent: reset\ndata: {{}}\n\n"
+                else:
+                    for event in backlog:
+                        sent = broker.sequence(event["id"])
+                        yield _format_sse(event)
+
+            while not sub.overflowed:
+                if await request.is_disconnected():
+                    break
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                seq = broker.sequence(event["id"])
+                if seq is None or seq <= sent:
+                    continue
+                sent = seq
+                yield _format_sse(event)
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
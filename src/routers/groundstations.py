@@ -1,18 +1,33 @@
+import asyncio
+import io
 import sqlite3
-from fastapi import APIRouter, HTTPException, Response
+import tempfile
+from datetime import datetime, timezone
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request, Response
 from src.schemas import GSUpdate
 
 import db.gs_db as gs_db
-from src.schemas import GroundStation
+import db.jobs_db as jobs_db
+import db.satellites_db as sat_db
+from src.core import caching
+from src.schemas import GroundStation, HorizonMask
+from src.services import events, gs_import, gs_spatial, horizon, jobs
+
+# Import bodies larger than this are spooled to a temporary file instead of memory.
+IMPORT_SPOOL_BYTES = 1024 * 1024
 
 
 router = APIRouter()
 
 
 @router.get("/groundstations")
-def list_gs():
+def list_gs(request: Request, response: Response):
     try:
+        etag = caching.table_etag(request, ["ground_stations"])
+        if caching.etag_matches(request, etag):
+            return caching.not_modified(etag)
         rows = gs_db.get_all_gs()
+        response.headers["ETag"] = etag
         return {"ground_stations": [dict(row) for row in rows]}
     except sqlite3.Error:
         raise HTTPException(
@@ -20,6 +35,59 @@ def list_gs():
             detail="Failed to retrieve ground stations."
         )
 
+#stations near a point: within radius_km, the nearest `limit`, or both
+@router.get("/groundstations/nearby")
+def nearby_gs(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float | None = Query(None, gt=0),
+    limit: int | None = Query(None, gt=0, le=1000),
+    active_only: bool = False,
+):
+    if radius_km is None and limit is None:
+        raise HTTPException(status_code=400, detail="Provide radius_km, limit or both.")
+    try:
+        if radius_km is not None:
+            stations = gs_spatial.stations_within(lat, lon, radius_km, active_only)
+            if limit is not None:
+                stations = stations[:limit]
+        else:
+            stations = gs_spatial.nearest_stations(lat, lon, limit, active_only)
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Failed to retrieve ground stations.")
+    return {"ground_stations": stations}
+
+#active stations that can currently see a satellite
+@router.get("/groundstations/visible")
+def visible_gs(norad_id: int, min_elevation: float = Query(0.0, ge=0, lt=90)):
+    satellite = sat_db.get_satellite_by_norad_id(norad_id)
+    if not satellite:
+        raise HTTPException(status_code=404, detail="Satellite not found.")
+    if not satellite["tle_line1"] or not satellite["tle_line2"]:
+        raise HTTPException(status_code=409, detail="Satellite has no TLE yet; request its passes first.")
+
+    now_utc = datetime.now(timezone.utc)
+    try:
+        lat, lon, alt = gs_spatial.sub_satellite_point(
+            satellite["s_name"], satellite["tle_line1"], satellite["tle_line2"], now_utc
+        )
+    except Exception:
+        raise HTTPException(status_code=500, detail="Satellite position could not be computed.")
+    try:
+        stations = gs_spatial.stations_seeing(lat, lon, alt, min_elevation)
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Failed to retrieve ground stations.")
+    return {
+        "norad_id": norad_id,
+        "sub_satellite_point": {
+            "time": now_utc.strftime("%Y-%m-%d %H:%M:%S"),
+            "lat": round(lat, 5),
+            "lon": round(lon, 5),
+            "alt_km": round(alt, 3),
+        },
+        "ground_stations": stations,
+    }
+
 #add a groundstation
 @router.post("/groundstations", status_code=201)
 def register_gs(gs: GroundStation):
@@ -32,7 +100,12 @@ def register_gs(gs: GroundStation):
         if status not in ("ACTIVE","INACTIVE"):
             raise HTTPException(status_code=409, detail="Status must be 'ACTIVE' or 'INACTIVE'")
 
-        gs_db.insert_gs_manual(gs.gs_code, lon, lat, alt, status)
+        gs_id = gs_db.insert_gs_manual(gs.gs_code, lon, lat, alt, status)
+        events.publish(
+            "groundstations",
+            "groundstation.created",
+            {"gs_id": gs_id, "gs_code": gs.gs_code, "status": status},
+        )
         return {
             "msg": "Ground station registered",
             "ground_station": {"gs_code": gs.gs_code, "lon": lon, "lat": lat, "alt": alt, "status": gs.status},
@@ -43,9 +116,51 @@ def register_gs(gs: GroundStation):
             detail="Ground Station already registered (duplicate gs_code or coordinates)."
         )
 
+#bulk import ground stations from a CSV or GeoJSON request body
+@router.post("/groundstations/import", status_code=201)
+async def import_gs(request: Request, format: str = "csv", atomic: bool = True):
+    fmt = format.lower()
+    if fmt not in gs_import.GS_IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format must be one of: {', '.join(gs_import.GS_IMPORT_FORMATS)}",
+        )
+
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        try:
+            # Parsing and the insert transaction are blocking work.
+            result = await asyncio.to_thread(gs_import.import_ground_stations, text, fmt, atomic)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid {fmt} document: {exc}")
+        except sqlite3.Error:
+            raise HTTPException(status_code=500, detail="Failed to import ground stations.")
+        finally:
+            text.detach()
+
+    stations = result["ground_stations"]
+    if result["errors"] and atomic:
+        raise HTTPException(
+            status_code=result["errors"][0]["status_code"],
+            detail={"msg": "No ground stations were imported.", "errors": result["errors"]},
+        )
+    for station in stations:
+        events.publish(
+            "groundstations",
+            "groundstation.created",
+            {"gs_id": station["gs_id"], "gs_code": station["gs_code"], "status": station["status"]},
+        )
+    return {
+        "msg": f"{len(stations)} of {result['total']} ground stations imported.",
+        **result,
+    }
+
 # Update ground stations
 @router.patch("/groundstations/{gs_id}/")
-def update_gs(gs_id:int,gs_updates: GSUpdate):
+def update_gs(gs_id:int,gs_updates: GSUpdate, response: Response, background_tasks: BackgroundTasks):
     gs = gs_db.get_gs_by_id(gs_id)
     if not gs:
         raise HTTPException(status_code= 404, detail="Ground station not found")
@@ -66,10 +181,10 @@ def update_gs(gs_id:int,gs_updates: GSUpdate):
         updates.get("status") == "INACTIVE" and gs["status"] != "INACTIVE"
     )
     try:
-        cancelled = 0
-        deleted_passes = 0
+        job_id = None
         if deactivating:
-            _, cancelled, deleted_passes = gs_db.update_gs_with_deactivation(gs_id, updates)
+            # Cancelling reservations and dropping passes runs as a chunked background job.
+            job_id = jobs_db.create_gs_deactivation_job(gs_id, updates)
         else:
             gs_db.update_gs(gs_id, updates)
     except sqlite3.IntegrityError:
@@ -81,12 +196,20 @@ def update_gs(gs_id:int,gs_updates: GSUpdate):
         "ground_station": dict(gs_db.get_gs_by_id(gs_id))
     }
     if deactivating:
-        payload["reservations_cancelled"] = cancelled
-        payload["passes_deleted"] = deleted_passes
+        background_tasks.add_task(jobs.run_job, job_id)
+        response.status_code = 202
+        payload["msg"] = "Ground station deactivated. Reservation cancellation queued."
+        payload["job_id"] = job_id
+        payload["status_url"] = f"/jobs/{job_id}"
+    events.publish(
+        "groundstations",
+        "groundstation.updated",
+        {key: value for key, value in payload.items() if key not in ("msg", "status_url")},
+    )
     return payload
 #delete groundstation along with history of all gs reservations 
-@router.delete("/groundstations/{gs_id}")
-def delete_gs(gs_id: int, response: Response, force: bool = False):
+@router.delete("/groundstations/{gs_id}", status_code=202)
+def delete_gs(gs_id: int, response: Response, background_tasks: BackgroundTasks, force: bool = False):
     gs = gs_db.get_gs_by_id(gs_id)
     if not gs:
         raise HTTPException(status_code=404, detail="Ground station not found.")
@@ -96,16 +219,80 @@ def delete_gs(gs_id: int, response: Response, force: bool = False):
             raise HTTPException(status_code=409, detail="Please cancel reservations associated with groundstations first.")
     
     try:
-        reservations_deleted, deleted = gs_db.delete_gs_and_reservations(gs_id)
-        if not deleted:
-            raise HTTPException(status_code=404, detail="Ground station not found.")
+        # The station goes INACTIVE now; its reservations and passes are removed in chunks.
+        job_id, created = jobs_db.create_delete_job("gs_delete", gs_id)
+        if created:
+            background_tasks.add_task(jobs.run_job, job_id)
         response.headers["Warning"] = (
             "Deletion removes predicted passes and reservations."
         )
         return {
-            "msg": "Ground station deleted. All corresponding reservations deleted",
+            "msg": "Ground station deletion queued. All corresponding reservations will be deleted",
             "gs_id": gs_id,
-            "deleted_reservations": reservations_deleted,
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
         }
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Failed to delete ground station.")
+
+def _horizon_mask_response(gs_id: int, mask, passes_invalidated: int | None = None) -> dict:
+    payload = {
+        "gs_id": gs_id,
+        "custom": mask is not None,
+        "elevations": [float(value) for value in mask] if mask is not None else [0.0] * horizon.MASK_SIZE,
+    }
+    if passes_invalidated is not None:
+        payload["passes_invalidated"] = passes_invalidated
+    return payload
+
+
+def _store_horizon_mask(gs_id: int, blob: bytes | None) -> int:
+    try:
+        invalidated = gs_db.set_horizon_mask(gs_id, blob)
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Unable to save horizon mask.")
+    if invalidated:
+        # Re-predicted against the new mask on the next /passes request.
+        events.publish("passes", "passes.invalidated", {"gs_id": gs_id})
+    return invalidated
+
+
+#minimum trackable elevation per azimuth degree (flat 0 degrees unless set)
+@router.get("/groundstations/{gs_id}/horizon-mask")
+def get_horizon_mask(gs_id: int):
+    try:
+        if not gs_db.get_gs_by_id(gs_id):
+            raise HTTPException(status_code=404, detail="Ground station not found.")
+        return _horizon_mask_response(gs_id, horizon.load_mask(gs_id))
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Unable to read horizon mask.")
+
+
+@router.put("/groundstations/{gs_id}/horizon-mask")
+def put_horizon_mask(gs_id: int, body: HorizonMask):
+    if (body.elevations is None) == (body.points is None):
+        raise HTTPException(status_code=400, detail="Provide either elevations or points.")
+    if not gs_db.get_gs_by_id(gs_id):
+        raise HTTPException(status_code=404, detail="Ground station not found.")
+
+    if body.points is not None:
+        mask = horizon.mask_from_points([(point.azimuth, point.elevation) for point in body.points])
+    else:
+        mask = body.elevations
+    blob = horizon.encode_mask(mask)
+    invalidated = _store_horizon_mask(gs_id, blob)
+    return {
+        "msg": "Horizon mask updated",
+        **_horizon_mask_response(gs_id, horizon.decode_mask(blob), invalidated),
+    }
+
+
+@router.delete("/groundstations/{gs_id}/horizon-mask")
+def delete_horizon_mask(gs_id: int):
+    if not gs_db.get_gs_by_id(gs_id):
+        raise HTTPException(status_code=404, detail="Ground station not found.")
+    invalidated = _store_horizon_mask(gs_id, None)
+    return {
+        "msg": "Horizon mask removed",
+        **_horizon_mask_response(gs_id, None, invalidated),
+    }
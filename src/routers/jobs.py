@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+import sqlite3
+
+import db.jobs_db as jobs_db
+
+router = APIRouter()
+
+
+#progress of a background deactivation/deletion job
+@router.get("/jobs/{job_id}")
+def get_job(job_id: int):
+    try:
+        job = jobs_db.get_job(job_id)
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Unable to read job.")
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return {"job": dict(job)}
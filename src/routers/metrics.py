@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from src.core import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def view_metrics():
+    return metrics.snapshot()
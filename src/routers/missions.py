@@ -1,8 +1,9 @@
 import sqlite3
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 
 import db.missions_db as miss_db
 import db.satellites_db as sat_db
+from src.core import caching
 from src.schemas import Mission, MissionUpdate
 
 
@@ -23,9 +24,13 @@ def create_mission(mission: Mission):
 
 
 @router.get("/missions")
-def view_missions():
+def view_missions(request: Request, response: Response):
     try:
+        etag = caching.table_etag(request, ["missions"])
+        if caching.etag_matches(request, etag):
+            return caching.not_modified(etag)
         rows = miss_db.get_all_missions()
+        response.headers["ETag"] = etag
         missions = [dict(row) for row in rows]
         return {"missions": missions}
     except sqlite3.Error:
@@ -1,22 +1,25 @@
 import logging
 import sqlite3
+import threading
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 
 import db.gs_db as gs_db
 import db.satellites_db as sat_db
 import db.passes_db as p_db
+from src.services import events, geo, horizon, pass_cache
 from src.services.celestrak_client import get_tle
+from src.services.tle import parse_db_time, tle_epoch_db_time, tle_needs_refresh
 from src.services.predict_passes import get_pass_predictions
 router = APIRouter()
 logger = logging.getLogger("pass_routing")
 
+# NORAD IDs with a background TLE refresh in flight, so concurrent requests don't pile up.
+_refreshing: set[int] = set()
+_refreshing_lock = threading.Lock()
 
-def _parse_db_time(value: str) -> datetime:
-    dt = datetime.fromisoformat(value)
-    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
 
 def _format_db_time(dt: datetime) -> str:
     if dt.tzinfo is None:
@@ -24,17 +27,64 @@ def _format_db_time(dt: datetime) -> str:
     return dt.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
 def _tle_is_stale(satellite: sqlite3.Row, now_utc: datetime) -> bool:
-    if not satellite["tle_line1"] or not satellite["tle_line2"]:
-        return True
     updated_at = satellite["tle_updated_at"]
-    if not updated_at:
-        return True
-    updated_dt = _parse_db_time(updated_at)
-    return updated_dt < (now_utc - timedelta(hours=24))
+    checked_at = parse_db_time(updated_at) if updated_at else None
+    return tle_needs_refresh(satellite["tle_line1"], satellite["tle_line2"], checked_at, now_utc)
+
+
+def _refresh_tle(satellite: sqlite3.Row, now_utc: datetime) -> None:
+    fetched = get_tle(
+        satellite["norad_id"],
+        etag=satellite["tle_etag"],
+        last_modified=satellite["tle_last_modified"],
+    )
+    checked_at = _format_db_time(now_utc)
+    current = [satellite["tle_line1"], satellite["tle_line2"]]
+    if fetched.lines is None or fetched.lines == current:
+        # Nothing new upstream: keep the cached passes, just remember we looked.
+        sat_db.mark_satellite_tle_checked(
+            satellite["s_id"], checked_at, fetched.etag, fetched.last_modified
+        )
+        return
+
+    tle_line1, tle_line2 = fetched.lines
+    sat_db.update_satellite_tle(
+        satellite["s_id"],
+        tle_line1,
+        tle_line2,
+        checked_at,
+        tle_epoch=tle_epoch_db_time(tle_line1),
+        tle_etag=fetched.etag,
+        tle_last_modified=fetched.last_modified,
+    )
+    # The new TLE dropped this satellite's unreserved future passes.
+    events.publish("passes", "passes.invalidated", {"norad_id": satellite["norad_id"]})
+
+
+def _refresh_tle_in_background(norad_id: int) -> None:
+    try:
+        satellite = sat_db.get_satellite_by_norad_id(norad_id)
+        if satellite:
+            _refresh_tle(satellite, datetime.now(timezone.utc))
+    except HTTPException as exc:
+        logger.warning(f"Background TLE refresh for NORAD {norad_id} failed: {exc.detail}")
+    except sqlite3.Error:
+        logger.exception(f"Background TLE refresh for NORAD {norad_id} could not be saved.")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(norad_id)
+
+
+def _schedule_tle_refresh(norad_id: int, background_tasks: BackgroundTasks) -> None:
+    with _refreshing_lock:
+        if norad_id in _refreshing:
+            return
+        _refreshing.add(norad_id)
+    background_tasks.add_task(_refresh_tle_in_background, norad_id)
 
 
 @router.get("/passes")
-def view_pass(norad_id: int, gs_id: int):
+def view_pass(norad_id: int, gs_id: int, background_tasks: BackgroundTasks):
     # Fetch required entities
     satellite = sat_db.get_satellite_by_norad_id(norad_id)
     gs = gs_db.get_gs_by_id(gs_id)
@@ -48,79 +98,56 @@ def view_pass(norad_id: int, gs_id: int):
 
     now_utc = datetime.now(timezone.utc)
 
-    # Refresh TLE if older than 24 hours
-    if _tle_is_stale(satellite, now_utc):
-        logger.info(f"TLE stale for NORAD {norad_id}; refreshing from CelesTrak.")
-        tle_line1, tle_line2 = get_tle(norad_id)
-        tle_updated_at = _format_db_time(now_utc)
+    if not satellite["tle_line1"] or not satellite["tle_line2"]:
+        # Nothing to predict from yet, so this is the one case that blocks on CelesTrak.
+        logger.info(f"No TLE for NORAD {norad_id}; fetching from CelesTrak.")
         try:
-            sat_db.update_satellite_tle(
-                satellite["s_id"],
-                tle_line1,
-                tle_line2,
-                tle_updated_at,
-            )
+            _refresh_tle(satellite, now_utc)
         except sqlite3.Error:
             raise HTTPException(status_code=500, detail="Failed to update TLE data.")
         satellite = sat_db.get_satellite_by_norad_id(norad_id)
+    elif _tle_is_stale(satellite, now_utc):
+        # Stale-while-revalidate: predict from the TLE we have, refresh after responding.
+        logger.info(f"TLE stale for NORAD {norad_id}; scheduling background refresh.")
+        _schedule_tle_refresh(norad_id, background_tasks)
 
-    # Determine whether pass cache/database is stale
-    refresh_threshold = now_utc + timedelta(hours=24)
+    try:
+        horizon_mask = horizon.load_mask(gs["gs_id"])
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Unable to read horizon mask.")
 
-    latest_row = p_db.get_latest_pass_end_time(gs["gs_id"], satellite["s_id"])
-    latest_end_time = _parse_db_time(latest_row["end_time"]) if latest_row else None
+    # Stations outside every footprint the orbit can produce never get a pass.
+    min_elevation = float(horizon_mask.min()) if horizon_mask is not None else 0.0
+    reachable = geo.station_can_see_orbit(gs["lat"], satellite["tle_line2"], min_elevation)
+    if not reachable:
+        logger.info(f"GS {gs['gs_id']} is outside NORAD {norad_id}'s visibility band; skipping prediction.")
 
     # Refresh cache from local prediction if needed
-    if latest_end_time is None or latest_end_time < refresh_threshold:
+    if reachable and pass_cache.pass_cache_is_stale(satellite["s_id"], gs["gs_id"], now_utc):
         try:
             predicted_passes = get_pass_predictions(
                 sat_name=satellite["s_name"],
                 tle_line1=satellite["tle_line1"],
                 tle_line2=satellite["tle_line2"],
                 utc_time=now_utc,
-                hours=24,
+                hours=pass_cache.PASS_HORIZON_HOURS,
                 gs_lon=gs["lon"],
                 gs_lat=gs["lat"],
                 gs_alt=gs["alt"],
+                horizon_mask=horizon_mask,
             )
         except Exception:
             logger.exception("Pass prediction failed.")
             raise HTTPException(status_code=500, detail="Pass prediction failed.")
 
-        total_passes = len(predicted_passes)
-        passes_cached_count = 0
-        pass_ids = []
-
         # Insert only new passes into cache
         try:
-            for p in predicted_passes:
-                pass_id = p_db.insert_predicted_pass_return_id(
-                    satellite["s_id"],
-                    gs["gs_id"],
-                    p["max_elevation"],
-                    p["duration"],
-                    p["start_time"],
-                    p["end_time"],
-                    "pyorbital",
-                )
-                if pass_id:
-                    pass_ids.append(pass_id)
-                    passes_cached_count += 1
-
-            logger.info(
-                f"{passes_cached_count} new passes cached out of {total_passes} from local prediction. "
-                f"pass_ids: {pass_ids}"
-            )
+            pass_cache.cache_predicted_passes(satellite, gs, predicted_passes)
         except sqlite3.Error:
             raise HTTPException(status_code=502, detail="Passes could not be added")
 
-    # Housekeeping: remove expired passes
-    try:
-        exp_delete_count = p_db.delete_unreserved_expired_passes()
-        logger.info(f"{exp_delete_count} expired passes deleted from cache.")
-    except sqlite3.Error:
-        raise HTTPException(status_code=500, detail="Expired passes could not be deleted")
-
+    # Expired passes are removed by the maintenance scheduler (src/services/maintenance.py),
+    # and get_claimable_passes only returns future ones.
     # Fetch final list of valid future passes
     rows = p_db.get_claimable_passes(
         satellite["s_id"],
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, HTTPException
+import threading
+from datetime import datetime, timezone
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 import sqlite3
 
-from src.schemas import ReservationCreate
+from src.core import caching
+from src.schemas import ReservationBatchCreate, ReservationCreate, ReservationFilters, reservation_to_dict
+from src.services import command_catalog, events, export
+import db.changes_db as changes_db
 import db.passes_db as p_db
 import db.missions_db as m_db
 import db.satellites_db as sat_db
 import db.gs_db as gs_db
 import db.reservations_db as r_db
-import db.commands_db as c_db
 
 router = APIRouter()
 
+_RESERVATION_ETAG_TABLES = ["reservations", "predicted_passes", "satellites"]
+# Next reservation status boundary, keyed by the reservations/predicted_passes versions it was read at.
+_status_boundary: dict = {}
+_status_boundary_lock = threading.Lock()
+
 #create a reservation
 @router.post("/reservations")
 def create_reservation(reservation:ReservationCreate):
@@ -51,7 +63,7 @@ def create_reservation(reservation:ReservationCreate):
     
     # Check if commands are valid
     if commands:
-        allowed = c_db.get_command_types()
+        allowed = command_catalog.get_catalog().types
         invalid = [cmd for cmd in commands if cmd not in allowed]
         if invalid:
             invalid_list = ", ".join(invalid)
@@ -78,102 +90,203 @@ def create_reservation(reservation:ReservationCreate):
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Reservation could not be made.")
 
-    reservation_info = r_db.get_reservation_with_details_by_r_id(r_id)
-    command_list = (
-        reservation_info["commands"].split(",")
-        if reservation_info and reservation_info["commands"]
-        else []
-    )
-    
-    return{
+    reservation = reservation_to_dict(r_db.get_reservation_with_details_by_r_id(r_id))
+    events.publish("reservations", "reservation.created", reservation)
+    return {
         "msg": "Pass has been reserved.",
-        "reservation": {"r_id": r_id,
-                       "mission_id": mission_id,
-                       "pass_id": pass_id,
-                       "gs_id": reservation_info["gs_id"],
-                       "norad_id": reservation_info["norad_id"],
-                       "start_time": reservation_info["start_time"],
-                       "end_time": reservation_info["end_time"],
-                        "commands": command_list,
-                        "created_at":reservation_info["created_at"]} }
+        "reservation": reservation,
+    }
 
-#view all reservations 
-@router.get("/reservations")
-def view_reservations(include_cancelled: bool = False):
-    #get reservations and commands
+def _batch_item_error(reservation: ReservationCreate, passes, missions, allowed, claimed):
+    """Mirror create_reservation's checks against pre-fetched rows; return (status, detail) or None."""
+    pass_info = passes.get(reservation.pass_id)
+    if pass_info is None:
+        return 404, "Pass ID not found"
+    if pass_info["is_reserved"] or reservation.pass_id in claimed:
+        return 409, "Pass is already reserved"
+    if not pass_info["is_future"]:
+        return 400, "Pass is no longer claimable"
+    if pass_info["gs_status"] != "ACTIVE":
+        return 409, "Ground station is inactive."
+    mission_id = reservation.mission_id
+    if mission_id is not None:
+        if mission_id not in missions:
+            return 404, f"Mission ({mission_id}) not found"
+        if pass_info["s_id"] not in missions[mission_id]:
+            return 404, f"Satellite ({pass_info['norad_id']}) not found in mission."
+    invalid = [cmd for cmd in reservation.commands if cmd not in allowed]
+    if invalid:
+        return 400, f"Invalid command(s): {', '.join(invalid)}"
+    if len(reservation.commands) != len(set(reservation.commands)):
+        return 400, "Duplicate commands are not allowed"
+    return None
+
+
+#create many reservations at once
+@router.post("/reservations/batch")
+def create_reservations_batch(batch: ReservationBatchCreate):
+    items = batch.reservations
+    pass_ids = list({item.pass_id for item in items})
+    mission_ids = list({item.mission_id for item in items if item.mission_id is not None})
+
+    # Set-based validation: one query per entity type, whatever the batch size.
     try:
-        reservations = r_db.get_all_reservations_with_details(include_cancelled=include_cancelled)
-        commands_rows = r_db.get_reservation_commands_grouped()
+        passes = {row["pass_id"]: row for row in p_db.get_passes_for_reservation(pass_ids)}
+        missions = m_db.get_mission_satellite_ids(mission_ids) if mission_ids else {}
+        allowed = command_catalog.get_catalog().types if any(item.commands for item in items) else set()
     except sqlite3.Error:
-        raise HTTPException(status_code=500, detail="Unable to get reservations")
+        raise HTTPException(status_code=500, detail="Reservations could not be made.")
 
-    #create a dictionary of commands by r_id
-    commands_by_rid: dict[int, list[str]] = {}
-    for row in commands_rows:
-        commands = row["commands"].split(",") if row["commands"] else []
-        commands_by_rid[row["r_id"]] = commands
+    errors = []
+    to_create = []
+    claimed: set[int] = set()
+    for index, item in enumerate(items):
+        error = _batch_item_error(item, passes, missions, allowed, claimed)
+        if error:
+            status_code, detail = error
+            errors.append({"index": index, "pass_id": item.pass_id, "status_code": status_code, "detail": detail})
+            continue
+        claimed.add(item.pass_id)
+        pass_info = passes[item.pass_id]
+        to_create.append((index, (item.pass_id, pass_info["gs_id"], pass_info["s_id"], item.mission_id, item.commands)))
 
-    #build reservations info to send to client
-    reservation_list = []
-    for reservation in reservations:
-        r_id = reservation["r_id"]
-        reservation_list.append(
-            {
-                "r_id": r_id,
-                "mission_id": reservation["mission_id"],
-                "pass_id": reservation["pass_id"],
-                "gs_id": reservation["gs_id"],
-                "norad_id": reservation["norad_id"],
-                "start_time": reservation["start_time"],
-                "end_time": reservation["end_time"],
-                "commands": commands_by_rid.get(r_id, []),
-                "status": reservation["status"],
-                "created_at": reservation["created_at"],
-            }
+    if errors and batch.atomic:
+        raise HTTPException(
+            status_code=errors[0]["status_code"],
+            detail={"msg": "No reservations were made.", "errors": errors},
         )
 
+    r_ids: list[int | None] = []
+    if to_create:
+        try:
+            r_ids = r_db.create_reservations_batch(
+                [values for _, values in to_create], atomic=batch.atomic
+            )
+        except sqlite3.IntegrityError:
+            raise HTTPException(status_code=409, detail="Pass is already reserved")
+        except sqlite3.Error:
+            raise HTTPException(status_code=500, detail="Reservations could not be made.")
+
+    for (index, values), r_id in zip(to_create, r_ids):
+        if r_id is None:
+            errors.append({"index": index, "pass_id": values[0], "status_code": 409, "detail": "Pass is already reserved"})
+
+    created = [r_id for r_id in r_ids if r_id is not None]
+    rows = r_db.get_reservations_with_details_by_r_ids(created) if created else []
+    reservations = [reservation_to_dict(row) for row in rows]
+    for reservation in reservations:
+        events.publish("reservations", "reservation.created", reservation)
     return {
-        "reservations": reservation_list
+        "msg": f"{len(created)} of {len(items)} passes reserved.",
+        "reservations": reservations,
+        "errors": sorted(errors, key=lambda error: error["index"]),
     }
 
-# view all reservations for a given mission 
-@router.get("/reservations/{mission_id}")
-def view_mission_reservations(mission_id: int, include_cancelled: bool = False):
+def _format_filter_time(dt: datetime | None) -> str | None:
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _next_status_change(versions: dict[str, int]) -> str | None:
+    """The next status boundary, re-read only when reservations or passes change or it has passed."""
+    key = (versions["reservations"], versions["predicted_passes"])
+    now = _format_filter_time(datetime.now(timezone.utc))
+    with _status_boundary_lock:
+        if _status_boundary.get("key") == key:
+            next_change = _status_boundary["next_change"]
+            if next_change is None or next_change > now:
+                return next_change
+    next_change = r_db.get_next_status_change()
+    with _status_boundary_lock:
+        _status_boundary.update(key=key, next_change=next_change)
+    return next_change
+
+
+def _list_reservations(
+    request: Request,
+    response: Response,
+    filters: ReservationFilters,
+    mission_id: int | None = None,
+):
+    statuses = [st.upper() for st in filters.status] if filters.status else None
+    if statuses:
+        invalid = [st for st in statuses if st not in r_db.RESERVATION_STATUSES]
+        if invalid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid status: {', '.join(invalid)}. Expected one of {', '.join(r_db.RESERVATION_STATUSES)}",
+            )
     try:
-        reservations = r_db.get_reservations_with_details_by_mission_id(
+        # Status is derived from the clock, so the ETag also covers the next moment
+        # any active reservation changes status; once that passes, the tag changes.
+        # Commands are only written with their reservation, so reservations' version covers them.
+        versions = changes_db.get_table_versions(_RESERVATION_ETAG_TABLES)
+        etag = caching.table_etag(
+            request,
+            _RESERVATION_ETAG_TABLES,
+            _next_status_change(versions),
+            versions=versions,
+        )
+        if caching.etag_matches(request, etag):
+            return caching.not_modified(etag)
+        reservations = r_db.get_reservations_with_details(
+            include_cancelled=filters.include_cancelled,
             mission_id=mission_id,
-            include_cancelled=include_cancelled,
+            gs_id=filters.gs_id,
+            norad_id=filters.norad_id,
+            statuses=statuses,
+            window_start=_format_filter_time(filters.window_start),
+            window_end=_format_filter_time(filters.window_end),
+            created_after=_format_filter_time(filters.created_after),
+            limit=filters.limit,
+            include_archived=filters.include_archived,
         )
-        commands_rows = r_db.get_reservation_commands_grouped()
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Unable to get reservations")
 
-    commands_by_rid: dict[int, list[str]] = {}
-    for row in commands_rows:
-        commands = row["commands"].split(",") if row["commands"] else []
-        commands_by_rid[row["r_id"]] = commands
+    response.headers["ETag"] = etag
+    return {"reservations": [reservation_to_dict(reservation) for reservation in reservations]}
 
-    reservation_list = []
-    for reservation in reservations:
-        r_id = reservation["r_id"]
-        reservation_list.append(
-            {
-                "r_id": r_id,
-                "mission_id": reservation["mission_id"],
-                "pass_id": reservation["pass_id"],
-                "gs_id": reservation["gs_id"],
-                "norad_id": reservation["norad_id"],
-                "start_time": reservation["start_time"],
-                "end_time": reservation["end_time"],
-                "commands": commands_by_rid.get(r_id, []),
-                "status": reservation["status"],
-                "created_at": reservation["created_at"],
-            }
+#view all reservations 
+@router.get("/reservations")
+def view_reservations(
+    request: Request,
+    response: Response,
+    filters: Annotated[ReservationFilters, Query()],
+):
+    return _list_reservations(request, response, filters)
+
+#export reservation history (must be registered before /reservations/{mission_id})
+@router.get("/reservations/export")
+def export_reservations(format: str = "csv", include_cancelled: bool = True):
+    fmt = format.lower()
+    if fmt not in export.EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format must be one of: {', '.join(export.EXPORT_FORMATS)}",
         )
+    if fmt != "csv" and not export.arrow_available():
+        raise HTTPException(status_code=501, detail=f"{fmt} export requires the pyarrow package.")
 
-    return {
-        "reservations": reservation_list
-    }
+    extension = {"csv": "csv", "parquet": "parquet", "arrow": "arrows"}[fmt]
+    return StreamingResponse(
+        export.iter_reservation_export(fmt, include_cancelled=include_cancelled),
+        media_type=export.EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="reservations.{extension}"'},
+    )
+
+# view all reservations for a given mission 
+@router.get("/reservations/{mission_id}")
+def view_mission_reservations(
+    mission_id: int,
+    request: Request,
+    response: Response,
+    filters: Annotated[ReservationFilters, Query()],
+):
+    return _list_reservations(request, response, filters, mission_id=mission_id)
 
 #Cancel reservation
 @router.post("/reservations/{r_id}/cancel")
@@ -188,6 +301,11 @@ def cancel_reservation(r_id: int):
         r_db.cancel_reservation_by_r_id(r_id)
     except sqlite3.Error:
         raise HTTPException(status_code= 500, detail= "Unable to cancel reservation")
+    events.publish(
+        "reservations",
+        "reservation.cancelled",
+        {"r_id": r_id, "pass_id": reservation["pass_id"], "gs_id": reservation["gs_id"]},
+    )
     
     return{
         "msg" : "Reservation has been cancelled"
@@ -1,18 +1,27 @@
 import sqlite3
-from fastapi import APIRouter, HTTPException, Response
+from pathlib import Path
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
 
+import db.jobs_db as jobs_db
 import db.satellites_db as sat_db
 
-from src.schemas import Satellite, SatelliteUpdate
+from src.core import caching
+from src.schemas import Satellite, SatelliteBulkCreate, SatelliteUpdate, TLEIngest
+from src.services import celestrak_client, jobs, pass_cache, satellite_bulk
+from src.services.tle_ingest import ingest_catalog_files
 
 
 router = APIRouter()
 
 
 @router.get("/satellites")
-def list_satellites():
+def list_satellites(request: Request, response: Response):
     try:
+        etag = caching.table_etag(request, ["satellites"])
+        if caching.etag_matches(request, etag):
+            return caching.not_modified(etag)
         rows = sat_db.get_all_satellites()
+        response.headers["ETag"] = etag
         return {"satellites": [dict(row) for row in rows]}
     except sqlite3.Error:
         raise HTTPException(
@@ -35,6 +44,43 @@ def register_satellite(satellite: Satellite):
             detail="Satellite already registered (duplicate NORAD ID)."
         )
 
+@router.post("/satellites/bulk")
+def register_satellites_bulk(batch: SatelliteBulkCreate, background_tasks: BackgroundTasks):
+    try:
+        result = satellite_bulk.register_satellites(batch.satellites, fetch_tles=batch.fetch_tles)
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Satellites could not be registered.")
+
+    with_tle = [item["norad_id"] for item in result["satellites"] if item["status"] == "created" and item["tle"]]
+    result["precompute_queued"] = 0
+    if batch.precompute_passes and with_tle:
+        # Runs after the response is sent, so registration never waits on propagation.
+        background_tasks.add_task(pass_cache.precompute_passes, with_tle)
+        result["precompute_queued"] = len(with_tle)
+    return result
+
+@router.post("/satellites/tle/ingest")
+def ingest_tles(ingest: TLEIngest):
+    if not celestrak_client.TLE_MIRROR_DIR:
+        raise HTTPException(status_code=409, detail="TLE_MIRROR_DIR is not configured.")
+
+    mirror = Path(celestrak_client.TLE_MIRROR_DIR).resolve()
+    paths = [(mirror / p).resolve() for p in ingest.paths] or [mirror]
+    for path in paths:
+        if not path.is_relative_to(mirror):
+            raise HTTPException(status_code=400, detail="Paths must be inside the TLE mirror directory.")
+        if not path.exists():
+            raise HTTPException(status_code=404, detail=f"Catalogue file not found: {path.name}")
+
+    try:
+        result = ingest_catalog_files(paths, register_new=ingest.register_new)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Failed to ingest TLE catalogue.")
+
+    return {"msg": "TLE catalogue ingested", **result}
+
 @router.patch("/satellites/{norad_id}/")
 def update_satellite(norad_id: int, sat_updates: SatelliteUpdate):
     satellite = sat_db.get_satellite_by_norad_id(norad_id)
@@ -62,8 +108,8 @@ def update_satellite(norad_id: int, sat_updates: SatelliteUpdate):
         "satellite": dict(sat_db.get_satellite_by_id(satellite["s_id"]))
     }
 
-@router.delete("/satellites/{norad_id}")
-def delete_satellite(norad_id: int, response: Response, force: bool = False):
+@router.delete("/satellites/{norad_id}", status_code=202)
+def delete_satellite(norad_id: int, response: Response, background_tasks: BackgroundTasks, force: bool = False):
     satellite = sat_db.get_satellite_by_norad_id(norad_id)
 
     if satellite is None:
@@ -76,16 +122,18 @@ def delete_satellite(norad_id: int, response: Response, force: bool = False):
             raise HTTPException(status_code=409, detail="Please cancel reservations associated with this satellite first.")
     
     try:
-        reservations_deleted, deleted = sat_db.delete_satellite_and_reservations(s_id)
-        if not deleted:
-            raise HTTPException(status_code=404, detail="Satellite not found.")
+        # Reservations and passes are removed in chunks, then the satellite row.
+        job_id, created = jobs_db.create_delete_job("satellite_delete", s_id)
+        if created:
+            background_tasks.add_task(jobs.run_job, job_id)
         response.headers["Warning"] = (
             "Deletion removes predicted passes and reservations."
         )
         return {
-            "msg": "Satellite deleted. All corresponding reservations deleted",
+            "msg": "Satellite deletion queued. All corresponding reservations will be deleted",
             "norad_id": norad_id,
-            "deleted_reservations": reservations_deleted,
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
         }
     except sqlite3.Error:
         raise HTTPException(status_code=500, detail="Failed to delete satellite")
@@ -0,0 +1,87 @@
+from fastapi import APIRouter, HTTPException
+import sqlite3
+
+from src.schemas import ScheduleRequest, reservation_to_dict
+from src.services import events
+from src.services.scheduler import plan_assignments
+import db.missions_db as m_db
+import db.passes_db as p_db
+import db.reservations_db as r_db
+
+router = APIRouter()
+
+
+def _build_plan(request: ScheduleRequest) -> tuple[int, list[dict]]:
+    mission_ids = sorted(set(request.mission_ids))
+    try:
+        missions = m_db.get_mission_satellite_ids(mission_ids)
+        missing = [mission_id for mission_id in mission_ids if mission_id not in missions]
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Mission(s) not found: {', '.join(str(m) for m in missing)}",
+            )
+        candidates = p_db.get_schedulable_passes(mission_ids, request.horizon_hours)
+        reserved = p_db.get_reserved_intervals(request.horizon_hours)
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Unable to build schedule.")
+    return len(candidates), plan_assignments(candidates, reserved)
+
+
+def _plan_response(candidate_count: int, plan: list[dict]) -> dict:
+    return {
+        "candidates": candidate_count,
+        "total_contact_seconds": sum(item["duration"] for item in plan),
+        "weighted_score": sum(item["weight"] for item in plan),
+        "assignments": [
+            {
+                "pass_id": item["pass_id"],
+                "mission_id": item["mission_id"],
+                "priority": item["priority"],
+                "gs_id": item["gs_id"],
+                "norad_id": item["norad_id"],
+                "start_time": item["start_time"],
+                "end_time": item["end_time"],
+                "duration": item["duration"],
+                "max_elevation": item["max_elevation"],
+            }
+            for item in plan
+        ],
+    }
+
+
+#preview a conflict-free, priority-weighted allocation without reserving anything
+@router.post("/schedule/plan")
+def plan_schedule(request: ScheduleRequest):
+    candidate_count, plan = _build_plan(request)
+    return _plan_response(candidate_count, plan)
+
+
+#recompute the plan and reserve every assigned pass in one transaction
+@router.post("/schedule/commit")
+def commit_schedule(request: ScheduleRequest):
+    candidate_count, plan = _build_plan(request)
+    if not plan:
+        return {"msg": "No passes to reserve.", **_plan_response(candidate_count, plan), "reservations": []}
+
+    items = [
+        (item["pass_id"], item["gs_id"], item["s_id"], item["mission_id"], [])
+        for item in plan
+    ]
+    try:
+        r_ids = r_db.create_reservations_batch(items, atomic=True)
+        rows = r_db.get_reservations_with_details_by_r_ids(r_ids)
+    except sqlite3.IntegrityError:
+        # Another client reserved one of the planned passes in the meantime.
+        raise HTTPException(status_code=409, detail="Schedule is out of date; re-plan and try again.")
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Schedule could not be committed.")
+
+    reservations = [reservation_to_dict(row) for row in rows]
+    for reservation in reservations:
+        events.publish("reservations", "reservation.created", reservation)
+    return {
+        "msg": f"{len(r_ids)} passes reserved.",
+        **_plan_response(candidate_count, plan),
+        "reservations": reservations,
+    }
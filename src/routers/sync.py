@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Query
+import sqlite3
+
+import db.changes_db as changes_db
+import db.maintenance_db as maint_db
+
+router = APIRouter()
+
+
+#rows changed or deleted since a version, for clients that keep a local copy
+@router.get("/sync")
+def sync_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, gt=0, le=10000),
+):
+    try:
+        if since > changes_db.get_current_version():
+            # The client's version came from another (or a rebuilt) database.
+            raise HTTPException(
+                status_code=410,
+                detail="Version is ahead of the change log; resync from since=0.",
+            )
+        if 0 < since < (maint_db.get_checkpoint(maint_db.TOMBSTONE_WATERMARK) or 0):
+            # Deletions after this version have been pruned, so the client can't catch up from it.
+            raise HTTPException(
+                status_code=410,
+                detail="Version is older than the change log's retained tombstones; resync from since=0.",
+            )
+        return changes_db.get_changes_since(since, limit)
+    except sqlite3.Error:
+        raise HTTPException(status_code=500, detail="Unable to read changes.")
@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Annotated
+
 from pydantic import BaseModel, Field, ConfigDict
 
 GS_CODE_REGEX = r"^[A-Z][A-Z0-9_]{2,49}$"  # 3–50 chars, all caps, with numbers or underscores allowed.
@@ -7,6 +10,18 @@ class Satellite(BaseModel):
     norad_id: int = Field(..., ge=1)  # must be >= 1
     s_name: str = Field(..., min_length=1)
 
+class SatelliteBulkItem(BaseModel):
+    norad_id: int = Field(..., ge=1)
+    # Defaults to the name CelesTrak reports for the object.
+    s_name: str | None = Field(None, min_length=1)
+
+class SatelliteBulkCreate(BaseModel):
+    # Each item is a bare NORAD ID or {norad_id, s_name}.
+    satellites: list[Annotated[int, Field(ge=1)] | SatelliteBulkItem] = Field(..., min_length=1, max_length=1000)
+    fetch_tles: bool = True
+    # Predict passes for new satellites at every active station in the background.
+    precompute_passes: bool = False
+
 class SatelliteUpdate(BaseModel):
     model_config = ConfigDict(extra="forbid")
     s_name: str | None = Field(None, min_length=1)
@@ -33,7 +48,66 @@ class GSUpdate(BaseModel):
     model_config = ConfigDict(extra="forbid")
     gs_code: str | None = Field(None, min_length=3, max_length=50, pattern=GS_CODE_REGEX) 
     status: str | None = None
+
+class HorizonPoint(BaseModel):
+    azimuth: float = Field(..., ge=0, lt=360)
+    elevation: float = Field(..., ge=-90, le=90)
+
+class HorizonMask(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    # Either one elevation per azimuth degree (0 = north, clockwise), or surveyed points to interpolate.
+    elevations: list[Annotated[float, Field(ge=-90, le=90)]] | None = Field(None, min_length=360, max_length=360)
+    points: list[HorizonPoint] | None = Field(None, min_length=1, max_length=3600)
 class ReservationCreate(BaseModel):
     pass_id: int = Field(..., gt=0)
     mission_id: int | None = Field(None, gt=0)
     commands: list[str] = Field(default_factory=list)
+
+class ReservationBatchCreate(BaseModel):
+    reservations: list[ReservationCreate] = Field(..., min_length=1, max_length=1000)
+    # atomic: any invalid item rejects the whole batch; otherwise valid items are still reserved.
+    atomic: bool = True
+
+
+class ReservationFilters(BaseModel):
+    # Query-string filters for reservation listings; all optional and combined with AND.
+    include_cancelled: bool = False
+    gs_id: int | None = Field(None, gt=0)
+    norad_id: int | None = Field(None, ge=1)
+    # Repeatable: ?status=RESERVED&status=ACTIVE. Overrides include_cancelled.
+    status: list[str] | None = None
+    # Keep reservations whose pass overlaps [window_start, window_end].
+    window_start: datetime | None = None
+    window_end: datetime | None = None
+    created_after: datetime | None = None
+    limit: int | None = Field(None, gt=0)
+    # Also search reservations moved to the archive database.
+    include_archived: bool = False
+
+
+def reservation_to_dict(reservation) -> dict:
+    # Response shape of a reservation row from the reservations_db detail queries.
+    return {
+        "r_id": reservation["r_id"],
+        "mission_id": reservation["mission_id"],
+        "pass_id": reservation["pass_id"],
+        "gs_id": reservation["gs_id"],
+        "norad_id": reservation["norad_id"],
+        "start_time": reservation["start_time"],
+        "end_time": reservation["end_time"],
+        "commands": reservation["commands"].split(",") if reservation["commands"] else [],
+        "status": reservation["status"],
+        "created_at": reservation["created_at"],
+    }
+
+
+class ScheduleRequest(BaseModel):
+    mission_ids: list[int] = Field(..., min_length=1)
+    # Only passes starting within this many hours from now are considered.
+    horizon_hours: int = Field(24, gt=0, le=24 * 14)
+
+
+class TLEIngest(BaseModel):
+    # Files or directories relative to TLE_MIRROR_DIR; empty means the whole mirror.
+    paths: list[str] = Field(default_factory=list)
+    register_new: bool = True
@@ -0,0 +1,48 @@
+import logging
+import os
+import time
+from collections.abc import Callable
+
+import db.archive_db as archive_db
+
+logger = logging.getLogger("reservations")
+
+# Finished reservations stay in the live tables this many days after their pass ends.
+ARCHIVE_RETENTION_DAYS = int(os.environ.get("ARCHIVE_RETENTION_DAYS", "90"))
+DEFAULT_BATCH_SIZE = 1000
+# Pause between batches so live requests waiting on the write lock get in.
+DEFAULT_PAUSE_SECONDS = 0.05
+
+
+def archive_reservations(
+    retention_days: int = ARCHIVE_RETENTION_DAYS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pause: float = DEFAULT_PAUSE_SECONDS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict:
+    """Move reservations whose pass ended over `retention_days` ago into the archive.
+
+    Completed and cancelled history alike is moved, batch by batch, until nothing
+    older than the retention window is left in the live tables.
+    """
+    reservations = 0
+    passes = 0
+    batches = 0
+    started = time.monotonic()
+    while True:
+        moved, moved_passes = archive_db.archive_reservations_batch(retention_days, batch_size)
+        reservations += moved
+        passes += moved_passes
+        batches += 1
+        if moved < batch_size:
+            break
+        logger.info(f"Archive progress: {reservations} reservations, {passes} passes moved.")
+        if pause:
+            sleep(pause)
+
+    return {
+        "reservations": reservations,
+        "passes": passes,
+        "batches": batches,
+        "seconds": round(time.monotonic() - started, 3),
+    }
@@ -1,27 +1,307 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from pathlib import Path
+from typing import NamedTuple
+
 import httpx
 from fastapi import HTTPException
-import logging
+
+from src.core import metrics
+from src.services.tle import TLERecordReader, tle_norad_id
+from src.services.tle_ingest import find_mirror_tle, read_mirror_tles
 
 logger = logging.getLogger("celestrak_client")
 
 CELESTRAK_BASE_URL = "https://celestrak.org/NORAD/elements/gp.php"
 
-def get_tle(norad_id: int):
-    try:
-        response = httpx.get(f"{CELESTRAK_BASE_URL}?CATNR={norad_id}&FORMAT=2LE")
-        response.raise_for_status()
-    except httpx.RequestError as exc:
-        logger.error(f"CelesTrak API request failed: {exc}")
-        raise HTTPException(status_code=502, detail="CelesTrak API request failed.")
-    
-    res_str = response.text
+# When set, TLEs are read from catalogue files in this directory instead of CelesTrak
+# (for air-gapped deployments).
+TLE_MIRROR_DIR = os.environ.get("TLE_MIRROR_DIR")
+
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 10.0
+MAX_CONNECTIONS = 10
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_TIMEOUT = 60.0
+
+
+class TLEFetch(NamedTuple):
+    # None when upstream answered 304 Not Modified.
+    lines: list[str] | None
+    etag: str | None
+    last_modified: str | None
+
+
+class CircuitBreaker:
+    """Stop calling upstream after repeated failures, then let one trial through after a cooldown."""
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        # When the half-open trial request was let through; None while no trial is out.
+        self.trial_started_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.opened_at < self.reset_timeout:
+            return False
+        # Half-open: one trial at a time until it records success or failure. A trial
+        # that never reports back (e.g. cancelled) is replaced after another cooldown.
+        if self.trial_started_at is not None and now - self.trial_started_at < self.reset_timeout:
+            return False
+        self.trial_started_at = now
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("CelesTrak circuit opened after %s consecutive failures.", self.failures)
+            self.opened_at = time.monotonic()
+            self.trial_started_at = None
+
+
+class TLEClient:
+    """Pooled CelesTrak client: keep-alive connections, bounded concurrency and jittered retries."""
+
+    def __init__(
+        self,
+        base_url: str = CELESTRAK_BASE_URL,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        read_timeout: float = READ_TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+        max_concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = RETRY_BACKOFF,
+    ):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _with_retries(self, request):
+        """Run `request` under the concurrency limit, retrying transient failures."""
+        if not self.breaker.allow():
+            metrics.incr("celestrak.short_circuited")
+            raise HTTPException(status_code=503, detail="CelesTrak temporarily unavailable.")
+
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    metrics.incr("celestrak.requests")
+                    result = await request()
+                self.breaker.record_success()
+                return result
+            except httpx.HTTPStatusError as exc:
+                error = exc
+                retryable = exc.response.status_code in RETRY_STATUS_CODES
+            except httpx.TransportError as exc:
+                error = exc
+                retryable = True
+            finally:
+                metrics.observe("celestrak.request_seconds", time.perf_counter() - started)
+
+            if not retryable or attempt == self.max_retries:
+                # Only outages count towards the breaker; a 4xx means upstream is up.
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                metrics.incr("celestrak.failures")
+                logger.error(f"CelesTrak API request failed: {error}")
+                raise HTTPException(status_code=502, detail="CelesTrak API request failed.")
+
+            metrics.incr("celestrak.retries")
+            # Full jitter keeps retries from many workers from lining up.
+            await asyncio.sleep(random.uniform(0, self.backoff * 2**attempt))
+
+    async def fetch_tle(
+        self,
+        norad_id: int,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> TLEFetch:
+        """Fetch one TLE, conditionally when validators from a previous fetch are given."""
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async def request():
+            response = await self._client.get(
+                self.base_url, params={"CATNR": norad_id, "FORMAT": "2LE"}, headers=headers
+            )
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+
+        response = await self._with_retries(request)
+        if response.status_code == 304:
+            metrics.incr("celestrak.not_modified")
+            return TLEFetch(None, etag, last_modified)
+
+        res_str = response.text
+        tle_list = [line.strip() for line in res_str.splitlines() if line.strip()]
+
+        if len(tle_list) < 2:
+            logger.error(f"CelesTrak returned no TLE for NORAD {norad_id}")
+            raise HTTPException(status_code=404, detail="TLE not found for satellite.")
+
+        return TLEFetch(
+            tle_list[:2],
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+
+    async def fetch_tles(
+        self,
+        group: str | None = None,
+        norad_ids: list[int] | None = None,
+        wanted: set[int] | None = None,
+        names: dict[int, str] | None = None,
+    ) -> dict[int, tuple[str, str]]:
+        """Fetch many TLEs in one request, either a CelesTrak GROUP or a CATNR list.
+
+        The response is parsed while it streams in; only records whose NORAD ID is in
+        `wanted` (when given) are kept, so large groups don't have to fit in memory.
+        Passing a `names` dict requests 3LE and fills it with each object's name.
+        """
+        if (group is None) == (not norad_ids):
+            raise ValueError("Provide exactly one of group or norad_ids.")
+
+        params = {"FORMAT": "2LE" if names is None else "3LE"}
+        if group is not None:
+            params["GROUP"] = group
+        else:
+            params["CATNR"] = ",".join(str(n) for n in norad_ids)
+
+        async def request():
+            tles: dict[int, tuple[str, str]] = {}
+            reader = TLERecordReader()
+            async with self._client.stream("GET", self.base_url, params=params) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    record = reader.feed(line)
+                    if record is None:
+                        continue
+                    name, line1, line2 = record
+                    try:
+                        norad_id = tle_norad_id(line1)
+                    except ValueError:
+                        continue
+                    if wanted is None or norad_id in wanted:
+                        tles[norad_id] = (line1, line2)
+                        if names is not None and name:
+                            names[norad_id] = name
+            return tles
+
+        return await self._with_retries(request)
+
+
+_client: TLEClient | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+async def start_tle_client() -> None:
+    """Create the shared client; called from the app lifespan."""
+    global _client, _loop
+    _client = TLEClient()
+    _loop = asyncio.get_running_loop()
+
+
+async def stop_tle_client() -> None:
+    global _client, _loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _loop = None
+
+
+def get_tle_client() -> TLEClient | None:
+    return _client
+
+
+def _run(call, base_url: str | None = None):
+    """Run `call(client)` from synchronous code.
+
+    Sync routes run in worker threads, so the coroutine is handed to the lifespan
+    loop that owns the shared client. Scripts (no app running) or explicit
+    `base_url` overrides get a short-lived client instead.
+    """
+    if base_url is None and _client is not None and _loop is not None:
+        return asyncio.run_coroutine_threadsafe(call(_client), _loop).result()
+
+    async def run_once():
+        client = TLEClient(base_url or CELESTRAK_BASE_URL)
+        try:
+            return await call(client)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run_once())
 
-    tle_list = [line.strip() for line in res_str.splitlines() if line.strip()]
 
-    if len(tle_list) < 2:
-        logger.error(f"CelesTrak returned no TLE for NORAD {norad_id}")
-        raise HTTPException(status_code=404, detail="TLE not found for satellite.")
+def get_tle(
+    norad_id: int,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> TLEFetch:
+    if TLE_MIRROR_DIR:
+        lines = find_mirror_tle(Path(TLE_MIRROR_DIR), norad_id)
+        if lines is None:
+            logger.error(f"Local mirror has no TLE for NORAD {norad_id}")
+            raise HTTPException(status_code=404, detail="TLE not found for satellite.")
+        return TLEFetch(list(lines), None, None)
+    return _run(lambda client: client.fetch_tle(norad_id, etag, last_modified))
 
-    # tle_dict = {"tle_line_1": tle_list[0], "tle_line_2": tle_list[1]}
 
-    return tle_list[:2]
+def get_tles(
+    group: str | None = None,
+    norad_ids: list[int] | None = None,
+    wanted: set[int] | None = None,
+    base_url: str | None = None,
+    names: dict[int, str] | None = None,
+) -> dict[int, tuple[str, str]]:
+    if TLE_MIRROR_DIR and base_url is None:
+        return read_mirror_tles(Path(TLE_MIRROR_DIR), group=group, wanted=wanted, names=names)
+    return _run(
+        lambda client: client.fetch_tles(group=group, norad_ids=norad_ids, wanted=wanted, names=names),
+        base_url=base_url,
+    )
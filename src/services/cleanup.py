@@ -0,0 +1,68 @@
+import logging
+import time
+from collections.abc import Callable
+
+import db.maintenance_db as maint_db
+
+logger = logging.getLogger("reservations")
+
+CLEANUP_JOB = "cleanup_cancelled_reservations"
+DEFAULT_BATCH_SIZE = 1000
+# Pause between batches so live requests waiting on the write lock get in.
+DEFAULT_PAUSE_SECONDS = 0.05
+
+
+def cleanup_cancelled_reservations(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pause: float = DEFAULT_PAUSE_SECONDS,
+    max_batches: int | None = None,
+    restart: bool = False,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict:
+    """Delete cancelled reservations with expired passes in bounded r_id ranges.
+
+    Each batch is its own short write transaction that also records a checkpoint,
+    so an interrupted run resumes where it stopped. A completed run clears the
+    checkpoint; the next run scans from the start again, since reservations
+    cancelled earlier may have expired since. `max_batches` stops early and
+    leaves the checkpoint in place.
+    """
+    start = 0 if restart else (maint_db.get_checkpoint(CLEANUP_JOB) or 0)
+    end = maint_db.get_max_reservation_id()
+    if start:
+        logger.info(f"Resuming cleanup after r_id {start}.")
+
+    position = start
+    deleted = 0
+    batches = 0
+    started = time.monotonic()
+    while position < end:
+        if max_batches is not None and batches >= max_batches:
+            break
+        upper = min(position + batch_size, end)
+        deleted += maint_db.delete_cancelled_expired_reservations_range(CLEANUP_JOB, position, upper)
+        position = upper
+        batches += 1
+
+        elapsed = time.monotonic() - started
+        scanned = position - start
+        logger.info(
+            f"Cleanup progress: r_id {position}/{end} "
+            f"({100 * position / end:.1f}%), {deleted} deleted, "
+            f"{scanned / elapsed if elapsed else 0:.0f} ids/s."
+        )
+        if position < end and pause:
+            sleep(pause)
+
+    complete = position >= end
+    if complete:
+        maint_db.clear_checkpoint(CLEANUP_JOB)
+
+    return {
+        "deleted": deleted,
+        "batches": batches,
+        "scanned_to": position,
+        "max_r_id": end,
+        "complete": complete,
+        "seconds": round(time.monotonic() - started, 3),
+    }
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import NamedTuple
+
+import db.changes_db as changes_db
+import db.commands_db as c_db
+from db import db_init
+
+# How often the catalog's change version is re-read; between checks the snapshot is served as-is.
+VERSION_CHECK_INTERVAL = 1.0
+
+
+class CatalogSnapshot(NamedTuple):
+    db_path: str
+    version: int
+    commands: tuple[dict, ...]
+    types: frozenset[str]
+
+
+_lock = threading.Lock()
+_snapshot: CatalogSnapshot | None = None
+_checked_at = 0.0
+
+
+def get_catalog() -> CatalogSnapshot:
+    """Immutable command catalog snapshot, reloaded only when command_catalog changes.
+
+    Changes are detected through the table's change_log version (kept by triggers),
+    checked at most once per VERSION_CHECK_INTERVAL.
+    """
+    global _snapshot, _checked_at
+    snapshot = _snapshot
+    db_path = str(db_init.DB_PATH)
+    if (
+        snapshot is not None
+        and snapshot.db_path == db_path
+        and time.monotonic() - _checked_at < VERSION_CHECK_INTERVAL
+    ):
+        return snapshot
+
+    with _lock:
+        version = changes_db.get_table_versions(["command_catalog"])["command_catalog"]
+        snapshot = _snapshot
+        if snapshot is None or snapshot.db_path != db_path or snapshot.version != version:
+            rows = c_db.get_all_commands() or []
+            commands = tuple(dict(row) for row in rows)
+            snapshot = CatalogSnapshot(
+                db_path=db_path,
+                version=version,
+                commands=commands,
+                types=frozenset(command["command_type"] for command in commands),
+            )
+            _snapshot = snapshot
+        _checked_at = time.monotonic()
+        return snapshot
+
+
+def invalidate() -> None:
+    """Drop the snapshot so the next read reloads from the database."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
@@ -0,0 +1,141 @@
+import asyncio
+import itertools
+import logging
+import secrets
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+logger = logging.getLogger("events")
+
+# Events kept for resuming subscribers; an older resume token gets a "reset" instead.
+HISTORY_SIZE = 1000
+# Events buffered per subscriber before it is dropped as too slow.
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Subscription:
+    """One live subscriber: an asyncio queue fed from any thread via its loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, topics: set[str] | None):
+        self.loop = loop
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Set when events were dropped; the stream ends so the client resumes from history.
+        self.overflowed = False
+        # Sequence number of the last event published before this subscriber was registered.
+        self.start_seq = 0
+
+    def wants(self, event: dict) -> bool:
+        return self.topics is None or event["topic"] in self.topics
+
+    def _put(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class EventBroker:
+    """In-process fan-out of change events with a bounded replay history.
+
+    Publishers are the sync route handlers (running in the threadpool), so
+    publish() is thread-safe and hands events to each subscriber's event loop.
+    Event ids are "<epoch>-<seq>": seq increases monotonically and the epoch is
+    drawn afresh for each broker, so a resume token issued before a restart is
+    recognised as foreign instead of matching unrelated events.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self.epoch = secrets.token_hex(4)
+        self._ids = itertools.count(1)
+        self._last_seq = 0
+        self._history: deque[dict] = deque(maxlen=history_size)
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def last_id(self) -> str:
+        return self.event_id(self._last_seq)
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def sequence(self, event_id: str) -> int | None:
+        """The seq of an id issued by this broker, or None for any other token."""
+        epoch, _, seq = event_id.rpartition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, topic: str, event_type: str, data: dict) -> dict:
+        with self._lock:
+            self._last_seq = next(self._ids)
+            event = {
+                "id": self.event_id(self._last_seq),
+                "topic": topic,
+                "type": event_type,
+                "at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                "data": data,
+            }
+            self._history.append(event)
+            subscribers = [sub for sub in self._subscribers if sub.wants(event)]
+
+        for sub in subscribers:
+            if sub.overflowed:
+                # Never read (or too slow); its stream ends and the client resumes from history.
+                self.unsubscribe(sub)
+                continue
+            try:
+                sub.loop.call_soon_threadsafe(sub._put, event)
+            except RuntimeError:
+                # The subscriber's loop is gone; it will never read again.
+                self.unsubscribe(sub)
+        return event
+
+    def replay(self, last_id: str, topics: set[str] | None = None) -> list[dict] | None:
+        """Events after `last_id`, or None if the token is older than the history or foreign."""
+        with self._lock:
+            last_seq = self.sequence(last_id)
+            if last_seq is None or last_seq > self._last_seq:
+                # Token from before a restart, or never issued.
+                return None
+            if last_seq < self._last_seq and (
+                not self._history or self.sequence(self._history[0]["id"]) > last_seq + 1
+            ):
+                return None
+            return [
+                event
+                for event in self._history
+                if self.sequence(event["id"]) > last_seq and (topics is None or event["topic"] in topics)
+            ]
+
+    def subscribe(self, topics: set[str] | None = None) -> Subscription:
+        sub = Subscription(asyncio.get_running_loop(), topics)
+        with self._lock:
+            sub.start_seq = self._last_seq
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.epoch = secrets.token_hex(4)
+            self._ids = itertools.count(1)
+            self._last_seq = 0
+            self._history.clear()
+            self._subscribers.clear()
+
+
+broker = EventBroker()
+
+
+def publish(topic: str, event_type: str, data: dict) -> None:
+    """Publish a change event; never lets a feed problem fail the write that caused it."""
+    try:
+        broker.publish(topic, event_type, data)
+    except Exception:
+        logger.exception(f"Failed to publish {event_type} event.")
@@ -0,0 +1,126 @@
+import csv
+import io
+from collections.abc import Iterable, Iterator
+
+import db.reservations_db as r_db
+
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+EXPORT_CHUNK_SIZE = 10000
+
+_TIMESTAMP_COLUMNS = {"start_time", "end_time", "created_at", "cancelled_at"}
+_INTEGER_COLUMNS = {"r_id", "mission_id", "pass_id", "gs_id", "norad_id", "duration"}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that collects bytes until they are drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(pa):
+    fields = []
+    for column in r_db.RESERVATION_EXPORT_COLUMNS:
+        if column in _TIMESTAMP_COLUMNS:
+            fields.append((column, pa.timestamp("s")))
+        elif column in _INTEGER_COLUMNS:
+            fields.append((column, pa.int64()))
+        elif column == "max_elevation":
+            fields.append((column, pa.float64()))
+        else:
+            fields.append((column, pa.string()))
+    return pa.schema(fields)
+
+
+def _record_batch(pa, schema, rows: list[tuple]):
+    # Transpose the chunk once and build each column in a single Arrow call.
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_timestamp(field.type):
+            arrays.append(pa.array(values, pa.string()).cast(field.type))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_csv(batches: Iterable[list[tuple]]) -> Iterator[bytes]:
+    sink = io.StringIO()
+    writer = csv.writer(sink)
+    writer.writerow(r_db.RESERVATION_EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield sink.getvalue().encode("utf-8")
+        sink.seek(0)
+        sink.truncate()
+    if sink.tell():
+        yield sink.getvalue().encode("utf-8")
+
+
+def iter_arrow(batches: Iterable[list[tuple]], fmt: str) -> Iterator[bytes]:
+    """Encode chunks as Parquet (one row group per chunk) or an Arrow IPC stream."""
+    import pyarrow as pa
+
+    schema = _arrow_schema(pa)
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for rows in batches:
+            writer.write_batch(_record_batch(pa, schema, rows))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def iter_reservation_export(
+    fmt: str,
+    include_cancelled: bool = True,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Stream the reservation history in `fmt`, holding at most one chunk in memory.
+
+    Parquet and Arrow need the optional `pyarrow` package.
+    """
+    batches = r_db.iter_reservation_export_batches(chunk_size, include_cancelled)
+    if fmt == "csv":
+        return iter_csv(batches)
+    return iter_arrow(batches, fmt)
@@ -0,0 +1,78 @@
+import math
+
+from src.services.tle import tle_mean_motion
+
+EARTH_RADIUS_KM = 6371.0
+# Standard gravitational parameter of Earth, km^3 / s^2.
+EARTH_MU = 398600.4418
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+Box = tuple[float, float, float, float]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points on a spherical Earth."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_boxes(lat: float, lon: float, radius_km: float) -> list[Box]:
+    """(min_lat, max_lat, min_lon, max_lon) boxes covering every point within `radius_km`.
+
+    Boxes crossing the antimeridian are split in two; a circle reaching a pole
+    covers every longitude.
+    """
+    angle = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - angle, lat + angle
+    if min_lat <= -90 or max_lat >= 90 or angle >= 180:
+        return [(max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0)]
+
+    # Widest longitude spread of the circle, reached away from the centre latitude.
+    spread = math.degrees(math.asin(min(1.0, math.sin(math.radians(angle)) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - spread, lon + spread
+    if min_lon < -180:
+        return [(min_lat, max_lat, min_lon + 360, 180.0), (min_lat, max_lat, -180.0, max_lon)]
+    if max_lon > 180:
+        return [(min_lat, max_lat, min_lon, 180.0), (min_lat, max_lat, -180.0, max_lon - 360)]
+    return [(min_lat, max_lat, min_lon, max_lon)]
+
+
+def footprint_angle_deg(altitude_km: float, min_elevation_deg: float = 0.0) -> float:
+    """Earth central angle from the sub-satellite point to where the satellite sits at `min_elevation_deg`."""
+    if altitude_km <= 0:
+        return 0.0
+    elevation = math.radians(min_elevation_deg)
+    ratio = EARTH_RADIUS_KM * math.cos(elevation) / (EARTH_RADIUS_KM + altitude_km)
+    return math.degrees(math.acos(ratio) - elevation)
+
+
+def visibility_radius_km(altitude_km: float, min_elevation_deg: float = 0.0) -> float:
+    """Ground distance within which a satellite at `altitude_km` is above `min_elevation_deg`."""
+    return EARTH_RADIUS_KM * math.radians(footprint_angle_deg(altitude_km, min_elevation_deg))
+
+
+def orbit_reach_deg(tle_line2: str, min_elevation_deg: float = 0.0) -> float:
+    """Highest |latitude| from which the satellite can ever be seen above `min_elevation_deg`.
+
+    The ground track never leaves +/- inclination (mirrored for retrograde orbits);
+    the footprint at apogee, the widest it gets, extends that band.
+    """
+    inclination = float(tle_line2[8:16])
+    eccentricity = float("0." + tle_line2[26:33].strip())
+    mean_motion = tle_mean_motion(tle_line2) * 2 * math.pi / 86400
+    semi_major_axis = (EARTH_MU / mean_motion ** 2) ** (1 / 3)
+    apogee_km = semi_major_axis * (1 + eccentricity) - EARTH_RADIUS_KM
+    track_lat = inclination if inclination <= 90 else 180 - inclination
+    return min(90.0, track_lat + footprint_angle_deg(apogee_km, min_elevation_deg))
+
+
+def station_can_see_orbit(gs_lat: float, tle_line2: str, min_elevation_deg: float = 0.0) -> bool:
+    """False when the station lies outside every footprint the orbit can produce."""
+    try:
+        return abs(gs_lat) <= orbit_reach_deg(tle_line2, min_elevation_deg)
+    except (TypeError, ValueError, ZeroDivisionError):
+        # Unparseable elements: let the propagator decide.
+        return True
@@ -0,0 +1,146 @@
+import csv
+from collections.abc import Iterator
+from typing import TextIO
+
+from pydantic import ValidationError
+
+import db.gs_db as gs_db
+from src.core.json_stream import iter_json_array
+from src.schemas import GroundStation
+
+GS_IMPORT_FORMATS = ("csv", "geojson")
+# Validated rows are held until the single insert transaction, so bound the file.
+MAX_IMPORT_ROWS = 10000
+IMPORT_SOURCE = "IMPORT"
+
+_CONFLICT_DETAILS = {
+    "gs_code": "gs_code already registered (gs_id {gs_id}).",
+    "coordinates": "(lat, lon) already registered (gs_id {gs_id}).",
+}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _iter_geojson(fh: TextIO) -> Iterator[dict]:
+    # Malformed features become per-row errors, like invalid CSV rows, rather than failing the import.
+    for feature in iter_json_array(fh, key="features"):
+        if not isinstance(feature, dict):
+            yield {"_error": "Feature must be an object."}
+            continue
+        properties = feature.get("properties") or {}
+        if not isinstance(properties, dict):
+            yield {"_error": "Feature properties must be an object."}
+            continue
+        properties = dict(properties)
+        geometry = feature.get("geometry")
+        if not isinstance(geometry, dict) or geometry.get("type") != "Point":
+            properties["_error"] = "Feature geometry must be a Point."
+            yield properties
+            continue
+        coordinates = geometry.get("coordinates")
+        if not isinstance(coordinates, list) or len(coordinates) < 2 or not all(map(_is_number, coordinates[:2])):
+            properties["_error"] = "Point coordinates must be [lon, lat] or [lon, lat, alt] numbers."
+            yield properties
+            continue
+        record = {**properties, "lon": coordinates[0], "lat": coordinates[1]}
+        if len(coordinates) > 2:
+            record["alt"] = coordinates[2]
+        yield record
+
+
+def iter_gs_records(fh: TextIO, fmt: str) -> Iterator[dict]:
+    """Stream raw station records from CSV (gs_code,lon,lat,alt[,status]) or a GeoJSON FeatureCollection.
+
+    GeoJSON features are Points with [lon, lat(, alt)] coordinates and gs_code,
+    status and (if not in the coordinates) alt as properties.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(fh):
+            # Blank cells fall back to the schema defaults.
+            yield {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+    elif fmt == "geojson":
+        yield from _iter_geojson(fh)
+    else:
+        raise ValueError(f"Format must be one of: {', '.join(GS_IMPORT_FORMATS)}")
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def import_ground_stations(fh: TextIO, fmt: str, atomic: bool = True) -> dict:
+    """Validate every record, then insert the valid ones in one transaction.
+
+    Rows are checked with the GroundStation schema and normalised like
+    POST /groundstations; duplicates within the file and clashes with registered
+    stations are reported per row. With `atomic`, any error means nothing is inserted.
+    """
+    errors = []
+    rows = []
+    codes: dict[str, int] = {}
+    coordinates: dict[tuple[float, float], int] = {}
+    total = 0
+    for index, record in enumerate(iter_gs_records(fh, fmt)):
+        total += 1
+        if total > MAX_IMPORT_ROWS:
+            raise ValueError(f"Imports are limited to {MAX_IMPORT_ROWS} ground stations.")
+        gs_code = record.get("gs_code")
+        if "_error" in record:
+            errors.append({"index": index, "gs_code": gs_code, "status_code": 400, "detail": record["_error"]})
+            continue
+        try:
+            gs = GroundStation.model_validate(record)
+        except ValidationError as exc:
+            errors.append({"index": index, "gs_code": gs_code, "status_code": 400, "detail": _validation_detail(exc)})
+            continue
+
+        lat, lon, alt = round(gs.lat, 5), round(gs.lon, 5), round(gs.alt, 2)
+        status = gs.status.upper()
+        if status not in ("ACTIVE", "INACTIVE"):
+            errors.append(
+                {"index": index, "gs_code": gs.gs_code, "status_code": 400, "detail": "Status must be 'ACTIVE' or 'INACTIVE'."}
+            )
+            continue
+        if gs.gs_code in codes:
+            errors.append(
+                {"index": index, "gs_code": gs.gs_code, "status_code": 409, "detail": f"Duplicate gs_code in file (index {codes[gs.gs_code]})."}
+            )
+            continue
+        if (lat, lon) in coordinates:
+            errors.append(
+                {"index": index, "gs_code": gs.gs_code, "status_code": 409, "detail": f"Duplicate (lat, lon) in file (index {coordinates[(lat, lon)]})."}
+            )
+            continue
+        codes[gs.gs_code] = index
+        coordinates[(lat, lon)] = index
+        rows.append((index, gs.gs_code, lat, lon, alt, status, IMPORT_SOURCE))
+
+    inserted: dict[int, int] = {}
+    if rows:
+        # An atomic import that already failed validation still reports clashes, but inserts nothing.
+        inserted, conflicts = gs_db.insert_gs_batch(rows, atomic=atomic, check_only=bool(errors) and atomic)
+        by_index = {row[0]: row for row in rows}
+        for index, field, gs_id in conflicts:
+            errors.append(
+                {
+                    "index": index,
+                    "gs_code": by_index[index][1],
+                    "status_code": 409,
+                    "detail": _CONFLICT_DETAILS[field].format(gs_id=gs_id),
+                }
+            )
+
+    stations = [
+        {"gs_id": inserted[row[0]], "gs_code": row[1], "lat": row[2], "lon": row[3], "alt": row[4], "status": row[5]}
+        for row in rows
+        if row[0] in inserted
+    ]
+    return {
+        "total": total,
+        "ground_stations": stations,
+        "errors": sorted(errors, key=lambda error: error["index"]),
+    }
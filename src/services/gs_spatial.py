@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from pyorbital.orbital import Orbital
+
+import db.gs_db as gs_db
+from src.services import geo
+
+# First search radius for nearest-N queries; doubled until enough stations are found.
+NEAREST_START_RADIUS_KM = 500.0
+
+
+def stations_within(lat: float, lon: float, radius_km: float, active_only: bool = False) -> list[dict]:
+    """Stations within `radius_km` of (lat, lon), nearest first, with `distance_km`.
+
+    The R*Tree narrows the search to the circle's bounding boxes; exact
+    great-circle distance then trims the corners.
+    """
+    stations = []
+    for row in gs_db.get_gs_in_boxes(geo.bounding_boxes(lat, lon, radius_km), active_only) or []:
+        distance = geo.haversine_km(lat, lon, row["lat"], row["lon"])
+        if distance <= radius_km:
+            stations.append({**dict(row), "distance_km": round(distance, 3)})
+    return sorted(stations, key=lambda station: station["distance_km"])
+
+
+def nearest_stations(lat: float, lon: float, limit: int, active_only: bool = False) -> list[dict]:
+    """The `limit` stations closest to (lat, lon), growing the search radius as needed."""
+    radius = NEAREST_START_RADIUS_KM
+    while True:
+        stations = stations_within(lat, lon, radius, active_only)
+        # Anything inside the radius is closer than anything outside it.
+        if len(stations) >= limit or radius >= geo.HALF_CIRCUMFERENCE_KM:
+            return stations[:limit]
+        radius = min(radius * 2, geo.HALF_CIRCUMFERENCE_KM)
+
+
+def sub_satellite_point(name: str, tle_line1: str, tle_line2: str, when: datetime) -> tuple[float, float, float]:
+    """(lat, lon, altitude_km) of the satellite at `when`."""
+    orbital = Orbital(name, line1=tle_line1, line2=tle_line2)
+    lon, lat, alt = orbital.get_lonlatalt(when)
+    return float(lat), float(lon), float(alt)
+
+
+def stations_seeing(
+    lat: float,
+    lon: float,
+    altitude_km: float,
+    min_elevation_deg: float = 0.0,
+    active_only: bool = True,
+) -> list[dict]:
+    """Stations that see a satellite above (lat, lon) at `altitude_km` at or above `min_elevation_deg`."""
+    return stations_within(lat, lon, geo.visibility_radius_km(altitude_km, min_elevation_deg), active_only)
@@ -0,0 +1,40 @@
+import numpy as np
+
+import db.gs_db as gs_db
+
+# One elevation per whole degree of azimuth, 0 = north, clockwise.
+MASK_SIZE = 360
+# Stored as int16 tenths of a degree: 720 bytes per station.
+MASK_SCALE = 10
+_MASK_DTYPE = np.dtype("<i2")
+
+
+def encode_mask(elevations) -> bytes:
+    values = np.rint(np.asarray(elevations, dtype=float) * MASK_SCALE)
+    if values.shape != (MASK_SIZE,):
+        raise ValueError(f"A horizon mask has exactly {MASK_SIZE} elevations.")
+    return values.astype(_MASK_DTYPE).tobytes()
+
+
+def decode_mask(blob: bytes) -> np.ndarray:
+    """Elevations in degrees, indexed by azimuth degree."""
+    return np.frombuffer(blob, dtype=_MASK_DTYPE).astype(float) / MASK_SCALE
+
+
+def mask_from_points(points: list[tuple[float, float]]) -> np.ndarray:
+    """Full mask from surveyed (azimuth, elevation) points, interpolated linearly around the circle."""
+    azimuths = np.array([az for az, _ in points], dtype=float) % MASK_SIZE
+    elevations = np.array([el for _, el in points], dtype=float)
+    order = np.argsort(azimuths)
+    return np.interp(np.arange(MASK_SIZE), azimuths[order], elevations[order], period=MASK_SIZE)
+
+
+def load_mask(gs_id: int) -> np.ndarray | None:
+    """The station's mask, or None for a flat horizon."""
+    blob = gs_db.get_horizon_mask(gs_id)
+    return decode_mask(blob) if blob is not None else None
+
+
+def mask_limits(mask: np.ndarray, azimuths: np.ndarray) -> np.ndarray:
+    """Mask elevation for each azimuth (degrees), by whole-degree bin."""
+    return mask[np.floor(azimuths).astype(int) % MASK_SIZE]
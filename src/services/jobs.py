@@ -0,0 +1,93 @@
+import logging
+import time
+from collections.abc import Callable
+
+import db.gs_db as gs_db
+import db.jobs_db as jobs_db
+from src.services import events
+
+logger = logging.getLogger("jobs")
+
+# Rows per chunk; each chunk is its own short write transaction.
+JOB_BATCH_SIZE = 500
+# Pause between chunks so live requests waiting on the write lock get in.
+DEFAULT_PAUSE_SECONDS = 0.05
+# A RUNNING job whose counters haven't moved for this long is taken over (its worker died).
+STALE_AFTER_SECONDS = 60
+
+
+def _drain(chunk: Callable[[int], int], batch_size: int, pause: float, sleep: Callable[[float], None]) -> None:
+    while chunk(batch_size) >= batch_size:
+        if pause:
+            sleep(pause)
+
+
+def _deactivate_gs(job, batch_size: int, pause: float, sleep: Callable[[float], None]) -> str:
+    job_id, gs_id = job["job_id"], job["target_id"]
+    _drain(lambda n: jobs_db.cancel_gs_reservations_chunk(job_id, gs_id, n), batch_size, pause, sleep)
+    _drain(lambda n: jobs_db.delete_future_gs_passes_chunk(job_id, gs_id, n), batch_size, pause, sleep)
+    gs = gs_db.get_gs_by_id(gs_id)
+    # Reactivated (or deleted) mid-run: the chunks stopped matching, stop here too.
+    return "COMPLETED" if gs and gs["status"] == "INACTIVE" else "CANCELLED"
+
+
+def _delete_target(job, batch_size: int, pause: float, sleep: Callable[[float], None]) -> str:
+    job_id, kind, target_id = job["job_id"], job["kind"], job["target_id"]
+    _drain(lambda n: jobs_db.delete_reservations_chunk(job_id, kind, target_id, n), batch_size, pause, sleep)
+    _drain(lambda n: jobs_db.delete_passes_chunk(job_id, kind, target_id, n), batch_size, pause, sleep)
+    jobs_db.delete_target(job_id, kind, target_id)
+    return "COMPLETED"
+
+
+_RUNNERS = {
+    "gs_deactivate": _deactivate_gs,
+    "gs_delete": _delete_target,
+    "satellite_delete": _delete_target,
+}
+
+
+def _publish_finished(job: dict) -> None:
+    events.publish("jobs", f"job.{job['status'].lower()}", job)
+    if job["kind"] == "gs_delete" and job["status"] == "COMPLETED":
+        events.publish("groundstations", "groundstation.deleted", {"gs_id": job["target_id"]})
+
+
+def run_job(
+    job_id: int,
+    batch_size: int = JOB_BATCH_SIZE,
+    pause: float = DEFAULT_PAUSE_SECONDS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict | None:
+    """Run a queued job to completion in chunks; returns the final job row.
+
+    Returns None when the job is finished or another worker holds it. Every chunk
+    commits its work and the job's counters together, and each step only matches
+    rows still left to do, so a job interrupted at any point is finished by
+    running it again (see resume_jobs).
+    """
+    if not jobs_db.claim_job(job_id, STALE_AFTER_SECONDS):
+        return None
+    job = jobs_db.get_job(job_id)
+    logger.info(f"Job {job_id}: {job['kind']} {job['target_id']} started.")
+    try:
+        jobs_db.finish_job(job_id, _RUNNERS[job["kind"]](job, batch_size, pause, sleep))
+    except Exception as exc:
+        logger.exception(f"Job {job_id} failed.")
+        jobs_db.finish_job(job_id, "FAILED", str(exc))
+
+    finished = dict(jobs_db.get_job(job_id))
+    logger.info(
+        f"Job {job_id}: {finished['status']}, {finished['reservations_cancelled']} reservations cancelled, "
+        f"{finished['reservations_deleted']} deleted, {finished['passes_deleted']} passes deleted."
+    )
+    _publish_finished(finished)
+    return finished
+
+
+def resume_jobs() -> int:
+    """Run every pending or abandoned job; returns how many were run."""
+    ran = 0
+    for job_id in jobs_db.get_resumable_job_ids(STALE_AFTER_SECONDS):
+        if run_job(job_id) is not None:
+            ran += 1
+    return ran
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+import db.idempotency_db as idem_db
+import db.maintenance_db as maint_db
+import db.passes_db as p_db
+from src.core import metrics
+from src.services import archive, jobs, storage
+
+logger = logging.getLogger("maintenance")
+
+# Set MAINTENANCE_ENABLED=0 to run housekeeping only from external jobs (e.g. cron).
+MAINTENANCE_ENABLED = os.environ.get("MAINTENANCE_ENABLED", "1") != "0"
+PASS_EXPIRY_INTERVAL = 300.0
+IDEMPOTENCY_PURGE_INTERVAL = 3600.0
+ARCHIVE_INTERVAL = 86400.0
+STORAGE_INTERVAL = 86400.0
+TOMBSTONE_PRUNE_INTERVAL = 86400.0
+# Sync clients that stay away longer than this must resync from since=0.
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get("TOMBSTONE_RETENTION_DAYS", "30"))
+# Also runs once at startup, which resumes jobs interrupted by a restart.
+JOB_RESUME_INTERVAL = 60.0
+# Rows deleted per transaction, so expiry never holds the write lock for long.
+EXPIRY_BATCH_SIZE = 5000
+
+
+class MaintenanceTask(NamedTuple):
+    name: str
+    interval: float
+    run: Callable[[], int]
+
+
+def expire_passes(batch_size: int = EXPIRY_BATCH_SIZE) -> int:
+    """Drop the day partitions that have fully ended, then delete leftovers from predicted_passes.
+
+    Cached passes are partitioned by end day, so a past day goes in one DROP
+    TABLE. predicted_passes only keeps passes that were once reserved (and rows
+    from before partitioning); those are deleted one bounded batch at a time.
+    """
+    total = p_db.drop_expired_pass_partitions()
+    while True:
+        deleted = p_db.delete_unreserved_expired_passes(limit=batch_size)
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+def purge_idempotency_keys() -> int:
+    return idem_db.delete_expired_idempotency_keys()
+
+
+def archive_reservations() -> int:
+    return archive.archive_reservations()["reservations"]
+
+
+def optimize_storage() -> int:
+    """Returns pages reclaimed; the full before/after report goes to the log."""
+    report = storage.optimize_storage()
+    logger.info(
+        f"Storage: {report['before']['file_bytes']} -> {report['after']['file_bytes']} bytes, "
+        f"{report['before']['page_count']} -> {report['after']['page_count']} pages"
+        + (f", skipped {', '.join(report['skipped'])}." if report["skipped"] else ".")
+    )
+    return report["steps"]["vacuumed_pages"]
+
+
+def resume_jobs() -> int:
+    return jobs.resume_jobs()
+
+
+def prune_tombstones(retention_days: int = TOMBSTONE_RETENTION_DAYS) -> int:
+    return maint_db.prune_change_log_tombstones(retention_days)
+
+
+def default_tasks() -> list[MaintenanceTask]:
+    return [
+        MaintenanceTask("expire_passes", PASS_EXPIRY_INTERVAL, expire_passes),
+        MaintenanceTask("purge_idempotency_keys", IDEMPOTENCY_PURGE_INTERVAL, purge_idempotency_keys),
+        MaintenanceTask("archive_reservations", ARCHIVE_INTERVAL, archive_reservations),
+        MaintenanceTask("optimize_storage", STORAGE_INTERVAL, optimize_storage),
+        MaintenanceTask("resume_jobs", JOB_RESUME_INTERVAL, resume_jobs),
+        MaintenanceTask("prune_tombstones", TOMBSTONE_PRUNE_INTERVAL, prune_tombstones),
+    ]
+
+
+def run_task(task: MaintenanceTask) -> int | None:
+    """Run one task synchronously, recording count, duration and failures in metrics."""
+    started = time.perf_counter()
+    try:
+        affected = task.run()
+    except Exception:
+        metrics.incr(f"maintenance.{task.name}.failures")
+        logger.exception(f"Maintenance task {task.name} failed.")
+        return None
+    finally:
+        metrics.observe(f"maintenance.{task.name}.seconds", time.perf_counter() - started)
+    metrics.incr(f"maintenance.{task.name}.runs")
+    metrics.incr(f"maintenance.{task.name}.rows", affected)
+    if affected:
+        logger.info(f"Maintenance task {task.name}: {affected} rows.")
+    return affected
+
+
+async def _run_periodically(task: MaintenanceTask) -> None:
+    while True:
+        # Database work runs in a worker thread so the event loop keeps serving requests.
+        await asyncio.to_thread(run_task, task)
+        await asyncio.sleep(task.interval)
+
+
+_running: list[asyncio.Task] = []
+
+
+def start_maintenance(tasks: list[MaintenanceTask] | None = None) -> None:
+    """Start each task on its own timer in the running event loop (called from the lifespan)."""
+    if _running or not MAINTENANCE_ENABLED:
+        return
+    for task in tasks if tasks is not None else default_tasks():
+        _running.append(asyncio.create_task(_run_periodically(task), name=f"maintenance:{task.name}"))
+
+
+async def stop_maintenance() -> None:
+    tasks = list(_running)
+    _running.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,110 @@
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import db.gs_db as gs_db
+import db.passes_db as p_db
+import db.satellites_db as sat_db
+from src.services import events, geo, horizon
+from src.services.predict_passes import get_pass_predictions
+from src.services.tle import parse_db_time
+
+logger = logging.getLogger("pass_routing")
+
+# Passes are predicted this far ahead, and re-predicted once the cache covers less.
+PASS_HORIZON_HOURS = 24
+
+
+def pass_cache_is_stale(s_id: int, gs_id: int, now_utc: datetime) -> bool:
+    """True when cached passes for the pair end before the prediction horizon."""
+    latest_row = p_db.get_latest_pass_end_time(gs_id, s_id)
+    if latest_row is None:
+        return True
+    return parse_db_time(latest_row["end_time"]) < now_utc + timedelta(hours=PASS_HORIZON_HOURS)
+
+
+def cache_predicted_passes(satellite, gs, predictions: list[dict]) -> list[int]:
+    """Insert predictions not already cached; publish and return the new pass_ids.
+
+    Predictions overlapping a reserved pass for the pair are skipped: the reserved
+    row stays as booked (e.g. across a horizon mask change), and a re-predicted
+    copy with slightly different times must not become a second reservable pass.
+    """
+    reserved = p_db.get_reserved_pass_windows(gs["gs_id"], satellite["s_id"]) or []
+    pass_ids = []
+    for p in predictions:
+        if any(p["start_time"] < r["end_time"] and r["start_time"] < p["end_time"] for r in reserved):
+            continue
+        pass_id = p_db.insert_predicted_pass_return_id(
+            satellite["s_id"],
+            gs["gs_id"],
+            p["max_elevation"],
+            p["duration"],
+            p["start_time"],
+            p["end_time"],
+            "pyorbital",
+        )
+        if pass_id:
+            pass_ids.append(pass_id)
+
+    logger.info(
+        f"{len(pass_ids)} new passes cached out of {len(predictions)} from local prediction. "
+        f"pass_ids: {pass_ids}"
+    )
+    if pass_ids:
+        events.publish(
+            "passes",
+            "passes.cached",
+            {"norad_id": satellite["norad_id"], "gs_id": gs["gs_id"], "pass_ids": pass_ids},
+        )
+    return pass_ids
+
+
+def precompute_passes(norad_ids: list[int]) -> dict:
+    """Fill the pass cache for each satellite against every active station that can see it.
+
+    Stations are narrowed with gs_rtree to the latitude band the orbit can reach,
+    and pairs whose cache already covers the horizon are skipped. Failures are
+    logged per pair; this runs in the background after bulk registration.
+    """
+    now_utc = datetime.now(timezone.utc)
+    pairs = 0
+    cached = 0
+    for norad_id in norad_ids:
+        try:
+            satellite = sat_db.get_satellite_by_norad_id(norad_id)
+            if not satellite or not satellite["tle_line1"] or not satellite["tle_line2"]:
+                continue
+            try:
+                reach = geo.orbit_reach_deg(satellite["tle_line2"])
+            except (ValueError, ZeroDivisionError):
+                reach = 90.0
+            stations = gs_db.get_gs_in_boxes([(-reach, reach, -180.0, 180.0)], active_only=True) or []
+        except sqlite3.Error:
+            logger.exception(f"Pass precompute for NORAD {norad_id} could not read its stations.")
+            continue
+
+        for gs in stations:
+            try:
+                if not pass_cache_is_stale(satellite["s_id"], gs["gs_id"], now_utc):
+                    continue
+                mask = horizon.load_mask(gs["gs_id"])
+                if mask is not None and not geo.station_can_see_orbit(gs["lat"], satellite["tle_line2"], float(mask.min())):
+                    continue
+                predictions = get_pass_predictions(
+                    sat_name=satellite["s_name"],
+                    tle_line1=satellite["tle_line1"],
+                    tle_line2=satellite["tle_line2"],
+                    utc_time=now_utc,
+                    hours=PASS_HORIZON_HOURS,
+                    gs_lon=gs["lon"],
+                    gs_lat=gs["lat"],
+                    gs_alt=gs["alt"],
+                    horizon_mask=mask,
+                )
+                cached += len(cache_predicted_passes(satellite, gs, predictions))
+                pairs += 1
+            except Exception:
+                logger.exception(f"Pass precompute failed for NORAD {norad_id} at GS {gs['gs_id']}.")
+
+    return {"satellites": len(norad_ids), "pairs": pairs, "cached": cached}
@@ -1,6 +1,13 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
 from pyorbital.orbital import Orbital
 
+from src.services.horizon import mask_limits
+
+# Track sampling interval when checking a pass against a station's horizon mask.
+MASK_SAMPLE_SECONDS = 5.0
+
 
 def _to_utc(dt: datetime) -> datetime:
     if dt.tzinfo is None:
@@ -13,6 +20,46 @@ def _format_db_time(dt: datetime) -> str:
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
+def _visible_window(
+    orbital: Orbital,
+    rise_time: datetime,
+    set_time: datetime,
+    gs_lon: float,
+    gs_lat: float,
+    gs_alt: float,
+    horizon_mask: np.ndarray,
+    step: float,
+) -> tuple[datetime, datetime, float] | None:
+    """(start, end, max elevation) of the longest stretch of a pass above the mask.
+
+    The track is sampled every `step` seconds and looked at in one vectorised
+    call; None when the satellite never clears the mask for two samples in a row.
+    """
+    seconds = (set_time - rise_time).total_seconds()
+    offsets = np.append(np.arange(0.0, seconds, step), seconds)
+    # pyorbital works in naive UTC.
+    start = np.datetime64(rise_time.replace(tzinfo=None), "us")
+    times = start + (offsets * 1e6).astype("timedelta64[us]")
+    azimuth, elevation = orbital.get_observer_look(times, gs_lon, gs_lat, gs_alt)
+    visible = elevation >= mask_limits(horizon_mask, azimuth)
+
+    # Runs of consecutive visible samples: [first, last) index pairs.
+    edges = np.diff(np.concatenate(([0], visible.astype(np.int8), [0])))
+    firsts = np.flatnonzero(edges == 1)
+    lasts = np.flatnonzero(edges == -1)
+    if not len(firsts):
+        return None
+    longest = int(np.argmax(lasts - firsts))
+    first, last = firsts[longest], lasts[longest] - 1
+    if last == first:
+        return None
+    return (
+        rise_time + timedelta(seconds=float(offsets[first])),
+        rise_time + timedelta(seconds=float(offsets[last])),
+        float(elevation[first : last + 1].max()),
+    )
+
+
 def get_pass_predictions(
     sat_name: str,
     tle_line1: str,
@@ -24,8 +71,17 @@ def get_pass_predictions(
     gs_alt: float,
     tol: float = 0.001,
     horizon: float = 0,
+    horizon_mask: np.ndarray | None = None,
 ) -> list[dict]:
+    """Passes over the station in the next `hours`.
+
+    With a `horizon_mask` (elevation per azimuth degree), candidate passes are
+    found above the mask's lowest point, then each is cut down to the longest
+    stretch actually above the mask; passes that never clear it are dropped.
+    """
     orbital = Orbital(sat_name, line1=tle_line1, line2=tle_line2)
+    if horizon_mask is not None:
+        horizon = float(horizon_mask.min())
     raw_passes = orbital.get_next_passes(
         _to_utc(utc_time),
         hours,
@@ -41,7 +97,15 @@ def get_pass_predictions(
         rise_time = _to_utc(rise_time)
         set_time = _to_utc(set_time)
         max_time = _to_utc(max_time)
-        _, max_elevation = orbital.get_observer_look(max_time, gs_lon, gs_lat, gs_alt)
+        if horizon_mask is not None:
+            window = _visible_window(
+                orbital, rise_time, set_time, gs_lon, gs_lat, gs_alt, horizon_mask, MASK_SAMPLE_SECONDS
+            )
+            if window is None:
+                continue
+            rise_time, set_time, max_elevation = window
+        else:
+            _, max_elevation = orbital.get_observer_look(max_time, gs_lon, gs_lat, gs_alt)
         predictions.append(
             {
                 "start_time": _format_db_time(rise_time),
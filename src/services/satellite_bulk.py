@@ -0,0 +1,76 @@
+import logging
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import HTTPException
+
+import db.satellites_db as sat_db
+from src.schemas import SatelliteBulkItem
+from src.services.celestrak_client import get_tles
+from src.services.tle import tle_epoch_db_time
+
+logger = logging.getLogger("satellites")
+
+
+def register_satellites(items: list[int | SatelliteBulkItem], fetch_tles: bool = True) -> dict:
+    """Register many satellites with one upstream TLE request and one insert transaction.
+
+    Already-registered and repeated NORAD IDs are reported, not inserted. If the
+    TLE request fails the satellites are still registered without TLEs, and
+    GET /passes fetches them on first use as before.
+    """
+    results: list[dict] = []
+    requested: dict[int, SatelliteBulkItem] = {}
+    for index, item in enumerate(items):
+        if isinstance(item, int):
+            item = SatelliteBulkItem(norad_id=item)
+        result = {"index": index, "norad_id": item.norad_id, "s_name": item.s_name, "s_id": None, "tle": False}
+        if item.norad_id in requested:
+            result["status"] = "duplicate"
+        else:
+            requested[item.norad_id] = item
+        results.append(result)
+
+    existing = sat_db.get_existing_norad_ids(list(requested))
+    new_ids = [norad_id for norad_id in requested if norad_id not in existing]
+
+    tles: dict[int, tuple[str, str]] = {}
+    names: dict[int, str] = {}
+    tle_error = None
+    if fetch_tles and new_ids:
+        try:
+            tles = get_tles(norad_ids=new_ids, wanted=set(new_ids), names=names)
+        except HTTPException as exc:
+            tle_error = exc.detail
+        except (httpx.HTTPError, OSError) as exc:
+            tle_error = f"TLE request failed: {exc}"
+        if tle_error:
+            logger.warning(f"Bulk registration continues without TLEs: {tle_error}")
+
+    records = []
+    for norad_id in new_ids:
+        line1, line2 = tles.get(norad_id, (None, None))
+        s_name = requested[norad_id].s_name or names.get(norad_id) or f"NORAD {norad_id}"
+        records.append((norad_id, s_name, line1, line2, tle_epoch_db_time(line1) if line1 else None))
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    inserted = sat_db.insert_satellites_bulk(records, now) if records else {}
+    record_names = {record[0]: record[1] for record in records}
+
+    for result in results:
+        if "status" in result:
+            continue
+        norad_id = result["norad_id"]
+        s_id = inserted.get(norad_id)
+        if s_id is None:
+            result["status"] = "exists"
+            continue
+        result.update(status="created", s_id=s_id, s_name=record_names[norad_id], tle=norad_id in tles)
+
+    created = [result for result in results if result["status"] == "created"]
+    return {
+        "msg": f"{len(created)} of {len(items)} satellites registered.",
+        "created": len(created),
+        "with_tle": sum(1 for result in created if result["tle"]),
+        "tle_error": tle_error,
+        "satellites": results,
+    }
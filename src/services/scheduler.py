@@ -0,0 +1,98 @@
+from bisect import bisect_left, bisect_right
+
+# Relative value of one second of contact time for each missions.priority value.
+PRIORITY_WEIGHTS = {"low": 1, "medium": 2, "high": 4}
+DEFAULT_PRIORITY_WEIGHT = 1
+
+
+def priority_weight(priority: str | None) -> int:
+    return PRIORITY_WEIGHTS.get((priority or "").lower(), DEFAULT_PRIORITY_WEIGHT)
+
+
+def _merge_intervals(intervals: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    # Manual reservations may overlap each other at one station; merge them so a
+    # single bisect per candidate is enough.
+    merged: list[tuple[str, str]] = []
+    for start, end in sorted(intervals):
+        if merged and start < merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _overlaps_blocked(candidate: dict, blocked: list[tuple[str, str]], blocked_starts: list[str]) -> bool:
+    # blocked is sorted and non-overlapping, so only the last interval starting
+    # before the candidate ends can overlap it.
+    i = bisect_left(blocked_starts, candidate["end_time"])
+    return i > 0 and blocked[i - 1][1] > candidate["start_time"]
+
+
+def _schedule_station(candidates: list[dict]) -> list[dict]:
+    """Weighted interval scheduling: maximise total weight of non-overlapping passes.
+
+    O(n log n): sort by end time, binary-search each pass's latest compatible
+    predecessor, then a single DP sweep and backtrack.
+    """
+    candidates = sorted(candidates, key=lambda c: (c["end_time"], c["start_time"]))
+    ends = [c["end_time"] for c in candidates]
+    # predecessor[j]: number of passes ending at or before pass j starts.
+    predecessor = [bisect_right(ends, c["start_time"], 0, j) for j, c in enumerate(candidates)]
+
+    best = [0] * (len(candidates) + 1)
+    for j, candidate in enumerate(candidates):
+        best[j + 1] = max(best[j], candidate["weight"] + best[predecessor[j]])
+
+    chosen = []
+    j = len(candidates)
+    while j > 0:
+        candidate = candidates[j - 1]
+        if candidate["weight"] + best[predecessor[j - 1]] >= best[j - 1] and candidate["weight"] > 0:
+            chosen.append(candidate)
+            j = predecessor[j - 1]
+        else:
+            j -= 1
+    chosen.reverse()
+    return chosen
+
+
+def plan_assignments(candidates, reserved_intervals) -> list[dict]:
+    """Pick a conflict-free, priority-weighted set of passes.
+
+    `candidates` rows carry pass_id, gs_id, start_time, end_time, duration,
+    mission_id and priority; a pass appearing for several missions is offered to
+    the highest-priority one. `reserved_intervals` rows (gs_id, start_time,
+    end_time) are existing reservations that planned passes must not overlap.
+    Stations are independent, so each is solved on its own.
+    """
+    best_by_pass: dict[int, dict] = {}
+    for row in candidates:
+        candidate = dict(row)
+        candidate["weight"] = priority_weight(candidate["priority"]) * candidate["duration"]
+        current = best_by_pass.get(candidate["pass_id"])
+        if current is None or (candidate["weight"], -candidate["mission_id"]) > (
+            current["weight"],
+            -current["mission_id"],
+        ):
+            best_by_pass[candidate["pass_id"]] = candidate
+
+    blocked_by_gs: dict[int, list[tuple[str, str]]] = {}
+    for row in reserved_intervals:
+        blocked_by_gs.setdefault(row["gs_id"], []).append((row["start_time"], row["end_time"]))
+
+    by_gs: dict[int, list[dict]] = {}
+    for candidate in best_by_pass.values():
+        by_gs.setdefault(candidate["gs_id"], []).append(candidate)
+
+    plan = []
+    for gs_id, station_candidates in by_gs.items():
+        blocked = _merge_intervals(blocked_by_gs.get(gs_id, []))
+        if blocked:
+            blocked_starts = [start for start, _ in blocked]
+            station_candidates = [
+                c for c in station_candidates if not _overlaps_blocked(c, blocked, blocked_starts)
+            ]
+        plan.extend(_schedule_station(station_candidates))
+
+    plan.sort(key=lambda c: (c["start_time"], c["gs_id"]))
+    return plan
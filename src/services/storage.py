@@ -0,0 +1,74 @@
+import logging
+import time
+
+import db.storage_db as storage_db
+
+logger = logging.getLogger("maintenance")
+
+DEFAULT_TIME_BUDGET_SECONDS = 30.0
+# Pages freed per incremental_vacuum call (4 MB at the default 4 KiB page size),
+# so the budget is re-checked between short write transactions.
+VACUUM_STEP_PAGES = 1000
+# Approximate rows examined per index by ANALYZE / PRAGMA optimize.
+ANALYSIS_LIMIT = 1000
+
+
+def optimize_storage(
+    time_budget: float = DEFAULT_TIME_BUDGET_SECONDS,
+    migrate_auto_vacuum: bool = False,
+) -> dict:
+    """Reclaim free pages, refresh planner statistics and truncate the WAL.
+
+    Steps run cheapest-first: PRAGMA optimize, incremental vacuum in
+    VACUUM_STEP_PAGES steps, a bounded ANALYZE, then a WAL checkpoint. Once
+    `time_budget` seconds are used, the remaining optional steps are skipped
+    (the checkpoint always runs so the WAL shrinks after the vacuum writes).
+    `migrate_auto_vacuum` first rewrites the file with a full VACUUM if it is not
+    in INCREMENTAL mode yet; that step ignores the budget.
+    """
+    started = time.monotonic()
+    deadline = started + time_budget
+    before = storage_db.get_storage_stats()
+    steps: dict = {}
+    skipped: list[str] = []
+
+    if migrate_auto_vacuum:
+        steps["migrate_auto_vacuum"] = storage_db.migrate_to_incremental_auto_vacuum()
+        deadline = max(deadline, time.monotonic() + time_budget)
+    elif before["auto_vacuum"] != "INCREMENTAL":
+        logger.warning(
+            "auto_vacuum is %s, so free pages cannot be reclaimed incrementally; "
+            "run scripts/optimize_db.py --migrate in a maintenance window.",
+            before["auto_vacuum"],
+        )
+
+    storage_db.optimize(ANALYSIS_LIMIT)
+    steps["optimize"] = True
+
+    freed = 0
+    while time.monotonic() < deadline:
+        step = storage_db.incremental_vacuum(VACUUM_STEP_PAGES)
+        freed += step
+        if step < VACUUM_STEP_PAGES:
+            break
+    else:
+        skipped.append("incremental_vacuum")
+    steps["vacuumed_pages"] = freed
+
+    if time.monotonic() < deadline:
+        storage_db.analyze(ANALYSIS_LIMIT)
+        steps["analyze"] = True
+    else:
+        skipped.append("analyze")
+
+    steps["wal_checkpoint"] = storage_db.checkpoint_wal()
+    after = storage_db.get_storage_stats()
+
+    return {
+        "before": before,
+        "after": after,
+        "reclaimed_bytes": before["file_bytes"] + before["wal_bytes"] - after["file_bytes"] - after["wal_bytes"],
+        "steps": steps,
+        "skipped": skipped,
+        "seconds": round(time.monotonic() - started, 3),
+    }
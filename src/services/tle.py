@@ -0,0 +1,190 @@
+import math
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+
+# Upper bound on how long we wait between upstream checks for one satellite.
+MAX_RECHECK_INTERVAL = timedelta(days=7)
+
+
+def tle_norad_id(line1: str) -> int:
+    # Columns 3-7 of line 1 hold the catalog number.
+    return int(line1[2:7])
+
+
+def tle_checksum(line: str) -> int:
+    # Modulo-10 sum of the first 68 columns: digits count as themselves, '-' as 1.
+    total = 0
+    for char in line[:68]:
+        if char.isdigit():
+            total += int(char)
+        elif char == "-":
+            total += 1
+    return total % 10
+
+
+def tle_is_valid(line1: str, line2: str) -> bool:
+    """Check line lengths, line numbers, matching catalog numbers and both checksums."""
+    for number, line in (("1", line1), ("2", line2)):
+        if len(line) != 69 or line[0] != number or not line[68].isdigit():
+            return False
+        if tle_checksum(line) != int(line[68]):
+            return False
+    return line1[2:7] == line2[2:7]
+
+
+def _tle_decimal(value: float) -> str:
+    # " .00010000" / "-.00010000": sign column, then the fraction without a leading zero.
+    text = f"{abs(value):.8f}"
+    return ("-" if value < 0 else " ") + text[1:]
+
+
+def _tle_exponent(value: float) -> str:
+    # " 18000-3" means 0.18000e-3; sign, five mantissa digits, signed exponent.
+    if value == 0:
+        return " 00000+0"
+    exponent = math.floor(math.log10(abs(value))) + 1
+    mantissa = round(abs(value) / 10**exponent * 100000)
+    if mantissa >= 100000:
+        mantissa //= 10
+        exponent += 1
+    sign = "-" if value < 0 else " "
+    exp_sign = "-" if exponent < 0 else "+"
+    return f"{sign}{mantissa:05d}{exp_sign}{abs(exponent)}"
+
+
+def omm_to_tle(omm: dict) -> tuple[str, str]:
+    """Render an OMM record (CelesTrak field names) as the two TLE lines pyorbital expects."""
+    norad_id = int(omm["NORAD_CAT_ID"])
+    epoch = datetime.fromisoformat(str(omm["EPOCH"]).replace("Z", "")).replace(tzinfo=timezone.utc)
+    day_of_year = (
+        (epoch - datetime(epoch.year, 1, 1, tzinfo=timezone.utc)).total_seconds() / 86400 + 1
+    )
+    object_id = str(omm.get("OBJECT_ID") or "")
+    intl_designator = object_id[2:4] + object_id[5:] if len(object_id) >= 6 else ""
+
+    line1 = (
+        f"1 {norad_id:05d}{omm.get('CLASSIFICATION_TYPE') or 'U'} {intl_designator:<8} "
+        f"{epoch.year % 100:02d}{day_of_year:012.8f} "
+        f"{_tle_decimal(float(omm.get('MEAN_MOTION_DOT') or 0))} "
+        f"{_tle_exponent(float(omm.get('MEAN_MOTION_DDOT') or 0))} "
+        f"{_tle_exponent(float(omm.get('BSTAR') or 0))} "
+        f"{int(omm.get('EPHEMERIS_TYPE') or 0)} "
+        f"{int(omm.get('ELEMENT_SET_NO') or 999) % 10000:>4}"
+    )
+    eccentricity = round(float(omm["ECCENTRICITY"]) * 1e7)
+    line2 = (
+        f"2 {norad_id:05d} {float(omm['INCLINATION']):8.4f} "
+        f"{float(omm['RA_OF_ASC_NODE']):8.4f} {eccentricity:07d} "
+        f"{float(omm['ARG_OF_PERICENTER']):8.4f} {float(omm['MEAN_ANOMALY']):8.4f} "
+        f"{float(omm['MEAN_MOTION']):11.8f}{int(omm.get('REV_AT_EPOCH') or 0) % 100000:5d}"
+    )
+    return line1 + str(tle_checksum(line1)), line2 + str(tle_checksum(line2))
+
+
+def tle_epoch(line1: str) -> datetime:
+    # Columns 19-32 of line 1: two-digit year, then fractional day of year.
+    year = int(line1[18:20])
+    year += 2000 if year < 57 else 1900
+    day_of_year = float(line1[20:32])
+    return datetime(year, 1, 1, tzinfo=timezone.utc) + timedelta(days=day_of_year - 1)
+
+
+def tle_epoch_db_time(line1: str) -> str | None:
+    """Epoch in the database timestamp format, or None if line 1 is malformed."""
+    try:
+        return tle_epoch(line1).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def parse_db_time(value: str) -> datetime:
+    """A database timestamp as an aware UTC datetime (stored values are naive UTC)."""
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def tle_mean_motion(line2: str) -> float:
+    # Columns 53-63 of line 2: revolutions per day.
+    return float(line2[52:63])
+
+
+def tle_refresh_interval(mean_motion: float) -> timedelta:
+    """How old an element set may get before we look for a newer one, by orbit regime."""
+    if mean_motion >= 15.0:
+        # Low LEO: drag dominated, so element sets go stale within hours.
+        return timedelta(hours=6)
+    if mean_motion >= 11.25:
+        return timedelta(hours=12)
+    if mean_motion >= 1.5:
+        # MEO / HEO.
+        return timedelta(days=2)
+    # GEO and beyond.
+    return timedelta(days=4)
+
+
+def tle_needs_refresh(
+    tle_line1: str | None,
+    tle_line2: str | None,
+    checked_at: datetime | None,
+    now_utc: datetime,
+) -> bool:
+    """Decide staleness from the TLE's own epoch rather than from when we fetched it.
+
+    Once the epoch is older than the regime interval we check upstream, but if the
+    last check found nothing newer we back off in proportion to the epoch age, so
+    rarely-updated objects aren't re-downloaded every day.
+    """
+    if not tle_line1 or not tle_line2:
+        return True
+    try:
+        epoch = tle_epoch(tle_line1)
+        interval = tle_refresh_interval(tle_mean_motion(tle_line2))
+    except ValueError:
+        return True
+
+    epoch_age = now_utc - epoch
+    if epoch_age < interval:
+        return False
+    if checked_at is None:
+        return True
+    recheck = min(max(interval, epoch_age / 4), MAX_RECHECK_INTERVAL)
+    return now_utc - checked_at >= recheck
+
+
+class TLERecordReader:
+    """Incremental 2LE/3LE parser: feed lines one at a time, get records back.
+
+    Name lines are optional; orphaned or out-of-order lines are skipped.
+    """
+
+    def __init__(self):
+        self._name: str | None = None
+        self._line1: str | None = None
+
+    def feed(self, raw: str) -> tuple[str | None, str, str] | None:
+        line = raw.strip()
+        if not line:
+            return None
+        if line.startswith("1 ") and self._line1 is None:
+            self._line1 = line
+        elif line.startswith("2 ") and self._line1 is not None:
+            record = (self._name, self._line1, line)
+            self._name = None
+            self._line1 = None
+            return record
+        else:
+            self._name = line[2:].strip() if line.startswith("0 ") else line
+            self._line1 = None
+        return None
+
+
+def iter_tle_records(lines: Iterable[str]) -> Iterator[tuple[str | None, str, str]]:
+    """Yield (name, line1, line2) one record at a time from 2LE or 3LE text.
+
+    Lines are consumed lazily so a large catalogue never has to be held in memory.
+    """
+    reader = TLERecordReader()
+    for raw in lines:
+        record = reader.feed(raw)
+        if record is not None:
+            yield record
@@ -0,0 +1,191 @@
+import csv
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import db.satellites_db as sat_db
+from src.core.json_stream import iter_json_array
+from src.services.tle import (
+    iter_tle_records,
+    omm_to_tle,
+    tle_epoch_db_time,
+    tle_is_valid,
+    tle_norad_id,
+)
+
+logger = logging.getLogger("tle_ingest")
+
+TLE_SUFFIXES = {".tle", ".txt", ".2le", ".3le"}
+CATALOG_SUFFIXES = TLE_SUFFIXES | {".json", ".csv", ".xml"}
+
+
+def _iter_omm_xml(fh) -> Iterator[dict]:
+    # Each <omm> element is flattened to {leaf tag: text} and freed once read.
+    for _, element in ET.iterparse(fh, events=("end",)):
+        if element.tag.rsplit("}", 1)[-1].lower() != "omm":
+            continue
+        record = {}
+        for child in element.iter():
+            if len(child) == 0 and child.text is not None:
+                record[child.tag.rsplit("}", 1)[-1]] = child.text.strip()
+        element.clear()
+        yield record
+
+
+def _iter_omm_records(path: Path, fmt: str) -> Iterator[dict]:
+    if fmt == "xml":
+        with path.open("rb") as fh:
+            yield from _iter_omm_xml(fh)
+        return
+    with path.open(encoding="utf-8", newline="") as fh:
+        if fmt == "json":
+            yield from iter_json_array(fh)
+        else:
+            yield from csv.DictReader(fh)
+
+
+def iter_catalog_file(path: Path, stats: dict | None = None) -> Iterator[tuple[int, str | None, str, str]]:
+    """Stream (norad_id, name, line1, line2) out of a TLE or OMM (JSON/CSV/XML) file.
+
+    Records that fail checksum or field validation are skipped and counted in
+    `stats["rejected"]` when a stats dict is supplied. A file that cannot be
+    parsed at all raises ValueError.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("rejected", 0)
+    fmt = path.suffix.lower().lstrip(".")
+
+    if path.suffix.lower() in TLE_SUFFIXES:
+        with path.open(encoding="utf-8") as fh:
+            for name, line1, line2 in iter_tle_records(fh):
+                if not tle_is_valid(line1, line2):
+                    stats["rejected"] += 1
+                    continue
+                yield tle_norad_id(line1), name, line1, line2
+        return
+
+    if fmt not in ("json", "csv", "xml"):
+        raise ValueError(f"Unsupported catalogue format: {path.name}")
+
+    try:
+        for omm in _iter_omm_records(path, fmt):
+            try:
+                line1, line2 = omm_to_tle(omm)
+            except (KeyError, TypeError, ValueError):
+                stats["rejected"] += 1
+                continue
+            yield int(omm["NORAD_CAT_ID"]), omm.get("OBJECT_NAME") or None, line1, line2
+    except (ET.ParseError, csv.Error) as exc:
+        raise ValueError(f"Malformed {fmt.upper()} catalogue {path.name}: {exc}") from exc
+
+
+def catalog_files(paths: Iterable[Path]) -> list[Path]:
+    """Expand directories into the catalogue files they contain."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(
+                sorted(p for p in path.iterdir() if p.suffix.lower() in CATALOG_SUFFIXES)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def ingest_catalog_files(paths: Iterable[Path], register_new: bool = True) -> dict:
+    """Load TLE/OMM files from disk and upsert their element sets in one transaction."""
+    files = catalog_files(paths)
+    stats = {"files": len(files), "rejected": 0}
+
+    def records():
+        for path in files:
+            for norad_id, name, line1, line2 in iter_catalog_file(path, stats):
+                yield norad_id, name or f"NORAD {norad_id}", line1, line2, tle_epoch_db_time(line1)
+
+    checked_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    stats["upserted"] = sat_db.upsert_satellite_tles(records(), checked_at, register_new)
+    logger.info(
+        f"Ingested {stats['upserted']} element sets from {stats['files']} files "
+        f"({stats['rejected']} rejected)."
+    )
+    return stats
+
+
+class MirrorIndex(NamedTuple):
+    mirror_dir: Path
+    files: tuple[tuple[str, int, int], ...]
+    tles: dict[int, tuple[str, str]]
+
+
+_mirror_lock = threading.Lock()
+_mirror_index: MirrorIndex | None = None
+
+
+def _is_newer(line1: str, current: tuple[str, str] | None) -> bool:
+    # Compare full epochs: the two-digit year in line 1 does not sort across 1999/2000.
+    return current is None or (tle_epoch_db_time(line1) or "") > (tle_epoch_db_time(current[0]) or "")
+
+
+def _mirror_signature(files: list[Path]) -> tuple[tuple[str, int, int], ...]:
+    signature = []
+    for path in files:
+        st = path.stat()
+        signature.append((str(path), st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def get_mirror_index(mirror_dir: Path) -> dict[int, tuple[str, str]]:
+    """Newest element set per NORAD id across the mirror, rebuilt only when its files change.
+
+    Each call lists the directory and stats its files; the files are re-parsed
+    only when one is added, removed or modified.
+    """
+    global _mirror_index
+    files = catalog_files([mirror_dir])
+    signature = _mirror_signature(files)
+    index = _mirror_index
+    if index is not None and index.mirror_dir == mirror_dir and index.files == signature:
+        return index.tles
+
+    with _mirror_lock:
+        index = _mirror_index
+        if index is None or index.mirror_dir != mirror_dir or index.files != signature:
+            index = MirrorIndex(mirror_dir, signature, read_mirror_tles(mirror_dir))
+            _mirror_index = index
+        return index.tles
+
+
+def find_mirror_tle(mirror_dir: Path, norad_id: int) -> tuple[str, str] | None:
+    """Look up the newest element set for one satellite in a local mirror directory."""
+    return get_mirror_index(mirror_dir).get(norad_id)
+
+
+def read_mirror_tles(
+    mirror_dir: Path,
+    group: str | None = None,
+    wanted: set[int] | None = None,
+    names: dict[int, str] | None = None,
+) -> dict[int, tuple[str, str]]:
+    """Read many element sets from the mirror; a group maps to files named after it.
+
+    When a `names` dict is given it is filled with each object's name, if the file has one.
+    """
+    if group is not None:
+        files = [p for p in catalog_files([mirror_dir]) if p.stem == group]
+    else:
+        files = catalog_files([mirror_dir])
+
+    tles: dict[int, tuple[str, str]] = {}
+    for path in files:
+        for norad_id, name, line1, line2 in iter_catalog_file(path):
+            if wanted is not None and norad_id not in wanted:
+                continue
+            if _is_newer(line1, tles.get(norad_id)):
+                tles[norad_id] = (line1, line2)
+                if names is not None and name:
+                    names[norad_id] = name
+    return tles
@@ -0,0 +1,48 @@
+import logging
+from datetime import datetime, timezone
+
+import db.satellites_db as sat_db
+from src.services.celestrak_client import get_tles
+from src.services.tle import tle_epoch_db_time
+
+logger = logging.getLogger("tle_refresh")
+
+
+def _format_db_time(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def refresh_tles(
+    group: str | None = None,
+    norad_ids: list[int] | None = None,
+    base_url: str | None = None,
+) -> dict:
+    """Refresh stored TLEs for every tracked satellite covered by one upstream query.
+
+    With neither `group` nor `norad_ids`, all tracked satellites are requested by
+    catalog number.
+    """
+    tracked = sat_db.get_tracked_norad_ids()
+    if group is None and not norad_ids:
+        norad_ids = sorted(tracked)
+    if group is None and not norad_ids:
+        return {"requested": 0, "received": 0, "updated": 0, "unchanged": 0}
+
+    tles = get_tles(group=group, norad_ids=norad_ids, wanted=tracked, base_url=base_url)
+    records = [
+        (norad_id, line1, line2, tle_epoch_db_time(line1))
+        for norad_id, (line1, line2) in tles.items()
+    ]
+    changed, unchanged = sat_db.update_satellite_tles_bulk(
+        records, _format_db_time(datetime.now(timezone.utc))
+    )
+    logger.info(
+        f"Bulk TLE refresh: {changed} changed, {unchanged} unchanged ({len(tles)} matching records)."
+    )
+
+    return {
+        "requested": len(norad_ids) if group is None else None,
+        "received": len(tles),
+        "updated": changed,
+        "unchanged": unchanged,
+    }
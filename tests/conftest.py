@@ -1,4 +1,5 @@
 from pathlib import Path
+import importlib
 import sys
 import pytest
 from fastapi.testclient import TestClient
@@ -18,6 +19,8 @@ def test_db(tmp_path):
     db_path = tmp_path / "test.db"
     old_path = db_init.DB_PATH
     db_init.DB_PATH = db_path
+    # In-memory state keyed by change_log versions would carry over between databases.
+    importlib.import_module("src.routers.reservations")._status_boundary.clear()
     try:
         db_init.init_db(str(db_path))
         seed_sql = (Path(__file__).resolve().parents[1] / "db" / "seed.sql").read_text(encoding="utf-8")
@@ -0,0 +1,125 @@
+from db import db_init
+from db.archive_db import archive_connect
+from src.services.archive import archive_reservations
+
+
+def _add_reservation(days_ago: int, cancelled: bool = False, commands: tuple[str, ...] = ()) -> int:
+    conn = db_init.db_connect()
+    try:
+        cur = conn.execute(
+            """
+            INSERT INTO predicted_passes (gs_id, s_id, start_time, end_time, max_elevation, duration, source)
+            VALUES (3, 1, datetime('now', ?), datetime('now', ?, '+10 minutes'), 30.0, 600, 'test')
+            """,
+            (f"-{days_ago} days", f"-{days_ago} days"),
+        )
+        r_id = conn.execute(
+            """
+            INSERT INTO reservations (pass_id, gs_id, s_id, cancelled_at)
+            VALUES (?, 3, 1, CASE WHEN ? THEN CURRENT_TIMESTAMP END)
+            """,
+            (cur.lastrowid, cancelled),
+        ).lastrowid
+        for command in commands:
+            conn.execute(
+                "INSERT INTO reservation_commands (r_id, command_type) VALUES (?, ?)",
+                (r_id, command),
+            )
+        conn.commit()
+        return r_id
+    finally:
+        conn.close()
+
+
+def _live_ids(table: str, column: str) -> set[int]:
+    conn = db_init.db_connect()
+    try:
+        return {row[column] for row in conn.execute(f"SELECT {column} FROM {table}")}
+    finally:
+        conn.close()
+
+
+def test_archive_moves_old_history_only(test_db):
+    old_complete = _add_reservation(200, commands=("PING", "GET_TELEMETRY"))
+    old_cancelled = _add_reservation(150, cancelled=True)
+    recent = _add_reservation(10)
+
+    result = archive_reservations(retention_days=90, batch_size=1, pause=0)
+
+    assert result["reservations"] >= 2
+    live = _live_ids("reservations", "r_id")
+    assert recent in live
+    assert old_complete not in live and old_cancelled not in live
+    assert not {old_complete, old_cancelled} & _live_ids("reservation_commands", "r_id")
+    assert db_init.DB_PATH.with_name("test_archive.db").exists()
+
+    # Nothing left to move on a second run.
+    assert archive_reservations(retention_days=90, pause=0)["reservations"] == 0
+
+
+def test_archive_finishes_a_batch_copied_but_not_deleted(client):
+    r_id = _add_reservation(200, commands=("PING",))
+    # Leave the batch as a run stopped after its archive commit would: copied, still live.
+    conn = archive_connect()
+    try:
+        conn.execute(
+            """
+            INSERT INTO archive.predicted_passes
+            SELECT pass_id, gs_id, s_id, start_time, end_time, max_elevation, duration, source, created_at
+            FROM main.predicted_passes
+            WHERE pass_id = (SELECT pass_id FROM main.reservations WHERE r_id = ?)
+            """,
+            (r_id,),
+        )
+        conn.execute(
+            """
+            INSERT INTO archive.reservations
+            SELECT r_id, mission_id, pass_id, gs_id, s_id, cancelled_at, created_at, updated_at
+            FROM main.reservations
+            WHERE r_id = ?
+            """,
+            (r_id,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    listed = client.get("/reservations", params={"include_archived": True}).json()["reservations"]
+    assert [r["r_id"] for r in listed].count(r_id) == 1
+
+    result = archive_reservations(retention_days=90, pause=0)
+
+    assert result["reservations"] >= 1 and result["passes"] >= 1
+    assert r_id not in _live_ids("reservations", "r_id")
+    conn = archive_connect()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM archive.reservations WHERE r_id = ?", (r_id,)).fetchone()[0] == 1
+        commands = conn.execute("SELECT command_type FROM archive.reservation_commands WHERE r_id = ?", (r_id,))
+        assert [row["command_type"] for row in commands] == ["PING"]
+    finally:
+        conn.close()
+
+
+def test_list_reservations_include_archived(client):
+    old_complete = _add_reservation(200, commands=("PING", "GET_TELEMETRY"))
+    old_cancelled = _add_reservation(150, cancelled=True)
+    archive_reservations(retention_days=90, pause=0)
+
+    live = client.get("/reservations", params={"include_cancelled": True}).json()["reservations"]
+    assert not {old_complete, old_cancelled} & {r["r_id"] for r in live}
+
+    resp = client.get("/reservations", params={"include_cancelled": True, "include_archived": True})
+    assert resp.status_code == 200
+    by_id = {r["r_id"]: r for r in resp.json()["reservations"]}
+    assert by_id[old_complete]["status"] == "COMPLETE"
+    assert by_id[old_complete]["norad_id"] is not None
+    assert sorted(by_id[old_complete]["commands"]) == ["GET_TELEMETRY", "PING"]
+    assert by_id[old_cancelled]["status"] == "CANCELLED"
+    assert {r["r_id"] for r in live} <= set(by_id)
+
+    filtered = client.get(
+        "/reservations",
+        params={"status": "CANCELLED", "include_archived": True, "limit": 50},
+    ).json()["reservations"]
+    assert old_cancelled in {r["r_id"] for r in filtered}
+    assert all(r["status"] == "CANCELLED" for r in filtered)
@@ -0,0 +1,104 @@
+import importlib
+from datetime import datetime, timedelta, timezone
+
+import db.passes_db as p_db
+import db.reservations_db as r_db
+from db import db_init
+
+reservations_module = importlib.import_module("src.routers.reservations")
+
+
+def test_list_returns_304_until_table_changes(client):
+    first = client.get("/satellites")
+    etag = first.headers["ETag"]
+
+    cached = client.get("/satellites", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    # Unrelated tables don't invalidate the satellites tag.
+    client.post("/missions/create", json={"mission_name": "Unrelated"})
+    assert client.get("/satellites", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/satellites", json={"norad_id": 99999, "s_name": "NEW SAT"})
+    changed = client.get("/satellites", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_every_list_endpoint_supports_etags(client):
+    for path in ("/groundstations", "/missions", "/commands/", "/reservations"):
+        etag = client.get(path).headers["ETag"]
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304, path
+
+
+def test_reservation_etag_depends_on_filters_and_status_boundaries(client, monkeypatch):
+    etag = client.get("/reservations").headers["ETag"]
+    assert client.get("/reservations?gs_id=1").headers["ETag"] != etag
+
+    # A reservation whose pass starts in a moment: its status flip changes the tag
+    # even though no row is written.
+    now = datetime.now(timezone.utc)
+    pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=45.0,
+        duration=600,
+        start_time=(now + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+        end_time=(now + timedelta(hours=1, minutes=10)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    assert client.post("/reservations", json={"pass_id": pass_id}).status_code == 200
+    etag = client.get("/reservations").headers["ETag"]
+
+    conn = db_init.db_connect()
+    try:
+        # Simulate time passing by moving the start into the past without touching change_log.
+        conn.execute("DROP TRIGGER trg_predicted_passes_update_log")
+        conn.execute(
+            "UPDATE predicted_passes SET start_time = datetime('now', '-1 minutes') WHERE pass_id = ?",
+            (pass_id,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    class _AnHourLater(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(hours=1, minutes=1)
+
+    # The cached boundary is only re-read once the clock passes it.
+    monkeypatch.setattr(reservations_module, "datetime", _AnHourLater)
+    response = client.get("/reservations", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    status = {r["pass_id"]: r["status"] for r in response.json()["reservations"]}
+    assert status[pass_id] == "ACTIVE"
+
+
+def test_reservation_polls_reuse_the_status_boundary(client, monkeypatch):
+    calls = []
+    real = r_db.get_next_status_change
+
+    def counting():
+        calls.append(1)
+        return real()
+
+    monkeypatch.setattr(r_db, "get_next_status_change", counting)
+    etag = client.get("/reservations").headers["ETag"]
+    for _ in range(3):
+        assert client.get("/reservations", headers={"If-None-Match": etag}).status_code == 304
+    assert len(calls) == 1
+
+    now = datetime.now(timezone.utc)
+    pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=45.0,
+        duration=600,
+        start_time=(now + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+        end_time=(now + timedelta(hours=1, minutes=10)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    assert client.post("/reservations", json={"pass_id": pass_id}).status_code == 200
+    assert client.get("/reservations", headers={"If-None-Match": etag}).status_code == 200
+    assert len(calls) == 2
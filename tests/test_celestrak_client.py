@@ -0,0 +1,163 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import db.satellites_db as sat_db
+from src.core import metrics
+from src.main import app
+from src.services import celestrak_client
+from src.services.celestrak_client import CircuitBreaker, TLEClient, get_tles
+from src.services.tle import iter_tle_records
+from src.services.tle_refresh import refresh_tles
+
+
+ISS_L1 = "1 25544U 98067A   26040.50000000  .00010000  00000-0  18000-3 0  9993"
+ISS_L2 = "2 25544  51.6400 121.0000 0005000  20.0000  40.0000 15.50000000    18"
+AQUA_L1 = "1 27424U 02022A   26040.40000000  .00002000  00000-0  12000-3 0  9998"
+AQUA_L2 = "2 27424  98.2000  41.0000 0001000  10.0000  80.0000 14.57000000    29"
+OTHER_L1 = "1 11111U 80001A   26040.40000000  .00002000  00000-0  12000-3 0  9991"
+OTHER_L2 = "2 11111  98.2000  41.0000 0001000  10.0000  80.0000 14.57000000    21"
+
+
+@pytest.fixture()
+def stub_celestrak():
+    requests = []
+    failures = {"remaining": 0}
+    body = "\n".join([ISS_L1, ISS_L2, AQUA_L1, AQUA_L2, OTHER_L1, OTHER_L2]) + "\n"
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(parse_qs(urlparse(self.path).query))
+            if failures["remaining"]:
+                failures["remaining"] -= 1
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            payload = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/gp.php", requests, failures
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_iter_tle_records_handles_names_and_blank_lines():
+    lines = ["ISS (ZARYA)", ISS_L1, ISS_L2, "", AQUA_L1, AQUA_L2]
+    records = list(iter_tle_records(lines))
+    assert records == [("ISS (ZARYA)", ISS_L1, ISS_L2), (None, AQUA_L1, AQUA_L2)]
+
+
+def test_get_tles_group_filters_wanted(stub_celestrak):
+    url, requests, _ = stub_celestrak
+    tles = get_tles(group="stations", wanted={25544, 27424}, base_url=url)
+    assert set(tles) == {25544, 27424}
+    assert tles[25544] == (ISS_L1, ISS_L2)
+    assert requests[0]["GROUP"] == ["stations"]
+
+
+def test_refresh_tles_updates_tracked_satellites_in_one_request(test_db, stub_celestrak):
+    url, requests, _ = stub_celestrak
+    result = refresh_tles(base_url=url)
+
+    assert len(requests) == 1
+    assert requests[0]["CATNR"] == ["25338,25544,27424"]
+    assert result["updated"] == 2
+    assert sat_db.get_satellite_by_norad_id(25544)["tle_line1"] == ISS_L1
+    assert sat_db.get_satellite_by_norad_id(27424)["tle_line2"] == AQUA_L2
+    assert sat_db.get_satellite_by_norad_id(11111) is None
+
+
+def test_client_retries_transient_upstream_errors(stub_celestrak):
+    url, requests, failures = stub_celestrak
+    failures["remaining"] = 2
+    metrics.reset()
+
+    async def run():
+        client = TLEClient(url, backoff=0)
+        try:
+            return await client.fetch_tle(25544)
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()).lines == [ISS_L1, ISS_L2]
+    assert len(requests) == 3
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["celestrak.retries"] == 2
+    assert snapshot["timings"]["celestrak.request_seconds"]["count"] == 3
+
+
+def test_client_gives_up_after_max_retries(stub_celestrak):
+    url, requests, failures = stub_celestrak
+    failures["remaining"] = 10
+
+    async def run():
+        client = TLEClient(url, max_retries=1, backoff=0)
+        try:
+            await client.fetch_tle(25544)
+        finally:
+            await client.aclose()
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 502
+    assert len(requests) == 2
+
+
+def test_shared_client_follows_app_lifespan():
+    assert celestrak_client.get_tle_client() is None
+    with TestClient(app):
+        assert isinstance(celestrak_client.get_tle_client(), TLEClient)
+    assert celestrak_client.get_tle_client() is None
+
+
+def test_breaker_lets_a_single_trial_through_when_half_open(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(celestrak_client.time, "monotonic", lambda: clock[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.allow()
+
+    clock[0] += 60.0
+    assert breaker.allow()
+    # Everyone else waits for the trial's outcome.
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock[0] += 60.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow() and breaker.allow()
+
+
+def test_breaker_replaces_a_trial_that_never_reports(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(celestrak_client.time, "monotonic", lambda: clock[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    breaker.record_failure()
+    clock[0] += 10.0
+    assert breaker.allow()
+    clock[0] += 5.0
+    assert not breaker.allow()
+    clock[0] += 5.0
+    assert breaker.allow()
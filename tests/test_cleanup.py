@@ -0,0 +1,67 @@
+import db.maintenance_db as maint_db
+from db import db_init
+from src.services.cleanup import CLEANUP_JOB, cleanup_cancelled_reservations
+
+
+def _add_reservations(count: int, expired: bool, cancelled: bool) -> None:
+    offset = "-2 days" if expired else "+2 days"
+    base = 0 if cancelled else 1000
+    conn = db_init.db_connect()
+    try:
+        for i in range(count):
+            cur = conn.execute(
+                """
+                INSERT INTO predicted_passes (gs_id, s_id, start_time, end_time, max_elevation, duration, source)
+                VALUES (3, 1, datetime('now', ?, ?), datetime('now', ?, ?), 30.0, 600, 'test')
+                """,
+                (offset, f"+{base + i * 20} minutes", offset, f"+{base + i * 20 + 10} minutes"),
+            )
+            conn.execute(
+                """
+                INSERT INTO reservations (pass_id, gs_id, s_id, cancelled_at)
+                VALUES (?, 3, 1, CASE WHEN ? THEN CURRENT_TIMESTAMP END)
+                """,
+                (cur.lastrowid, cancelled),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _reservation_ids() -> set[int]:
+    conn = db_init.db_connect()
+    try:
+        return {row["r_id"] for row in conn.execute("SELECT r_id FROM reservations")}
+    finally:
+        conn.close()
+
+
+def test_cleanup_deletes_only_cancelled_expired_in_batches(test_db):
+    _add_reservations(5, expired=True, cancelled=True)
+    _add_reservations(2, expired=False, cancelled=True)
+    _add_reservations(2, expired=True, cancelled=False)
+    before = _reservation_ids()
+
+    result = cleanup_cancelled_reservations(batch_size=2, pause=0)
+
+    # Five new ones plus the seeded cancelled reservation on an old pass.
+    assert result["deleted"] == 6
+    assert result["complete"] is True
+    assert result["batches"] == (max(before) + 1) // 2
+    assert len(before - _reservation_ids()) == 6
+    assert maint_db.get_checkpoint(CLEANUP_JOB) is None
+
+
+def test_cleanup_resumes_from_checkpoint(test_db):
+    _add_reservations(6, expired=True, cancelled=True)
+    pauses = []
+
+    partial = cleanup_cancelled_reservations(batch_size=3, max_batches=2, sleep=pauses.append)
+    assert partial["complete"] is False
+    assert maint_db.get_checkpoint(CLEANUP_JOB) == 6
+    assert pauses
+
+    rest = cleanup_cancelled_reservations(batch_size=3, pause=0)
+    assert rest["complete"] is True
+    assert partial["deleted"] + rest["deleted"] == 7
+    assert maint_db.get_checkpoint(CLEANUP_JOB) is None
@@ -11,3 +11,39 @@ def test_commands_db_error_returns_500(client, monkeypatch):
 
     response = client.get("/commands/")
     assert response.status_code == 500
+
+
+def test_command_catalog_is_served_from_snapshot(client, monkeypatch):
+    from src.services import command_catalog
+
+    command_catalog.invalidate()
+    first = client.get("/commands/")
+    assert first.status_code == 200
+
+    def fail():
+        raise AssertionError("catalog should not be re-read")
+
+    monkeypatch.setattr(c_db, "get_all_commands", fail)
+    assert client.get("/commands/").json() == first.json()
+
+
+def test_command_catalog_reloads_when_table_changes(client, monkeypatch):
+    from db import db_init
+    from src.services import command_catalog
+
+    monkeypatch.setattr(command_catalog, "VERSION_CHECK_INTERVAL", 0)
+    before = command_catalog.get_catalog()
+    assert "CALIBRATE" not in before.types
+
+    conn = db_init.db_connect()
+    try:
+        conn.execute("INSERT INTO command_catalog VALUES ('CALIBRATE', 'Calibrate antenna')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    after = command_catalog.get_catalog()
+    assert after.version > before.version
+    assert "CALIBRATE" in after.types
+    listed = client.get("/commands/").json()["commands"]
+    assert "CALIBRATE" in {command["command_type"] for command in listed}
@@ -0,0 +1,129 @@
+import asyncio
+import importlib
+from datetime import datetime, timedelta, timezone
+
+import db.passes_db as p_db
+from src.services.events import EventBroker, broker
+
+events_module = importlib.import_module("src.routers.events")
+
+
+def _future_pass() -> int:
+    now = datetime.now(timezone.utc)
+    pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=45.0,
+        duration=600,
+        start_time=(now + timedelta(hours=3)).strftime("%Y-%m-%d %H:%M:%S"),
+        end_time=(now + timedelta(hours=3, minutes=10)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    assert pass_id is not None
+    return pass_id
+
+
+def test_replay_resumes_after_token_and_expires_old_tokens():
+    events = EventBroker(history_size=3)
+    for i in range(5):
+        events.publish("reservations" if i % 2 else "passes", "test", {"i": i})
+    ids = [events.event_id(seq) for seq in range(1, 6)]
+
+    assert [e["id"] for e in events.replay(ids[2])] == ids[3:]
+    assert [e["id"] for e in events.replay(ids[1], {"reservations"})] == [ids[3]]
+    assert events.replay(ids[4]) == []
+    # Events 1-2 fell out of history, and 9 was never issued by this broker.
+    assert events.replay(ids[0]) is None
+    assert events.replay(events.event_id(9)) is None
+
+
+def test_replay_rejects_tokens_from_another_process():
+    before = EventBroker()
+    for i in range(3):
+        before.publish("passes", "test", {"i": i})
+    # A restarted process numbers its events from 1 again.
+    after = EventBroker()
+    for i in range(5):
+        after.publish("passes", "test", {"i": i})
+
+    assert after.replay(before.last_id) is None
+    assert after.replay("2") is None
+    assert after.replay("not-an-id") is None
+    assert [e["id"] for e in after.replay(after.event_id(3))] == [after.event_id(4), after.event_id(5)]
+
+
+def test_subscriber_receives_events_published_from_other_threads():
+    events = EventBroker()
+
+    async def run():
+        sub = events.subscribe({"reservations"})
+        await asyncio.to_thread(events.publish, "passes", "ignored", {})
+        await asyncio.to_thread(events.publish, "reservations", "reservation.created", {"r_id": 1})
+        event = await asyncio.wait_for(sub.queue.get(), timeout=1)
+        events.unsubscribe(sub)
+        return event
+
+    event = asyncio.run(run())
+    assert event["type"] == "reservation.created"
+    assert event["data"] == {"r_id": 1}
+
+
+def test_reservation_writes_publish_events(client):
+    start = broker.last_id
+    pass_id = _future_pass()
+
+    response = client.post("/reservations", json={"pass_id": pass_id})
+    assert response.status_code == 200
+    r_id = response.json()["reservation"]["r_id"]
+    assert client.post(f"/reservations/{r_id}/cancel").status_code == 200
+
+    published = broker.replay(start, {"reservations"})
+    assert [e["type"] for e in published] == ["reservation.created", "reservation.cancelled"]
+    assert published[0]["data"]["pass_id"] == pass_id
+    assert published[1]["data"]["r_id"] == r_id
+
+
+def test_events_rejects_unknown_topic(client):
+    response = client.get("/events", params={"topics": "reservations,weather"})
+    assert response.status_code == 400
+
+
+def test_stream_sends_events_published_before_it_starts():
+    class ConnectedRequest:
+        async def is_disconnected(self):
+            return False
+
+    async def run():
+        response = await events_module.stream_events(
+            ConnectedRequest(), topics=None, last_event_id=None, last_event_id_header=None
+        )
+        # Published after subscribing but before the response body is first read.
+        event = broker.publish("reservations", "reservation.created", {"r_id": 1})
+        try:
+            chunk = await asyncio.wait_for(response.body_iterator.__anext__(), timeout=1)
+        finally:
+            await response.body_iterator.aclose()
+        return event, chunk
+
+    event, chunk = asyncio.run(run())
+    assert chunk.startswith(f"id: {event['id']}\nevent: reservation.created")
+
+
+def test_stream_resets_on_token_from_before_restart():
+    class ConnectedRequest:
+        async def is_disconnected(self):
+            return False
+
+    stale = EventBroker()
+    stale.publish("reservations", "reservation.created", {"r_id": 1})
+
+    async def run():
+        response = await events_module.stream_events(
+            ConnectedRequest(), topics=None, last_event_id=None, last_event_id_header=stale.last_id
+        )
+        try:
+            return await asyncio.wait_for(response.body_iterator.__anext__(), timeout=1)
+        finally:
+            await response.body_iterator.aclose()
+
+    chunk = asyncio.run(run())
+    assert chunk == f"id: {broker.last_id}\nevent: reset\ndata: {{}}\n\n"
@@ -0,0 +1,64 @@
+import csv
+import io
+
+import pytest
+
+
+def test_export_csv_streams_joined_history(client):
+    response = client.get("/reservations/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows
+    assert {"r_id", "gs_code", "norad_id", "start_time", "status", "commands"} <= set(rows[0])
+    assert [int(row["r_id"]) for row in rows] == sorted(int(row["r_id"]) for row in rows)
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.get("/reservations/export", params={"format": "xlsx"}).status_code == 400
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_export_columnar_formats(client, fmt):
+    pa = pytest.importorskip("pyarrow")
+    csv_rows = list(csv.DictReader(io.StringIO(client.get("/reservations/export").text)))
+
+    response = client.get("/reservations/export", params={"format": fmt})
+    assert response.status_code == 200
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(io.BytesIO(response.content))
+    else:
+        table = pa.ipc.open_stream(response.content).read_all()
+
+    assert table.num_rows == len(csv_rows)
+    assert pa.types.is_timestamp(table.schema.field("start_time").type)
+    assert table.column("r_id").to_pylist() == [int(row["r_id"]) for row in csv_rows]
+
+
+def test_export_chunks_keep_every_row(test_db):
+    from src.services import export
+
+    whole = b"".join(export.iter_reservation_export("csv", chunk_size=10000))
+    chunked = list(export.iter_reservation_export("csv", chunk_size=1))
+    assert len(chunked) > 2
+    assert b"".join(chunked) == whole
+
+
+def test_export_generator_survives_thread_hops(test_db):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.services import export
+
+    # Like iterate_in_threadpool: every next() (and the close) on a fresh thread.
+    chunks = export.iter_reservation_export("csv", chunk_size=1)
+    collected = []
+    while True:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            chunk = pool.submit(next, chunks, None).result()
+        if chunk is None:
+            break
+        collected.append(chunk)
+    assert b"".join(collected) == b"".join(export.iter_reservation_export("csv"))
@@ -112,7 +112,7 @@ def test_update_groundstation_allows_code_and_status_only(client):
         f"/groundstations/{gs_id}/",
         json={"gs_code": f"UPDATED_{gs_id}", "status": "INACTIVE"},
     )
-    assert response.status_code == 200
+    assert response.status_code == 202
     updated = response.json()["ground_station"]
     assert updated["gs_code"] == f"UPDATED_{gs_id}"
     assert updated["status"] == "INACTIVE"
@@ -124,7 +124,7 @@ def test_update_groundstation_status_normalized(client):
         f"/groundstations/{gs_id}/",
         json={"status": "inactive"},
     )
-    assert response.status_code == 200
+    assert response.status_code == 202
     updated = response.json()["ground_station"]
     assert updated["status"] == "INACTIVE"
 
@@ -159,10 +159,11 @@ def test_update_groundstation_inactive_cancels_reservations_and_deletes_passes(c
         f"/groundstations/{gs_id}/",
         json={"status": "INACTIVE"},
     )
-    assert response.status_code == 200
-    payload = response.json()
-    assert payload.get("reservations_cancelled") == 1
-    assert payload.get("passes_deleted") == 1
+    assert response.status_code == 202
+    job = client.get(response.json()["status_url"]).json()["job"]
+    assert job["status"] == "COMPLETED"
+    assert job["reservations_cancelled"] == 1
+    assert job["passes_deleted"] == 1
 
     reservations = client.get("/reservations", params={"include_cancelled": True})
     assert reservations.status_code == 200
@@ -174,7 +175,7 @@ def test_update_groundstation_inactive_cancels_reservations_and_deletes_passes(c
     conn = db_init.db_connect()
     try:
         remaining = conn.execute(
-            "SELECT pass_id FROM predicted_passes WHERE gs_id = ?",
+            "SELECT pass_id FROM all_predicted_passes WHERE gs_id = ?",
             (gs_id,),
         ).fetchall()
         remaining_ids = {row["pass_id"] for row in remaining}
@@ -213,11 +214,12 @@ def test_deactivate_groundstation_cancels_and_deletes(client):
     )
 
     response = client.patch("/groundstations/1/", json={"status": "INACTIVE"})
-    assert response.status_code == 200
+    assert response.status_code == 202
     payload = response.json()
     assert payload["ground_station"]["status"] == "INACTIVE"
-    assert payload["reservations_cancelled"] >= 1
-    assert payload["passes_deleted"] >= 1
+    job = client.get(f"/jobs/{payload['job_id']}").json()["job"]
+    assert job["reservations_cancelled"] >= 1
+    assert job["passes_deleted"] >= 1
 
     conn = db_init.db_connect()
     try:
@@ -238,7 +240,7 @@ def test_reservation_blocked_for_inactive_groundstation(client):
         f"/groundstations/{gs_id}/",
         json={"status": "INACTIVE"},
     )
-    assert response.status_code == 200
+    assert response.status_code == 202
 
     now = datetime.now(timezone.utc)
     pass_id = p_db.insert_n2yo_pass_return_id(
@@ -274,18 +276,22 @@ def test_update_groundstation_not_found(client):
 
 def test_delete_groundstation_response_shape(client):
     response = client.delete("/groundstations/3")
-    assert response.status_code == 200
+    assert response.status_code == 202
     data = response.json()
-    assert "deleted_reservations" in data
-    assert "deleted_reservations_count" not in data
+    assert data["status_url"] == f"/jobs/{data['job_id']}"
+    job = client.get(data["status_url"]).json()["job"]
+    assert job["kind"] == "gs_delete"
+    assert job["status"] == "COMPLETED"
+    assert "deleted_reservations" not in data
 
 
 def test_delete_groundstation_no_reservations(client):
     gs_id = _create_groundstation(client)
     response = client.delete(f"/groundstations/{gs_id}")
-    assert response.status_code == 200
+    assert response.status_code == 202
     assert "Warning" in response.headers
-    assert response.json()["deleted_reservations"] == 0
+    job = client.get(response.json()["status_url"]).json()["job"]
+    assert job["reservations_deleted"] == 0
 
     listing = client.get("/groundstations")
     assert listing.status_code == 200
@@ -314,7 +320,7 @@ def test_delete_groundstation_cancelled_reservation_allows_delete(client):
     assert cancel.status_code == 200
 
     response = client.delete(f"/groundstations/{gs_id}")
-    assert response.status_code == 200
+    assert response.status_code == 202
     assert "Warning" in response.headers
 
     listing = client.get("/groundstations")
@@ -367,9 +373,11 @@ def test_delete_groundstation_force_with_active_reservation(client):
     assert reserve.status_code == 200
 
     response = client.delete(f"/groundstations/{gs_id}", params={"force": True})
-    assert response.status_code == 200
+    assert response.status_code == 202
     assert "Warning" in response.headers
-    assert response.json()["deleted_reservations"] == 1
+    job = client.get(response.json()["status_url"]).json()["job"]
+    assert job["reservations_deleted"] == 1
+    assert job["passes_deleted"] == 1
 
     listing = client.get("/groundstations")
     assert listing.status_code == 200
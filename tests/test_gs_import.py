@@ -0,0 +1,109 @@
+import io
+import json
+
+from src.core.json_stream import iter_json_array
+from src.services.gs_import import import_ground_stations
+
+CSV_BODY = """gs_code,lon,lat,alt,status
+IMP_ONE,10.123456,50.5,120.555,active
+IMP_TWO,11.0,51.0,80,
+"""
+
+
+def _feature(gs_code, lon, lat, alt=None, **properties):
+    coordinates = [lon, lat] if alt is None else [lon, lat, alt]
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": coordinates},
+        "properties": {"gs_code": gs_code, **properties},
+    }
+
+
+def test_iter_json_array_streams_array_under_key():
+    text = '{"type": "FeatureCollection", "meta": {"x": [1, 2]}, "features": [{"a": 1.5}, {"b": "]"}]}'
+    assert list(iter_json_array(io.StringIO(text), chunk_size=2, key="features")) == [{"a": 1.5}, {"b": "]"}]
+
+
+def test_import_csv_creates_stations(client):
+    response = client.post("/groundstations/import", params={"format": "csv"}, content=CSV_BODY)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["total"] == 2
+    assert body["errors"] == []
+    first, second = body["ground_stations"]
+    assert first["lon"] == 10.12346 and first["alt"] == 120.56 and first["status"] == "ACTIVE"
+    assert second["status"] == "ACTIVE"
+
+    codes = {gs["gs_code"]: gs for gs in client.get("/groundstations").json()["ground_stations"]}
+    assert codes["IMP_ONE"]["gs_id"] == first["gs_id"]
+    assert codes["IMP_TWO"]["source"] == "IMPORT"
+
+
+def test_import_geojson_creates_stations(client):
+    document = {
+        "type": "FeatureCollection",
+        "features": [
+            _feature("GEO_ONE", 2.35, 48.85, 35),
+            _feature("GEO_TWO", 13.4, 52.52, 34, status="INACTIVE"),
+        ],
+    }
+    response = client.post("/groundstations/import", params={"format": "geojson"}, content=json.dumps(document))
+    assert response.status_code == 201
+    stations = response.json()["ground_stations"]
+    assert [gs["gs_code"] for gs in stations] == ["GEO_ONE", "GEO_TWO"]
+    assert stations[0]["alt"] == 35
+    assert stations[1]["status"] == "INACTIVE"
+
+
+def test_import_geojson_reports_missing_altitude(client):
+    document = {"type": "FeatureCollection", "features": [_feature("GEO_NOALT", 13.4, 52.52)]}
+    response = client.post("/groundstations/import", params={"format": "geojson", "atomic": False}, content=json.dumps(document))
+    assert response.status_code == 201
+    assert response.json()["ground_stations"] == []
+    assert response.json()["errors"][0]["detail"].startswith("alt:")
+
+
+def test_import_reports_conflicts_and_is_atomic(client):
+    # DEN_CO is seeded; IMP_THREE reuses IMP_ONE's coordinates; IMP_FOUR has a bad lon.
+    body = CSV_BODY.replace("IMP_TWO", "DEN_CO") + "IMP_THREE,10.123456,50.5,1,ACTIVE\nIMP_FOUR,abc,1,1,ACTIVE\n"
+    response = client.post("/groundstations/import", content=body)
+    assert response.status_code == 409
+    errors = response.json()["detail"]["errors"]
+    assert [(error["index"], error["status_code"]) for error in errors] == [(1, 409), (2, 409), (3, 400)]
+    codes = {gs["gs_code"] for gs in client.get("/groundstations").json()["ground_stations"]}
+    assert "IMP_ONE" not in codes
+
+
+def test_import_partial_inserts_valid_rows(test_db):
+    body = CSV_BODY.replace("IMP_TWO", "DEN_CO")
+    result = import_ground_stations(io.StringIO(body), "csv", atomic=False)
+    assert [gs["gs_code"] for gs in result["ground_stations"]] == ["IMP_ONE"]
+    assert len(result["errors"]) == 1
+    assert result["errors"][0]["index"] == 1
+    assert "gs_code already registered" in result["errors"][0]["detail"]
+
+
+def test_import_rejects_bad_format(client):
+    assert client.post("/groundstations/import", params={"format": "kml"}, content="").status_code == 400
+    assert client.post("/groundstations/import", params={"format": "geojson"}, content="[1]").status_code == 400
+
+
+def test_import_geojson_reports_malformed_features(client):
+    features = [
+        _feature("GEO_OK", 2.35, 48.85, 35),
+        {"type": "Feature", "geometry": "POINT (1 2)", "properties": {"gs_code": "GEO_STR"}},
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": 5}, "properties": {"gs_code": "GEO_INT"}},
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1.0]}, "properties": {"gs_code": "GEO_SHORT"}},
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": ["1", "2", 3]}, "properties": {"gs_code": "GEO_TXT"}},
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [1, 2, 3]}, "properties": ["GEO_LIST"]},
+        "not a feature",
+    ]
+    document = {"type": "FeatureCollection", "features": features}
+    response = client.post("/groundstations/import", params={"format": "geojson", "atomic": False}, content=json.dumps(document))
+    assert response.status_code == 201
+    body = response.json()
+    assert [gs["gs_code"] for gs in body["ground_stations"]] == ["GEO_OK"]
+    errors = body["errors"]
+    assert [(error["index"], error["status_code"]) for error in errors] == [(i, 400) for i in range(1, 7)]
+    assert errors[0]["detail"] == "Feature geometry must be a Point."
+    assert all(error["detail"].startswith("Point coordinates") for error in errors[1:4])
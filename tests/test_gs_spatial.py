@@ -0,0 +1,84 @@
+import importlib
+
+from db import db_init
+from src.services import geo, gs_spatial
+
+
+def _gs_codes(response) -> list[str]:
+    assert response.status_code == 200
+    return [gs["gs_code"] for gs in response.json()["ground_stations"]]
+
+
+def _register(client, gs_code: str, lat: float, lon: float) -> int:
+    response = client.post("/groundstations", json={"gs_code": gs_code, "lon": lon, "lat": lat, "alt": 10})
+    assert response.status_code == 201
+    codes = {gs["gs_code"]: gs["gs_id"] for gs in client.get("/groundstations").json()["ground_stations"]}
+    return codes[gs_code]
+
+
+def test_bounding_boxes_split_at_antimeridian():
+    boxes = geo.bounding_boxes(0.0, 179.9, 100)
+    assert len(boxes) == 2
+    assert boxes[0][3] == 180.0 and boxes[1][2] == -180.0
+    assert geo.bounding_boxes(89.5, 0.0, 100)[0][2:] == (-180.0, 180.0)
+
+
+def test_nearby_within_radius_sorted_by_distance(client):
+    codes = _gs_codes(client.get("/groundstations/nearby", params={"lat": 39.7392, "lon": -104.9903, "radius_km": 50}))
+    assert codes == ["DEN_CO", "BOU_CO"]
+
+    response = client.get("/groundstations/nearby", params={"lat": 39.7392, "lon": -104.9903, "radius_km": 50, "limit": 1})
+    assert _gs_codes(response) == ["DEN_CO"]
+    assert response.json()["ground_stations"][0]["distance_km"] == 0
+
+
+def test_nearest_n_grows_search_radius(client):
+    codes = _gs_codes(client.get("/groundstations/nearby", params={"lat": 0, "lon": 0, "limit": 2}))
+    assert len(codes) == 2
+    assert client.get("/groundstations/nearby", params={"lat": 0, "lon": 0}).status_code == 400
+
+
+def test_spatial_index_follows_insert_update_delete(client):
+    gs_id = _register(client, "DATELINE", -16.5, 179.95)
+    assert _gs_codes(client.get("/groundstations/nearby", params={"lat": -16.5, "lon": -179.95, "radius_km": 20})) == [
+        "DATELINE"
+    ]
+
+    conn = db_init.db_connect()
+    try:
+        conn.execute("UPDATE ground_stations SET lat = 10.0, lon = 10.0 WHERE gs_id = ?", (gs_id,))
+        conn.commit()
+    finally:
+        conn.close()
+    assert _gs_codes(client.get("/groundstations/nearby", params={"lat": -16.5, "lon": -179.95, "radius_km": 20})) == []
+    assert _gs_codes(client.get("/groundstations/nearby", params={"lat": 10, "lon": 10, "radius_km": 1})) == ["DATELINE"]
+
+    assert client.delete(f"/groundstations/{gs_id}").status_code == 202
+    assert _gs_codes(client.get("/groundstations/nearby", params={"lat": 10, "lon": 10, "radius_km": 1})) == []
+
+
+def test_visible_stations_use_satellite_footprint(client, monkeypatch):
+    monkeypatch.setattr(gs_spatial, "sub_satellite_point", lambda *args: (39.7392, -104.9903, 420.0))
+    response = client.get("/groundstations/visible", params={"norad_id": 25544})
+    codes = _gs_codes(response)
+    assert codes[:2] == ["DEN_CO", "BOU_CO"]
+    assert response.json()["sub_satellite_point"]["alt_km"] == 420.0
+
+    # At 60 degrees elevation the footprint is only a few hundred km wide.
+    assert "DEN_CO" in _gs_codes(client.get("/groundstations/visible", params={"norad_id": 25544, "min_elevation": 60}))
+    assert client.get("/groundstations/visible", params={"norad_id": 999999}).status_code == 404
+
+
+def test_pass_prediction_skips_stations_outside_orbit_band(client, monkeypatch):
+    passes_module = importlib.import_module("src.routers.passes")
+
+    def fail(**kwargs):
+        raise AssertionError("prediction must be skipped")
+
+    monkeypatch.setattr(passes_module, "_tle_is_stale", lambda *args: False)
+    monkeypatch.setattr(passes_module, "get_pass_predictions", fail)
+    # The seeded ISS orbit (51.6 degrees) can't be seen from 85 degrees north.
+    gs_id = _register(client, "POLAR_ST", 85.0, 20.0)
+    response = client.get("/passes", params={"norad_id": 25544, "gs_id": gs_id})
+    assert response.status_code == 200
+    assert response.json()["passes"] == []
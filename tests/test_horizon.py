@@ -0,0 +1,165 @@
+import importlib
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+import db.passes_db as p_db
+import db.reservations_db as r_db
+from src.services import horizon, pass_cache
+from src.services.predict_passes import get_pass_predictions
+from src.services.tle import tle_checksum
+
+passes_module = importlib.import_module("src.routers.passes")
+
+
+def _with_checksum(line: str) -> str:
+    return line[:68] + str(tle_checksum(line))
+
+
+ISS_L1 = _with_checksum("1 25544U 98067A   26040.50000000  .00010000  00000-0  18000-3 0  9990")
+ISS_L2 = _with_checksum("2 25544  51.6400 121.0000 0005000  20.0000  40.0000 15.50000000    10")
+START = datetime(2026, 2, 10, tzinfo=timezone.utc)
+
+
+def _predict(mask=None) -> list[dict]:
+    return get_pass_predictions(
+        sat_name="ISS",
+        tle_line1=ISS_L1,
+        tle_line2=ISS_L2,
+        utc_time=START,
+        hours=24,
+        gs_lon=-104.99,
+        gs_lat=39.74,
+        gs_alt=1.6,
+        horizon_mask=mask,
+    )
+
+
+def _utc_ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def test_mask_round_trips_in_tenths_of_a_degree():
+    mask = horizon.mask_from_points([(350.0, 10.0), (10.0, 20.0), (180.0, 5.0)])
+    # Interpolation wraps through north.
+    assert mask[0] == pytest.approx(15.0)
+    blob = horizon.encode_mask(mask)
+    assert len(blob) == 720
+    assert np.allclose(horizon.decode_mask(blob), np.round(mask, 1))
+    with pytest.raises(ValueError):
+        horizon.encode_mask([0.0] * 359)
+
+
+def test_mask_trims_and_drops_passes():
+    flat = _predict()
+    assert flat
+    assert len(_predict(np.zeros(horizon.MASK_SIZE))) == len(flat)
+    assert _predict(np.full(horizon.MASK_SIZE, 89.0)) == []
+
+    # A 30 degree wall over the whole southern half of the sky.
+    wall = np.zeros(horizon.MASK_SIZE)
+    wall[90:270] = 30.0
+    masked = _predict(wall)
+    assert len(masked) <= len(flat)
+    assert sum(p["duration"] for p in masked) < sum(p["duration"] for p in flat)
+    for trimmed in masked:
+        assert any(
+            original["start_time"] <= trimmed["start_time"] and trimmed["end_time"] <= original["end_time"]
+            for original in flat
+        )
+
+
+def test_horizon_mask_endpoints_invalidate_unreserved_passes(client):
+    now = datetime.now(timezone.utc)
+    reserved_pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=20.0,
+        duration=600,
+        start_time=_utc_ts(now + timedelta(hours=1)),
+        end_time=_utc_ts(now + timedelta(hours=1, minutes=10)),
+    )
+    unreserved_pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=25.0,
+        duration=300,
+        start_time=_utc_ts(now + timedelta(hours=3)),
+        end_time=_utc_ts(now + timedelta(hours=3, minutes=5)),
+    )
+    r_db.create_reservation_with_commands(pass_id=reserved_pass_id, gs_id=1, s_id=1, mission_id=None, commands=[])
+
+    assert client.get("/groundstations/1/horizon-mask").json()["custom"] is False
+    response = client.put(
+        "/groundstations/1/horizon-mask",
+        json={"points": [{"azimuth": 0, "elevation": 5}, {"azimuth": 180, "elevation": 15.04}]},
+    )
+    assert response.status_code == 200
+    assert response.json()["passes_invalidated"] == 1
+    assert p_db.get_pass_from_pass_id(unreserved_pass_id) is None
+    assert p_db.get_pass_from_pass_id(reserved_pass_id) is not None
+
+    stored = client.get("/groundstations/1/horizon-mask").json()
+    assert stored["custom"] is True
+    assert stored["elevations"][90] == 10.0
+    assert stored["elevations"][180] == 15.0
+
+    assert client.delete("/groundstations/1/horizon-mask").json()["custom"] is False
+    assert client.get("/groundstations/1/horizon-mask").json()["elevations"] == [0.0] * 360
+
+
+def test_horizon_mask_validation(client):
+    assert client.put("/groundstations/1/horizon-mask", json={}).status_code == 400
+    both = {"elevations": [0.0] * 360, "points": [{"azimuth": 0, "elevation": 0}]}
+    assert client.put("/groundstations/1/horizon-mask", json=both).status_code == 400
+    assert client.put("/groundstations/1/horizon-mask", json={"elevations": [0.0] * 359}).status_code == 422
+    assert client.put("/groundstations/1/horizon-mask", json={"elevations": [91.0] * 360}).status_code == 422
+    assert client.put("/groundstations/999999/horizon-mask", json={"elevations": [0.0] * 360}).status_code == 404
+
+
+def test_passes_are_predicted_against_the_station_mask(client, monkeypatch):
+    assert client.put("/groundstations/1/horizon-mask", json={"elevations": [3.0] * 360}).status_code == 200
+    seen = {}
+
+    def fake_get_passes(**kwargs):
+        seen.update(kwargs)
+        return []
+
+    monkeypatch.setattr(passes_module, "get_pass_predictions", fake_get_passes)
+    assert client.get("/passes", params={"norad_id": 25544, "gs_id": 1}).status_code == 200
+    assert np.allclose(seen["horizon_mask"], 3.0)
+
+
+def test_repredicted_passes_do_not_duplicate_a_reserved_pass(client):
+    now = datetime.now(timezone.utc)
+    reserved_pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=20.0,
+        duration=600,
+        start_time=_utc_ts(now + timedelta(hours=1)),
+        end_time=_utc_ts(now + timedelta(hours=1, minutes=10)),
+    )
+    r_db.create_reservation_with_commands(pass_id=reserved_pass_id, gs_id=1, s_id=1, mission_id=None, commands=[])
+    assert client.put("/groundstations/1/horizon-mask", json={"elevations": [10.0] * 360}).status_code == 200
+
+    # The mask trims the reserved pass; its re-prediction is skipped, a later pass is not.
+    trimmed = {
+        "max_elevation": 20.0,
+        "duration": 420,
+        "start_time": _utc_ts(now + timedelta(hours=1, minutes=2)),
+        "end_time": _utc_ts(now + timedelta(hours=1, minutes=9)),
+    }
+    later = {
+        "max_elevation": 30.0,
+        "duration": 300,
+        "start_time": _utc_ts(now + timedelta(hours=5)),
+        "end_time": _utc_ts(now + timedelta(hours=5, minutes=5)),
+    }
+    satellite = {"s_id": 1, "norad_id": 25544}
+    new_ids = pass_cache.cache_predicted_passes(satellite, {"gs_id": 1}, [trimmed, later])
+
+    assert len(new_ids) == 1
+    assert p_db.get_pass_from_pass_id(new_ids[0])["start_time"] == later["start_time"]
+    assert p_db.get_pass_id(1, 1, trimmed["start_time"], trimmed["end_time"]) is None
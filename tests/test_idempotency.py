@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+import db.passes_db as p_db
+from db import db_init
+
+
+def _future_pass() -> int:
+    now = datetime.now(timezone.utc)
+    pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=45.0,
+        duration=600,
+        start_time=(now + timedelta(hours=4)).strftime("%Y-%m-%d %H:%M:%S"),
+        end_time=(now + timedelta(hours=4, minutes=10)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    assert pass_id is not None
+    return pass_id
+
+
+def _reservation_count() -> int:
+    conn = db_init.db_connect()
+    try:
+        return conn.execute("SELECT COUNT(*) FROM reservations").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_retry_with_same_key_replays_first_response(client):
+    pass_id = _future_pass()
+    headers = {"Idempotency-Key": "reserve-1"}
+
+    first = client.post("/reservations", json={"pass_id": pass_id}, headers=headers)
+    assert first.status_code == 200
+    count = _reservation_count()
+
+    retry = client.post("/reservations", json={"pass_id": pass_id}, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert _reservation_count() == count
+
+    # Without a key the same request is a real (conflicting) second attempt.
+    assert client.post("/reservations", json={"pass_id": pass_id}).status_code == 409
+
+
+def test_key_reused_for_different_request_is_rejected(client):
+    headers = {"Idempotency-Key": "mission-key"}
+    assert client.post("/missions/create", json={"mission_name": "A"}, headers=headers).status_code == 201
+    response = client.post("/missions/create", json={"mission_name": "B"}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_client_errors_are_replayed_and_server_errors_released(client, monkeypatch):
+    headers = {"Idempotency-Key": "cancel-missing"}
+    first = client.post("/reservations/999999/cancel", headers=headers)
+    assert first.status_code == 404
+    assert client.post("/reservations/999999/cancel", headers=headers).headers.get("Idempotent-Replayed") == "true"
+
+    import db.missions_db as m_db
+    import sqlite3
+
+    def fail(*args, **kwargs):
+        raise sqlite3.Error("db down")
+
+    monkeypatch.setattr(m_db, "add_mission", fail)
+    headers = {"Idempotency-Key": "retry-after-500"}
+    assert client.post("/missions/create", json={"mission_name": "C"}, headers=headers).status_code == 500
+    monkeypatch.undo()
+    assert client.post("/missions/create", json={"mission_name": "C"}, headers=headers).status_code == 201
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import db.gs_db as gs_db
+import db.jobs_db as jobs_db
+import db.passes_db as p_db
+import db.reservations_db as r_db
+from db import db_init
+from src.services import jobs
+
+
+def _utc_ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _station_with_passes(count: int, reserved: int) -> int:
+    gs_id = gs_db.insert_gs_manual("JOB_GS", 34.5, 12.5, 10.0, "ACTIVE")
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        pass_id = p_db.insert_n2yo_pass_return_id(
+            s_id=1,
+            gs_id=gs_id,
+            max_elevation=30.0,
+            duration=600,
+            start_time=_utc_ts(now + timedelta(hours=i + 1)),
+            end_time=_utc_ts(now + timedelta(hours=i + 1, minutes=10)),
+        )
+        if i < reserved:
+            r_db.create_reservation_with_commands(pass_id=pass_id, gs_id=gs_id, s_id=1, mission_id=None, commands=[])
+    return gs_id
+
+
+def _age_job(job_id: int) -> None:
+    # Looks like a worker that died mid-run.
+    conn = db_init.db_connect()
+    try:
+        conn.execute("UPDATE jobs SET updated_at = datetime('now', '-1 hour') WHERE job_id = ?", (job_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_interrupted_delete_job_resumes_where_it_stopped(client):
+    gs_id = _station_with_passes(count=7, reserved=5)
+    job_id, created = jobs_db.create_delete_job("gs_delete", gs_id)
+    assert created
+    assert gs_db.get_gs_by_id(gs_id)["status"] == "INACTIVE"
+
+    # One chunk commits, then the worker "crashes".
+    assert jobs_db.claim_job(job_id, jobs.STALE_AFTER_SECONDS)
+    assert jobs_db.delete_reservations_chunk(job_id, "gs_delete", gs_id, 2) == 2
+    assert not jobs_db.claim_job(job_id, jobs.STALE_AFTER_SECONDS)
+    _age_job(job_id)
+
+    assert jobs.resume_jobs() == 1
+    job = client.get(f"/jobs/{job_id}").json()["job"]
+    assert job["status"] == "COMPLETED"
+    assert job["reservations_deleted"] == 5
+    assert job["passes_deleted"] == 7
+    assert job["finished_at"] is not None
+    assert gs_db.get_gs_by_id(gs_id) is None
+    assert jobs.resume_jobs() == 0
+
+
+def test_deactivation_runs_in_chunks(client, monkeypatch):
+    gs_id = _station_with_passes(count=6, reserved=3)
+    chunks = []
+    real_chunk = jobs_db.cancel_gs_reservations_chunk
+
+    def counting_chunk(job_id, gs_id, limit):
+        chunks.append(limit)
+        return real_chunk(job_id, gs_id, limit)
+
+    monkeypatch.setattr(jobs_db, "cancel_gs_reservations_chunk", counting_chunk)
+    job_id = jobs_db.create_gs_deactivation_job(gs_id, {"status": "INACTIVE"})
+    job = jobs.run_job(job_id, batch_size=2, pause=0)
+    assert chunks == [2, 2]
+    assert job["status"] == "COMPLETED"
+    assert job["reservations_cancelled"] == 3
+    assert job["passes_deleted"] == 3
+
+
+def test_reactivated_station_cancels_deactivation_job(client):
+    gs_id = _station_with_passes(count=2, reserved=1)
+    job_id = jobs_db.create_gs_deactivation_job(gs_id, {"status": "INACTIVE"})
+    gs_db.update_gs(gs_id, {"status": "ACTIVE"})
+
+    job = jobs.run_job(job_id)
+    assert job["status"] == "CANCELLED"
+    assert job["reservations_cancelled"] == 0
+    assert job["passes_deleted"] == 0
+
+
+def test_repeated_delete_returns_the_unfinished_job(client):
+    gs_id = _station_with_passes(count=1, reserved=0)
+    job_id, _ = jobs_db.create_delete_job("gs_delete", gs_id)
+
+    response = client.delete(f"/groundstations/{gs_id}")
+    assert response.status_code == 202
+    assert response.json()["job_id"] == job_id
+    assert client.get(f"/jobs/{job_id}").json()["job"]["status"] == "PENDING"
+
+
+def test_job_not_found(client):
+    assert client.get("/jobs/999999").status_code == 404
@@ -0,0 +1,125 @@
+import asyncio
+import importlib
+from datetime import datetime, timedelta, timezone
+
+import db.passes_db as p_db
+from db import db_init
+from src.core import metrics
+from src.services import maintenance
+
+
+def _insert_pass(start: datetime, end: datetime) -> int:
+    pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=3,
+        max_elevation=20.0,
+        duration=int((end - start).total_seconds()),
+        start_time=start.strftime("%Y-%m-%d %H:%M:%S"),
+        end_time=end.strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    assert pass_id is not None
+    return pass_id
+
+
+def test_expire_passes_drops_past_days_and_keeps_reserved(test_db):
+    now = datetime.now(timezone.utc)
+    yesterday = now - timedelta(days=1)
+    expired = [_insert_pass(yesterday - timedelta(hours=1 + i), yesterday - timedelta(hours=i)) for i in range(5)]
+    active = _insert_pass(now - timedelta(minutes=5), now + timedelta(minutes=5))
+    assert p_db.partition_name(yesterday.date()) in p_db.get_pass_partitions()
+
+    # Seeded passes (in predicted_passes) include old reserved ones, which must survive.
+    deleted = maintenance.expire_passes(batch_size=2)
+
+    assert deleted >= 5
+    assert all(p_db.get_pass_from_pass_id(pass_id) is None for pass_id in expired)
+    assert p_db.partition_name(yesterday.date()) not in p_db.get_pass_partitions()
+    assert p_db.get_pass_from_pass_id(active) is not None
+    assert p_db.get_pass_from_pass_id(1) is not None
+
+
+def test_get_passes_does_not_delete_expired_passes(client, monkeypatch):
+    from fastapi import HTTPException
+
+    passes_module = importlib.import_module("src.routers.passes")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("GET /passes must not write")
+
+    def no_tle(*args, **kwargs):
+        raise HTTPException(status_code=502, detail="CelesTrak API request failed.")
+
+    monkeypatch.setattr(p_db, "delete_unreserved_expired_passes", fail)
+    monkeypatch.setattr(p_db, "drop_expired_pass_partitions", fail)
+    monkeypatch.setattr(passes_module, "get_tle", no_tle)
+    monkeypatch.setattr(passes_module, "get_pass_predictions", lambda **kwargs: [])
+    response = client.get("/passes", params={"norad_id": 25544, "gs_id": 1})
+    assert response.status_code == 200
+
+
+def test_scheduler_runs_tasks_and_records_metrics():
+    metrics.reset()
+    calls = []
+
+    def task():
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        return 3
+
+    async def run():
+        maintenance.start_maintenance([maintenance.MaintenanceTask("test", 0.01, task)])
+        while len(calls) < 3:
+            await asyncio.sleep(0.01)
+        await maintenance.stop_maintenance()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+    counters = metrics.snapshot()["counters"]
+    assert counters["maintenance.test.failures"] == 1
+    assert counters["maintenance.test.runs"] >= 2
+    assert counters["maintenance.test.rows"] >= 6
+
+
+def test_passes_are_cached_by_end_day_and_moved_out_when_reserved(client):
+    now = datetime.now(timezone.utc)
+    tomorrow = now + timedelta(days=1)
+    pass_id = _insert_pass(tomorrow, tomorrow + timedelta(minutes=10))
+    partition = p_db.partition_name((tomorrow + timedelta(minutes=10)).date())
+    assert partition in p_db.get_pass_partitions()
+    # A duplicate prediction is ignored, and ids don't collide with predicted_passes.
+    assert p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=3,
+        max_elevation=20.0,
+        duration=600,
+        start_time=tomorrow.strftime("%Y-%m-%d %H:%M:%S"),
+        end_time=(tomorrow + timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S"),
+    ) is None
+    version = client.get("/sync").json()["version"]
+
+    response = client.post("/reservations", json={"pass_id": pass_id})
+    assert response.status_code == 200
+    conn = db_init.db_connect()
+    try:
+        assert conn.execute("SELECT 1 FROM predicted_passes WHERE pass_id = ?", (pass_id,)).fetchone()
+        assert not conn.execute(f"SELECT 1 FROM {partition} WHERE pass_id = ?", (pass_id,)).fetchone()
+    finally:
+        conn.close()
+    assert response.json()["reservation"]["pass_id"] == pass_id
+
+    # Sync clients see the move as an update, not a deletion.
+    changes = client.get("/sync", params={"since": version}).json()["changes"]["predicted_passes"]
+    assert [row["pass_id"] for row in changes["upserts"]] == [pass_id]
+    assert changes["deletes"] == []
+
+
+def test_dropped_partitions_leave_tombstones_for_sync(client):
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    pass_id = _insert_pass(yesterday - timedelta(minutes=10), yesterday)
+    version = client.get("/sync").json()["version"]
+
+    assert p_db.drop_expired_pass_partitions() == 1
+
+    changes = client.get("/sync", params={"since": version}).json()["changes"]["predicted_passes"]
+    assert changes["deletes"] == [pass_id]
+    assert p_db.pass_exists(pass_id) is False
@@ -1,10 +1,13 @@
 from datetime import datetime, timedelta, timezone
 
 import pytest
+from fastapi import HTTPException
 
 import db.passes_db as p_db
 from db import db_init
 import importlib
+from src.services.celestrak_client import CircuitBreaker, TLEFetch
+from src.services.tle import tle_needs_refresh
 
 passes_module = importlib.import_module("src.routers.passes")
 
@@ -22,6 +25,14 @@ def _clear_predicted_passes():
     finally:
         conn.close()
 
+def _clear_reservations():
+    conn = db_init.db_connect()
+    try:
+        conn.execute("DELETE FROM reservations")
+        conn.commit()
+    finally:
+        conn.close()
+
 def _update_satellite_tle(s_id: int, line1: str, line2: str, updated_at: str):
     conn = db_init.db_connect()
     try:
@@ -36,6 +47,8 @@ def _update_satellite_tle(s_id: int, line1: str, line2: str, updated_at: str):
 def _insert_reservation(pass_id: int, gs_id: int, s_id: int):
     conn = db_init.db_connect()
     try:
+        conn.execute("BEGIN IMMEDIATE")
+        p_db.move_pass_to_main(conn, pass_id)
         conn.execute(
             "INSERT INTO reservations (pass_id, gs_id, s_id) VALUES (?, ?, ?)",
             (pass_id, gs_id, s_id),
@@ -185,7 +198,7 @@ def test_passes_missing_satellite(client):
 
 def test_passes_blocked_for_inactive_groundstation(client):
     response = client.patch("/groundstations/1/", json={"status": "INACTIVE"})
-    assert response.status_code == 200
+    assert response.status_code == 202
 
     response = client.get("/passes", params={"norad_id": 25544, "gs_id": 1})
     assert response.status_code == 409
@@ -206,10 +219,14 @@ def test_tle_refresh_when_stale(client, monkeypatch):
 
     def fake_get_tle(*args, **kwargs):
         calls["count"] += 1
-        return [
-            "1 25544U 98067A   26029.50000000  .00010000  00000-0  18000-3 0  9991",
-            "2 25544  51.6400 120.0000 0005000  20.0000  40.0000 15.50000000    10",
-        ]
+        return TLEFetch(
+            [
+                "1 25544U 98067A   26029.50000000  .00010000  00000-0  18000-3 0  9991",
+                "2 25544  51.6400 120.0000 0005000  20.0000  40.0000 15.50000000    10",
+            ],
+            None,
+            None,
+        )
 
     def fake_get_passes(*args, **kwargs):
         return []
@@ -292,7 +309,7 @@ def test_claimable_filtering_excludes_active_reservations(client, monkeypatch):
     assert open_id in ids
 
 
-def test_delete_unreserved_expired_passes_keeps_active():
+def test_delete_unreserved_expired_passes_keeps_active(test_db):
     _clear_predicted_passes()
     now = datetime.now(timezone.utc)
     active_id = p_db.insert_n2yo_pass_return_id(
@@ -313,8 +330,188 @@ def test_delete_unreserved_expired_passes_keeps_active():
     )
     assert active_id is not None
     assert expired_id is not None
+    # Passes only reach predicted_passes by being reserved; these reservations are then removed.
+    _insert_reservation(active_id, gs_id=1, s_id=1)
+    _insert_reservation(expired_id, gs_id=1, s_id=1)
+    _clear_reservations()
 
     p_db.delete_unreserved_expired_passes()
 
     assert p_db.get_pass_from_pass_id(active_id) is not None
     assert p_db.get_pass_from_pass_id(expired_id) is None
+
+
+def test_stale_tle_served_when_celestrak_down(client, monkeypatch):
+    _clear_predicted_passes()
+    now = datetime.now(timezone.utc)
+    stale_time = _utc_ts(now - timedelta(days=30))
+    line1 = "1 25544U 98067A   26029.50000000  .00010000  00000-0  18000-3 0  9991"
+    line2 = "2 25544  51.6400 120.0000 0005000  20.0000  40.0000 15.50000000    10"
+    _update_satellite_tle(s_id=1, line1=line1, line2=line2, updated_at=stale_time)
+
+    used = {}
+
+    def failing_get_tle(*args, **kwargs):
+        raise HTTPException(status_code=502, detail="CelesTrak API request failed.")
+
+    def fake_get_passes(*args, **kwargs):
+        used["tle_line1"] = kwargs["tle_line1"]
+        return []
+
+    monkeypatch.setattr(passes_module, "get_tle", failing_get_tle)
+    monkeypatch.setattr(passes_module, "get_pass_predictions", fake_get_passes)
+
+    response = client.get("/passes", params={"norad_id": 25544, "gs_id": 1})
+    assert response.status_code == 200
+    assert used["tle_line1"] == line1
+
+
+def test_missing_tle_blocks_on_fetch(client, monkeypatch):
+    _clear_predicted_passes()
+    _update_satellite_tle(s_id=1, line1=None, line2=None, updated_at=None)
+    fresh_line1 = "1 25544U 98067A   26040.50000000  .00010000  00000-0  18000-3 0  9993"
+    used = {}
+
+    def fake_get_tle(*args, **kwargs):
+        return TLEFetch(
+            [fresh_line1, "2 25544  51.6400 121.0000 0005000  20.0000  40.0000 15.50000000    18"],
+            None,
+            None,
+        )
+
+    def fake_get_passes(*args, **kwargs):
+        used["tle_line1"] = kwargs["tle_line1"]
+        return []
+
+    monkeypatch.setattr(passes_module, "get_tle", fake_get_tle)
+    monkeypatch.setattr(passes_module, "get_pass_predictions", fake_get_passes)
+
+    response = client.get("/passes", params={"norad_id": 25544, "gs_id": 1})
+    assert response.status_code == 200
+    assert used["tle_line1"] == fresh_line1
+
+
+def test_circuit_breaker_opens_after_repeated_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+def _future_pass(now: datetime) -> int:
+    pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=45.0,
+        duration=600,
+        start_time=_utc_ts(now + timedelta(hours=1)),
+        end_time=_utc_ts(now + timedelta(hours=26)),
+    )
+    assert pass_id is not None
+    return pass_id
+
+
+def test_unchanged_tle_keeps_cached_passes(client, monkeypatch):
+    _clear_predicted_passes()
+    now = datetime.now(timezone.utc)
+    line1 = "1 25544U 98067A   26029.50000000  .00010000  00000-0  18000-3 0  9991"
+    line2 = "2 25544  51.6400 120.0000 0005000  20.0000  40.0000 15.50000000    10"
+    _update_satellite_tle(s_id=1, line1=line1, line2=line2, updated_at=_utc_ts(now - timedelta(days=30)))
+    pass_id = _future_pass(now)
+    seen = {}
+
+    def not_modified(norad_id, etag=None, last_modified=None):
+        seen["called"] = True
+        return TLEFetch(None, etag, last_modified)
+
+    monkeypatch.setattr(passes_module, "get_tle", not_modified)
+
+    response = client.get("/passes", params={"norad_id": 25544, "gs_id": 1})
+    assert response.status_code == 200
+    assert seen["called"]
+    assert p_db.get_pass_from_pass_id(pass_id) is not None
+
+
+def test_changed_tle_invalidates_unreserved_future_passes(client, monkeypatch):
+    _clear_predicted_passes()
+    now = datetime.now(timezone.utc)
+    _update_satellite_tle(
+        s_id=1,
+        line1="1 25544U 98067A   26029.50000000  .00010000  00000-0  18000-3 0  9991",
+        line2="2 25544  51.6400 120.0000 0005000  20.0000  40.0000 15.50000000    10",
+        updated_at=_utc_ts(now - timedelta(days=30)),
+    )
+    pass_id = _future_pass(now)
+    new_line1 = "1 25544U 98067A   26040.50000000  .00010000  00000-0  18000-3 0  9993"
+
+    def changed(norad_id, etag=None, last_modified=None):
+        return TLEFetch(
+            [new_line1, "2 25544  51.6400 121.0000 0005000  20.0000  40.0000 15.50000000    18"],
+            '"v2"',
+            None,
+        )
+
+    monkeypatch.setattr(passes_module, "get_tle", changed)
+
+    response = client.get("/passes", params={"norad_id": 25544, "gs_id": 1})
+    assert response.status_code == 200
+    assert p_db.get_pass_from_pass_id(pass_id) is None
+
+    conn = db_init.db_connect()
+    try:
+        row = conn.execute("SELECT tle_epoch, tle_etag FROM satellites WHERE s_id = 1").fetchone()
+    finally:
+        conn.close()
+    assert row["tle_epoch"] == "2026-02-09 12:00:00"
+    assert row["tle_etag"] == '"v2"'
+
+
+def test_tle_refresh_policy_uses_epoch_and_orbit_regime():
+    leo_line1 = "1 25544U 98067A   26040.50000000  .00010000  00000-0  18000-3 0  9993"
+    leo_line2 = "2 25544  51.6400 121.0000 0005000  20.0000  40.0000 15.50000000    18"
+    geo_line2 = "2 25544   0.0500 121.0000 0005000  20.0000  40.0000  1.00270000    18"
+    epoch = datetime(2026, 2, 9, 12, tzinfo=timezone.utc)
+
+    # Fresh epoch: no check needed, whenever we last fetched.
+    assert not tle_needs_refresh(leo_line1, leo_line2, None, epoch + timedelta(hours=2))
+    # LEO epoch past its 6h interval and never checked.
+    assert tle_needs_refresh(leo_line1, leo_line2, None, epoch + timedelta(hours=8))
+    # GEO tolerates the same epoch age.
+    assert not tle_needs_refresh(leo_line1, geo_line2, None, epoch + timedelta(hours=8))
+    # Old epoch that we checked recently: back off instead of re-downloading daily.
+    now = epoch + timedelta(days=20)
+    assert not tle_needs_refresh(leo_line1, leo_line2, now - timedelta(days=1), now)
+    assert tle_needs_refresh(leo_line1, leo_line2, now - timedelta(days=6), now)
+
+
+def test_init_db_adds_tle_columns_to_an_existing_database(tmp_path):
+    baseline = """
+        CREATE TABLE satellites (
+            s_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            s_name TEXT NOT NULL,
+            norad_id INTEGER NOT NULL UNIQUE,
+            tle_line1 TEXT,
+            tle_line2 TEXT,
+            tle_updated_at TIMESTAMP,
+            date_added TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO satellites (s_name, norad_id) VALUES ('OLD SAT', 11111);
+    """
+    db_path = tmp_path / "old.db"
+    conn = db_init.db_connect(str(db_path))
+    conn.executescript(baseline)
+    conn.close()
+
+    db_init.init_db(str(db_path))
+    db_init.init_db(str(db_path))
+
+    conn = db_init.db_connect(str(db_path))
+    try:
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(satellites)")}
+        assert {"tle_epoch", "tle_etag", "tle_last_modified"} <= columns
+        assert conn.execute("SELECT s_name FROM satellites").fetchone()["s_name"] == "OLD SAT"
+    finally:
+        conn.close()
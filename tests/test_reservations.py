@@ -304,3 +304,136 @@ def test_multiple_cancelled_reservations_allowed_one_active(client):
     # A second active reservation should be blocked.
     blocked = client.post("/reservations", json={"pass_id": pass_id})
     assert blocked.status_code == 409
+
+
+def _create_future_passes(count: int) -> list[int]:
+    now = datetime.now(timezone.utc)
+    pass_ids = []
+    for i in range(count):
+        pass_id = p_db.insert_n2yo_pass_return_id(
+            s_id=1,
+            gs_id=1,
+            max_elevation=45.0,
+            duration=600,
+            start_time=_utc_ts(now + timedelta(hours=1 + i)),
+            end_time=_utc_ts(now + timedelta(hours=1 + i, minutes=10)),
+        )
+        assert pass_id is not None
+        pass_ids.append(pass_id)
+    return pass_ids
+
+
+def test_batch_reservation_creates_all(client):
+    _clear_reservation_data()
+    pass_ids = _create_future_passes(3)
+
+    response = client.post(
+        "/reservations/batch",
+        json={
+            "reservations": [
+                {"pass_id": pass_ids[0], "mission_id": 1, "commands": ["PING"]},
+                {"pass_id": pass_ids[1]},
+                {"pass_id": pass_ids[2], "commands": ["PING", "DOWNLINK"]},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["errors"] == []
+    assert [r["pass_id"] for r in data["reservations"]] == pass_ids
+    assert data["reservations"][0]["mission_id"] == 1
+    assert set(data["reservations"][2]["commands"]) == {"PING", "DOWNLINK"}
+
+
+def test_batch_reservation_atomic_rejects_everything(client):
+    _clear_reservation_data()
+    pass_ids = _create_future_passes(2)
+
+    response = client.post(
+        "/reservations/batch",
+        json={"reservations": [{"pass_id": pass_ids[0]}, {"pass_id": pass_ids[1], "commands": ["NOT_A_CMD"]}]},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"][0]["index"] == 1
+
+    listing = client.get("/reservations")
+    assert all(r["pass_id"] not in pass_ids for r in listing.json()["reservations"])
+
+
+def test_batch_reservation_non_atomic_reports_per_item(client):
+    _clear_reservation_data()
+    pass_ids = _create_future_passes(2)
+    first = client.post("/reservations", json={"pass_id": pass_ids[0]})
+    assert first.status_code == 200
+
+    response = client.post(
+        "/reservations/batch",
+        json={
+            "atomic": False,
+            "reservations": [
+                {"pass_id": pass_ids[0]},
+                {"pass_id": pass_ids[1]},
+                {"pass_id": pass_ids[1]},
+                {"pass_id": 999999},
+            ],
+        },
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["pass_id"] for r in data["reservations"]] == [pass_ids[1]]
+    assert [(e["index"], e["status_code"]) for e in data["errors"]] == [(0, 409), (2, 409), (3, 404)]
+
+
+def test_list_reservations_filters(client):
+    _clear_reservation_data()
+    pass_ids = _create_future_passes(3)
+    for pass_id in pass_ids:
+        assert client.post("/reservations", json={"pass_id": pass_id}).status_code == 200
+    listed = client.get("/reservations").json()["reservations"]
+    r_ids = {r["pass_id"]: r["r_id"] for r in listed}
+    assert client.post(f"/reservations/{r_ids[pass_ids[0]]}/cancel").status_code == 200
+
+    response = client.get("/reservations", params={"gs_id": 1, "norad_id": 25544})
+    assert {r["pass_id"] for r in response.json()["reservations"]} == set(pass_ids[1:])
+    response = client.get("/reservations", params={"gs_id": 2})
+    assert response.json()["reservations"] == []
+
+    response = client.get("/reservations", params={"status": "cancelled"})
+    assert [r["pass_id"] for r in response.json()["reservations"]] == [pass_ids[0]]
+    response = client.get("/reservations", params=[("status", "RESERVED"), ("status", "CANCELLED")])
+    assert len(response.json()["reservations"]) == 3
+
+    # Only the second pass (starting ~2h from now) overlaps this window.
+    now = datetime.now(timezone.utc)
+    response = client.get(
+        "/reservations",
+        params={
+            "window_start": (now + timedelta(hours=1, minutes=30)).isoformat(),
+            "window_end": (now + timedelta(hours=2, minutes=30)).isoformat(),
+        },
+    )
+    assert [r["pass_id"] for r in response.json()["reservations"]] == [pass_ids[1]]
+
+    response = client.get("/reservations", params={"limit": 1})
+    assert len(response.json()["reservations"]) == 1
+
+
+def test_list_reservations_invalid_status(client):
+    response = client.get("/reservations", params={"status": "PENDING"})
+    assert response.status_code == 400
+
+
+def test_list_reservations_includes_commands(client):
+    _clear_reservation_data()
+    pass_ids = _create_future_passes(2)
+    client.post("/reservations", json={"pass_id": pass_ids[0], "mission_id": 1, "commands": ["PING", "DOWNLINK"]})
+    client.post("/reservations", json={"pass_id": pass_ids[1]})
+
+    response = client.get("/reservations/1")
+    reservations = response.json()["reservations"]
+    assert [r["pass_id"] for r in reservations] == [pass_ids[0]]
+    assert set(reservations[0]["commands"]) == {"PING", "DOWNLINK"}
+
+    response = client.get("/reservations", params={"limit": 10})
+    commands = {r["pass_id"]: r["commands"] for r in response.json()["reservations"]}
+    assert commands[pass_ids[1]] == []
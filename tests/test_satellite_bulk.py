@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import db.satellites_db as sat_db
+from fastapi import HTTPException
+
+from src.services import pass_cache, satellite_bulk
+
+NEW_L1 = "1 25545U 98067A   26040.50000000  .00010000  00000-0  18000-3 0  9991"
+NEW_L2 = "2 25545  51.6400 121.0000 0005000  20.0000  40.0000 15.50000000    19"
+
+
+def _stub_tles(monkeypatch, tles: dict, names: dict | None = None):
+    calls = []
+
+    def fake_get_tles(norad_ids=None, wanted=None, names=None, **kwargs):
+        calls.append(sorted(norad_ids))
+        if names is not None:
+            names.update(stub_names)
+        return {norad_id: lines for norad_id, lines in tles.items() if norad_id in wanted}
+
+    stub_names = names or {}
+    monkeypatch.setattr(satellite_bulk, "get_tles", fake_get_tles)
+    return calls
+
+
+def test_bulk_registers_with_one_tle_request(client, monkeypatch):
+    calls = _stub_tles(monkeypatch, {25545: (NEW_L1, NEW_L2)}, {25545: "NEW SAT"})
+
+    response = client.post(
+        "/satellites/bulk",
+        json={"satellites": [25545, {"norad_id": 60000, "s_name": "NO TLE"}, 25544, 25545]},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert calls == [[25545, 60000]]
+    statuses = [(item["norad_id"], item["status"], item["tle"]) for item in body["satellites"]]
+    assert statuses == [
+        (25545, "created", True),
+        (60000, "created", False),
+        (25544, "exists", False),
+        (25545, "duplicate", False),
+    ]
+    assert body["created"] == 2 and body["with_tle"] == 1
+
+    stored = sat_db.get_satellite_by_norad_id(25545)
+    assert stored["s_name"] == "NEW SAT"
+    assert stored["tle_line2"] == NEW_L2
+    assert stored["tle_epoch"] is not None
+    assert sat_db.get_satellite_by_norad_id(60000)["tle_line1"] is None
+
+
+def test_bulk_registers_without_tles_when_upstream_fails(client, monkeypatch):
+    def failing_get_tles(**kwargs):
+        raise HTTPException(status_code=502, detail="CelesTrak API request failed.")
+
+    monkeypatch.setattr(satellite_bulk, "get_tles", failing_get_tles)
+    body = client.post("/satellites/bulk", json={"satellites": [70000]}).json()
+    assert body["created"] == 1
+    assert body["tle_error"] == "CelesTrak API request failed."
+    assert sat_db.get_satellite_by_norad_id(70000)["s_name"] == "NORAD 70000"
+
+
+def test_bulk_queues_pass_precompute(client, monkeypatch):
+    _stub_tles(monkeypatch, {25545: (NEW_L1, NEW_L2)})
+    now = datetime.now(timezone.utc)
+    calls = []
+
+    def fake_predictions(**kwargs):
+        calls.append((kwargs["gs_lat"], kwargs["gs_lon"]))
+        start = now + timedelta(hours=1, minutes=len(calls) * 20)
+        return [
+            {
+                "start_time": start.strftime("%Y-%m-%d %H:%M:%S"),
+                "end_time": (start + timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S"),
+                "max_elevation": 40.0,
+                "duration": 600,
+            }
+        ]
+
+    monkeypatch.setattr(pass_cache, "get_pass_predictions", fake_predictions)
+    response = client.post("/satellites/bulk", json={"satellites": [25545], "precompute_passes": True})
+    assert response.status_code == 200
+    assert response.json()["precompute_queued"] == 1
+
+    # TestClient runs background tasks before returning; every seeded active station is in reach.
+    assert len(calls) >= 2
+    s_id = sat_db.get_satellite_by_norad_id(25545)["s_id"]
+    assert not pass_cache.pass_cache_is_stale(s_id, 1, now - timedelta(hours=24))
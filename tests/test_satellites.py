@@ -119,7 +119,7 @@ def test_update_satellite_not_found(client):
 def test_delete_satellite_returns_warning_header(client):
     norad_id = _create_satellite(client)
     response = client.delete(f"/satellites/{norad_id}")
-    assert response.status_code == 200
+    assert response.status_code == 202
     assert "Warning" in response.headers
 
 
@@ -168,9 +168,12 @@ def test_delete_satellite_force_with_active_reservation(client):
     assert reserve.status_code == 200
 
     response = client.delete(f"/satellites/{norad_id}", params={"force": True})
-    assert response.status_code == 200
+    assert response.status_code == 202
     assert "Warning" in response.headers
-    assert response.json()["deleted_reservations"] == 1
+    job = client.get(response.json()["status_url"]).json()["job"]
+    assert job["kind"] == "satellite_delete"
+    assert job["reservations_deleted"] == 1
+    assert all(sat["norad_id"] != norad_id for sat in client.get("/satellites").json()["satellites"])
 
     _delete_groundstation_force(client, gs_id)
 
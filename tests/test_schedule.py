@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+
+import db.passes_db as p_db
+from db import db_init
+from src.services.scheduler import plan_assignments
+
+
+def _utc_ts(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _clear_reservation_data():
+    conn = db_init.db_connect()
+    try:
+        conn.execute("DELETE FROM reservation_commands;")
+        conn.execute("DELETE FROM reservations;")
+        conn.execute("DELETE FROM predicted_passes;")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _insert_pass(s_id: int, gs_id: int, start_minutes: int, end_minutes: int) -> int:
+    now = datetime.now(timezone.utc)
+    pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=s_id,
+        gs_id=gs_id,
+        max_elevation=45.0,
+        duration=(end_minutes - start_minutes) * 60,
+        start_time=_utc_ts(now + timedelta(minutes=start_minutes)),
+        end_time=_utc_ts(now + timedelta(minutes=end_minutes)),
+    )
+    assert pass_id is not None
+    return pass_id
+
+
+def _candidate(pass_id, gs_id, start, end, mission_id=1, priority="low"):
+    return {
+        "pass_id": pass_id,
+        "gs_id": gs_id,
+        "start_time": f"2030-01-01 00:{start:02d}:00",
+        "end_time": f"2030-01-01 00:{end:02d}:00",
+        "duration": (end - start) * 60,
+        "mission_id": mission_id,
+        "priority": priority,
+    }
+
+
+def test_plan_maximises_weighted_time_per_station():
+    candidates = [
+        _candidate(1, 1, 0, 10),
+        _candidate(2, 1, 5, 15, priority="high"),
+        _candidate(3, 1, 15, 20),
+        # Two short passes together beat one long pass of the same priority.
+        _candidate(4, 2, 0, 30),
+        _candidate(5, 2, 0, 20),
+        _candidate(6, 2, 20, 40),
+    ]
+    plan = plan_assignments(candidates, [])
+    assert sorted(item["pass_id"] for item in plan) == [2, 3, 5, 6]
+
+
+def test_plan_prefers_higher_priority_mission_and_avoids_reservations():
+    candidates = [
+        _candidate(1, 1, 0, 10, mission_id=1, priority="low"),
+        _candidate(1, 1, 0, 10, mission_id=2, priority="high"),
+        _candidate(2, 1, 20, 30),
+    ]
+    reserved = [{"gs_id": 1, "start_time": "2030-01-01 00:25:00", "end_time": "2030-01-01 00:35:00"}]
+    plan = plan_assignments(candidates, reserved)
+    assert [(item["pass_id"], item["mission_id"]) for item in plan] == [(1, 2)]
+
+
+def test_schedule_plan_and_commit(client):
+    _clear_reservation_data()
+    # Mission 1 (medium) flies s_id 1; mission 2 (high) flies s_id 2.
+    medium = _insert_pass(1, 1, 10, 20)
+    high = _insert_pass(2, 1, 15, 25)
+    later = _insert_pass(1, 1, 30, 40)
+    other_station = _insert_pass(1, 2, 10, 20)
+
+    response = client.post("/schedule/plan", json={"mission_ids": [1, 2]})
+    assert response.status_code == 200
+    plan = response.json()
+    assert plan["candidates"] == 4
+    assert {item["pass_id"] for item in plan["assignments"]} == {high, later, other_station}
+    assert medium not in {item["pass_id"] for item in plan["assignments"]}
+
+    listing = client.get("/reservations")
+    assert listing.json()["reservations"] == []
+
+    response = client.post("/schedule/commit", json={"mission_ids": [1, 2]})
+    assert response.status_code == 200
+    reservations = response.json()["reservations"]
+    assert {r["pass_id"] for r in reservations} == {high, later, other_station}
+    assert {r["pass_id"]: r["mission_id"] for r in reservations}[high] == 2
+
+    # The remaining pass overlaps a now-reserved one, so nothing is left to plan.
+    response = client.post("/schedule/plan", json={"mission_ids": [1, 2]})
+    assert response.json()["assignments"] == []
+
+
+def test_schedule_unknown_mission(client):
+    response = client.post("/schedule/plan", json={"mission_ids": [1, 999]})
+    assert response.status_code == 404
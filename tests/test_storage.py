@@ -0,0 +1,60 @@
+import db.storage_db as storage_db
+from db import db_init
+from src.services.storage import optimize_storage
+
+
+def _fill_and_delete(rows: int = 2000) -> None:
+    conn = db_init.db_connect()
+    try:
+        conn.execute("CREATE TABLE bulk (payload TEXT)")
+        conn.executemany("INSERT INTO bulk VALUES (?)", [("x" * 1000,) for _ in range(rows)])
+        conn.commit()
+        conn.execute("DROP TABLE bulk")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_new_databases_use_incremental_auto_vacuum(test_db):
+    assert storage_db.get_storage_stats()["auto_vacuum"] == "INCREMENTAL"
+
+
+def test_optimize_storage_reclaims_free_pages(test_db):
+    _fill_and_delete()
+    storage_db.checkpoint_wal()
+    before = storage_db.get_storage_stats()
+    assert before["freelist_count"] > 0
+
+    report = optimize_storage(time_budget=30)
+
+    assert report["before"]["freelist_count"] == before["freelist_count"]
+    assert report["after"]["freelist_count"] == 0
+    assert report["after"]["page_count"] < before["page_count"]
+    assert report["after"]["file_bytes"] < before["file_bytes"]
+    assert report["after"]["wal_bytes"] == 0
+    assert report["steps"]["vacuumed_pages"] == before["freelist_count"]
+    assert report["skipped"] == []
+
+
+def test_optimize_storage_migrates_auto_vacuum(test_db):
+    conn = db_init.db_connect()
+    try:
+        conn.execute("PRAGMA auto_vacuum = NONE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    assert storage_db.get_storage_stats()["auto_vacuum"] == "NONE"
+
+    report = optimize_storage(time_budget=30, migrate_auto_vacuum=True)
+
+    assert report["steps"]["migrate_auto_vacuum"] is True
+    assert report["after"]["auto_vacuum"] == "INCREMENTAL"
+
+
+def test_optimize_storage_skips_optional_steps_without_budget(test_db):
+    _fill_and_delete(200)
+
+    report = optimize_storage(time_budget=0)
+
+    assert report["skipped"] == ["incremental_vacuum", "analyze"]
+    assert report["steps"]["wal_checkpoint"]["busy"] is False
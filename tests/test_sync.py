@@ -0,0 +1,78 @@
+from db import db_init
+from src.services import maintenance
+
+
+def test_sync_from_zero_returns_every_row(client):
+    response = client.get("/sync")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["has_more"] is False
+    assert {gs["gs_id"] for gs in data["changes"]["ground_stations"]["upserts"]} == {1, 2, 3}
+    assert len(data["changes"]["satellites"]["upserts"]) == 3
+    assert data["changes"]["reservations"]["deletes"] == []
+
+
+def test_sync_returns_only_changes_and_tombstones(client):
+    version = client.get("/sync").json()["version"]
+
+    assert client.patch("/missions/update/1", json={"owner": "Ops"}).status_code == 200
+    created = client.post("/groundstations", json={"gs_code": "SYNC_GS", "lon": 10.0, "lat": 20.0, "alt": 5.0})
+    assert created.status_code == 201
+    deleted = client.delete("/groundstations/1", params={"force": True})
+    assert deleted.status_code == 202
+
+    data = client.get("/sync", params={"since": version}).json()
+    changes = data["changes"]
+    assert [m["mission_id"] for m in changes["missions"]["upserts"]] == [1]
+    assert changes["missions"]["upserts"][0]["owner"] == "Ops"
+    assert [gs["gs_code"] for gs in changes["ground_stations"]["upserts"]] == ["SYNC_GS"]
+    assert changes["ground_stations"]["deletes"] == [1]
+    # Rows removed along with the station (including FK cascades) are reported too.
+    assert changes["reservations"]["deletes"]
+    assert changes["predicted_passes"]["deletes"]
+    assert changes["satellites"]["upserts"] == []
+    assert data["version"] > version
+
+    again = client.get("/sync", params={"since": data["version"]}).json()
+    assert all(not c["upserts"] and not c["deletes"] for c in again["changes"].values())
+    assert again["version"] == data["version"]
+
+
+def test_sync_pages_with_limit(client):
+    first = client.get("/sync", params={"limit": 5}).json()
+    assert first["has_more"] is True
+    assert sum(len(c["upserts"]) for c in first["changes"].values()) == 5
+    rest = client.get("/sync", params={"since": first["version"], "limit": 1000}).json()
+    assert rest["has_more"] is False
+
+
+def test_sync_rejects_version_from_the_future(client):
+    response = client.get("/sync", params={"since": 10**9})
+    assert response.status_code == 410
+
+
+def test_pruned_tombstones_expire_old_sync_versions(client):
+    version = client.get("/sync").json()["version"]
+    assert client.delete("/groundstations/1", params={"force": True}).status_code == 202
+    # A later write, so the station's tombstone is no longer its table's newest entry.
+    created = client.post("/groundstations", json={"gs_code": "AFTER_GS", "lon": 10.0, "lat": 20.0, "alt": 5.0})
+    assert created.status_code == 201
+    current = client.get("/sync").json()["version"]
+
+    conn = db_init.db_connect()
+    try:
+        conn.execute("UPDATE change_log SET changed_at = datetime('now', '-40 days') WHERE op = 'DELETE'")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert maintenance.prune_tombstones(retention_days=30) > 0
+    assert maintenance.prune_tombstones(retention_days=30) == 0
+
+    response = client.get("/sync", params={"since": version})
+    assert response.status_code == 410
+    assert client.get("/sync", params={"since": current}).status_code == 200
+    snapshot = client.get("/sync", params={"limit": 10000}).json()
+    assert snapshot["changes"]["ground_stations"]["deletes"] == []
+    # The newest entry of each table survives, so versions never go backwards.
+    assert snapshot["version"] == current
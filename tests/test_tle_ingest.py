@@ -0,0 +1,167 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import db.satellites_db as sat_db
+from src.core.json_stream import iter_json_array
+from src.services import celestrak_client
+from src.services.tle import omm_to_tle, tle_is_valid
+from src.services.tle_ingest import ingest_catalog_files, iter_catalog_file
+
+
+def _omm(norad_id: int, name: str, epoch: str = "2026-02-09T12:00:00.000000") -> dict:
+    return {
+        "OBJECT_NAME": name,
+        "OBJECT_ID": "1998-067A",
+        "EPOCH": epoch,
+        "MEAN_MOTION": "15.50000000",
+        "ECCENTRICITY": "0.0005",
+        "INCLINATION": "51.64",
+        "RA_OF_ASC_NODE": "120.0",
+        "ARG_OF_PERICENTER": "20.0",
+        "MEAN_ANOMALY": "40.0",
+        "EPHEMERIS_TYPE": "0",
+        "CLASSIFICATION_TYPE": "U",
+        "NORAD_CAT_ID": str(norad_id),
+        "ELEMENT_SET_NO": "999",
+        "REV_AT_EPOCH": "12345",
+        "BSTAR": "0.00018",
+        "MEAN_MOTION_DOT": "0.0001",
+        "MEAN_MOTION_DDOT": "0",
+    }
+
+
+def test_iter_json_array_handles_elements_split_across_chunks():
+    text = '[{"a": [1, {"b": "]"}]}, 12345, "x,y", 3.5]'
+    assert list(iter_json_array(io.StringIO(text), chunk_size=3)) == [
+        {"a": [1, {"b": "]"}]},
+        12345,
+        "x,y",
+        3.5,
+    ]
+
+
+def test_omm_to_tle_produces_valid_lines():
+    line1, line2 = omm_to_tle(_omm(25544, "ISS (ZARYA)"))
+    assert tle_is_valid(line1, line2)
+    assert line1.startswith("1 25544U 98067A   26040.50000000  .00010000  00000+0  18000-3 0  999")
+    assert line2.startswith("2 25544  51.6400 120.0000 0005000  20.0000  40.0000 15.50000000")
+
+
+def test_tle_file_rejects_bad_checksums(tmp_path):
+    line1, line2 = omm_to_tle(_omm(25544, "ISS"))
+    bad_line2 = line2[:-1] + str((int(line2[-1]) + 1) % 10)
+    path = tmp_path / "stations.txt"
+    path.write_text(f"ISS\n{line1}\n{line2}\nBROKEN\n{line1}\n{bad_line2}\n")
+
+    stats = {}
+    records = list(iter_catalog_file(path, stats))
+    assert records == [(25544, "ISS", line1, line2)]
+    assert stats["rejected"] == 1
+
+
+def test_ingest_omm_json_csv_xml_in_one_transaction(test_db, tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps([_omm(25544, "ISS (ZARYA)"), _omm(90001, "NEW SAT A")]))
+
+    with (tmp_path / "b.csv").open("w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(_omm(90002, "NEW SAT B")))
+        writer.writeheader()
+        writer.writerow(_omm(90002, "NEW SAT B"))
+
+    fields = "".join(f"<{k}>{v}</{k}>" for k, v in _omm(90003, "NEW SAT C").items())
+    (tmp_path / "c.xml").write_text(
+        f"<ndm><omm><body><segment><data>{fields}</data></segment></body></omm></ndm>"
+    )
+
+    result = ingest_catalog_files([tmp_path])
+    assert result == {"files": 3, "rejected": 0, "upserted": 4}
+
+    iss = sat_db.get_satellite_by_norad_id(25544)
+    assert iss["s_name"] == "ISS (ZARYA)"
+    assert iss["tle_epoch"] == "2026-02-09 12:00:00"
+    assert sat_db.get_satellite_by_norad_id(90003)["s_name"] == "NEW SAT C"
+
+    # Re-ingesting an older element set does not overwrite the newer one.
+    (tmp_path / "a.json").write_text(json.dumps([_omm(25544, "ISS", "2026-01-01T00:00:00")]))
+    result = ingest_catalog_files([tmp_path / "a.json"])
+    assert result["upserted"] == 0
+    assert sat_db.get_satellite_by_norad_id(25544)["tle_epoch"] == "2026-02-09 12:00:00"
+
+
+def test_mirror_directory_replaces_network(tmp_path, monkeypatch):
+    line1, line2 = omm_to_tle(_omm(25544, "ISS"))
+    (tmp_path / "stations.tle").write_text(f"{line1}\n{line2}\n")
+    monkeypatch.setattr(celestrak_client, "TLE_MIRROR_DIR", str(tmp_path))
+
+    assert celestrak_client.get_tle(25544).lines == [line1, line2]
+    assert celestrak_client.get_tles(group="stations") == {25544: (line1, line2)}
+    with pytest.raises(HTTPException):
+        celestrak_client.get_tle(11111)
+
+
+def test_mirror_keeps_newest_epoch_across_century_and_reloads_changed_files(tmp_path, monkeypatch):
+    old_line1, old_line2 = omm_to_tle(_omm(25544, "ISS", "1999-12-31T00:00:00"))
+    new_line1, new_line2 = omm_to_tle(_omm(25544, "ISS", "2026-02-09T12:00:00"))
+    (tmp_path / "a.tle").write_text(f"{new_line1}\n{new_line2}\n")
+    (tmp_path / "b.tle").write_text(f"{old_line1}\n{old_line2}\n")
+    monkeypatch.setattr(celestrak_client, "TLE_MIRROR_DIR", str(tmp_path))
+
+    assert celestrak_client.get_tle(25544).lines == [new_line1, new_line2]
+    assert celestrak_client.get_tles() == {25544: (new_line1, new_line2)}
+
+    newer_line1, newer_line2 = omm_to_tle(_omm(25544, "ISS", "2026-03-01T00:00:00"))
+    (tmp_path / "c.tle").write_text(f"{newer_line1}\n{newer_line2}\n")
+    assert celestrak_client.get_tle(25544).lines == [newer_line1, newer_line2]
+
+
+@pytest.mark.parametrize(
+    ("name", "content"),
+    [("broken.xml", "<ndm><omm><body>"), ("broken.csv", "NORAD_CAT_ID,OBJECT_NAME\n1,\"" + "x" * (csv.field_size_limit() + 1) + "\"\n")],
+    ids=["xml", "csv"],
+)
+def test_ingest_endpoint_rejects_malformed_catalogue(client, tmp_path, monkeypatch, name, content):
+    (tmp_path / name).write_text(content)
+    monkeypatch.setattr(celestrak_client, "TLE_MIRROR_DIR", str(tmp_path))
+
+    response = client.post("/satellites/tle/ingest", json={"paths": [name]})
+    assert response.status_code == 400
+    assert name in response.json()["detail"]
+
+
+def test_ingest_endpoint_reads_from_mirror(client, tmp_path, monkeypatch):
+    (tmp_path / "catalog.json").write_text(json.dumps([_omm(90004, "NEW SAT D")]))
+    monkeypatch.setattr(celestrak_client, "TLE_MIRROR_DIR", str(tmp_path))
+
+    response = client.post("/satellites/tle/ingest", json={"paths": ["catalog.json"]})
+    assert response.status_code == 200
+    assert response.json()["upserted"] == 1
+
+    outside = client.post("/satellites/tle/ingest", json={"paths": ["../etc"]})
+    assert outside.status_code == 400
+
+
+def test_upsert_only_invalidates_satellites_it_changed(test_db):
+    from datetime import datetime, timedelta, timezone
+
+    import db.passes_db as p_db
+
+    checked_at = "2026-02-10 12:00:00"
+    start = datetime.now(timezone.utc) + timedelta(hours=2)
+    pass_id = p_db.insert_n2yo_pass_return_id(
+        s_id=1,
+        gs_id=1,
+        max_elevation=30.0,
+        duration=600,
+        start_time=start.strftime("%Y-%m-%d %H:%M:%S"),
+        end_time=(start + timedelta(minutes=10)).strftime("%Y-%m-%d %H:%M:%S"),
+    )
+    # Satellite 1 was merely checked in the same second as the ingest below.
+    sat_db.mark_satellite_tle_checked(1, checked_at)
+
+    line1, line2 = omm_to_tle(_omm(99001, "NEW SAT"))
+    upserted = sat_db.upsert_satellite_tles([(99001, "NEW SAT", line1, line2, "2026-02-09 12:00:00")], checked_at)
+    assert upserted == 1
+    assert p_db.get_pass_from_pass_id(pass_id) is not None